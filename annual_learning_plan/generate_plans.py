@@ -1,128 +1,412 @@
-from docx import Document
-from docx.shared import Pt, Inches
-from docx.enum.text import WD_ALIGN_PARAGRAPH
+#!/usr/bin/env python3
+"""
+周学习计划生成脚本
+
+学习计划内容保存在数据文件中（默认为同目录的 plans.json，也支持 YAML），
+每个学习领域生成一份"序号_领域_周计划.docx"。
+
+所有文档在进程池中并行生成：周数多的文档先开始，每个进程只构建一次文档骨架，
+生成全部文档的耗时接近最大的那一份。
+
+增量生成：每个领域的数据连同生成器版本计算哈希，记录在输出目录的构建清单中；
+数据没有变化、文档也没有被改动过的领域直接跳过（此时不加载 python-docx）。
+--watch 轮询数据文件，保存后只重新生成受影响的文档。
+
+用法：
+    python generate_plans.py [-d plans.json] [-o 输出目录] [--only 01,大模型原理] [-w 进程数] [--force]
+    python generate_plans.py --watch
+    python generate_plans.py --list
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+# 与周报生成器共用文档骨架缓存（python-docx 和 docx_skeleton 在需要生成文档时才导入）
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'weekly-report-generator', 'scripts'))
+
+# 文档版式变化时递增，使已生成的文档全部失效
+GENERATOR_VERSION = 1
+
+MANIFEST_NAME = '.plans_manifest.json'
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATA_PATH = os.path.join(SCRIPT_DIR, 'plans.json')
+DEFAULT_OUTPUT_DIR = os.path.join(SCRIPT_DIR, 'detail')
+
+# 文件名中不能出现的字符
+UNSAFE_FILENAME_CHARS = '\\/:*?"<>|'
+
+headers = ['周次', '学习主题', '具体内容', '学习资源', '主要概念']
+
+def build_plan_skeleton():
+    from docx import Document
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
 
-def create_weekly_plan(doc_path, title, weeks_data):
     doc = Document()
     
-    heading = doc.add_heading(title, 0)
+    heading = doc.add_heading('', 0)
     heading.alignment = WD_ALIGN_PARAGRAPH.CENTER
     
     doc.add_paragraph()
     doc.add_paragraph('学习周期：按周拆分计划')
     doc.add_paragraph()
     
-    table = doc.add_table(rows=len(weeks_data)+1, cols=5)
+    table = doc.add_table(rows=1, cols=5)
     table.style = 'Table Grid'
     
-    headers = ['周次', '学习主题', '具体内容', '学习资源', '主要概念']
     for i, header in enumerate(headers):
         cell = table.rows[0].cells[i]
         cell.text = header
         cell.paragraphs[0].runs[0].bold = True
     
-    for row_idx, week_data in enumerate(weeks_data):
+    return doc
+
+def create_weekly_plan(doc_path, title, weeks_data):
+    import docx_skeleton
+
+    skeleton = docx_skeleton.get_skeleton('weekly_plan', build_plan_skeleton, key='|'.join(headers))
+    doc = skeleton.clone()
+    
+    doc.paragraphs[0].add_run(title)
+    
+    table = doc.tables[0]
+    for week_data in weeks_data:
+        cells = table.add_row().cells
         for col_idx, value in enumerate(week_data):
-            table.rows[row_idx+1].cells[col_idx].text = str(value)
+            cells[col_idx].text = str(value)
     
-    doc.save(doc_path)
-    print(f'已生成：{doc_path}')
-
-# 1. 工程项目整体管理
-create_weekly_plan('C:/Users/admin/.config/opencode/skills/annual_learning_plan/detail/01_工程项目整体管理_周计划.docx', '工程项目整体管理 - 周学习计划', [
-    ['第1周', '项目全生命周期管理', '学习项目启动、规划、执行、监控、收尾5个阶段；绘制项目生命周期流程图；阅读PMBOK指南第1-2章', '《PMBOK指南》第7版（PMI官网下载）https://www.pmi.org/pmbok-guide-standards\n《项目管理知识体系指南》', '项目生命周期、项目阶段、项目管理过程组'],
-    ['第2周', '工程项目 vs 工业项目', '对比工程项目与工业项目的特点差异；分析工程项目的独特性；收集3个实际工程项目案例', '《工程项目管理》同济大学出版社\n《工程项目管理》高校教材（第3版）\n中国工程项目管理网 http://www.cpmchina.com', '工程项目特点、工业项目差异、独特性、临时性'],
-    ['第3周', '项目管理组织架构', '学习项目管理组织的三种模式；分析各模式的优缺点；绘制组织架构图示例', '《建设工程项目管理规范》GB/T 50326-2017\n《项目管理组织设计》机械工业出版社\n住建部官网 http://www.mohurd.gov.cn', '职能型组织、矩阵型组织、项目型组织、组织架构'],
-    ['第4周', '综合实践', '完成项目管理模拟案例；总结项目整体管理要点；制作思维导图', '《PMBOK指南》附录A（术语表）\n《项目管理案例集》中国电力出版社\nXMind思维导图 https://xmind.cn', '项目整体管理要点、案例分析、经验总结']
-])
-
-# 2. 项目物资采购管理
-create_weekly_plan('C:/Users/admin/.config/opencode/skills/annual_learning_plan/detail/02_项目物资采购管理_周计划.docx', '项目物资采购管理 - 周学习计划', [
-    ['第1周', '采购与招标基础', '学习采购的基本流程和分类；掌握招标方式；阅读招标投标法要点', '《招标投标法》 http://www.ndrc.gov.cn\n《政府采购法》财政部官网\n中国招标公共服务平台 http://www.cebpubservice.com', '招标、投标、公开招标、邀请招标、采购流程'],
-    ['第2周', '甲供/乙供/材料分类', '区分甲供材、乙供材范围；制作材料分类清单模板；分析材料供应模式案例', '《建设工程施工合同（示范文本）》GF-2017-0201\n《建筑工程物资管理》化学工业出版社\n筑龙网 https://www.zhulong.com', '甲供材、乙供材、材料分类、供应模式'],
-    ['第3周', '采购流程', '梳理采购6个阶段；绘制采购流程图；学习供应商管理方法', '《采购管理实务》中国人民大学出版社\n《供应商管理》机械工业出版社\n采购管理师教材 http://www.cpsm.org.cn', '采购需求、供应商选择、合同签订、供应商管理'],
-    ['第4周', '设备管理', '学习设备选型和采购要点；掌握设备验收流程；制作设备采购清单', '《机电工程管理与实务》中国建筑工业出版社\n《设备采购与安装工程》化学工业出版社\n设备验收规范 http://www.cseps.com', '设备选型、设备采购、设备验收、设备清单']
-])
-
-# 3. 项目进度计划编制
-create_weekly_plan('C:/Users/admin/.config/opencode/skills/annual_learning_plan/detail/03_项目进度计划编制_周计划.docx', '项目进度计划编制 - 周学习计划', [
-    ['第1周', 'WBS工作分解结构', '学习WBS分解原则；掌握WBS分解方法；练习绘制WBS分解图', '《PMBOK指南》第6版第5章 https://www.pmi.org\n《项目进度管理》中国电力出版社\nWBS教程 https://www.projectmanager.com/wbs', 'WBS、工作分解结构、100%原则、层级原则'],
-    ['第2周', '里程碑与关键路径', '学习里程碑设置方法；掌握关键路径法原理；计算关键路径和浮动时间', '《网络计划技术》冶金工业出版社\n《关键路径法CPM》教程\n进度管理师教材 http://www.miit.gov.cn', '里程碑、关键路径、关键活动、浮动时间'],
-    ['第3周', 'Project软件实操', '安装和熟悉Microsoft Project；编制项目进度计划；设置里程碑和关键路径', 'Microsoft Project https://www.microsoft.com/zh-cn/microsoft-365/project\n《Microsoft Project从入门到精通》人民邮电出版社\nB站教程 https://www.bilibili.com', 'Project操作、甘特图、里程碑设置、资源分配'],
-    ['第4周', '进度偏差分析', '学习进度偏差分析方法；掌握进度调整措施；模拟进度延误情景并调整', '《项目进度控制》中国建筑工业出版社\n《挣值管理》PMI官方指南\nS曲线分析 https://www.pmi.org/learning/earned-value-management', '前锋线、S曲线、进度偏差、进度调整']
-])
-
-# 4. 合同/成本/进度控制
-create_weekly_plan('C:/Users/admin/.config/opencode/skills/annual_learning_plan/detail/04_合同成本进度控制_周计划.docx', '合同/成本/进度控制 - 周学习计划', [
-    ['第1周', '进度控制方法', '学习进度控制的基本原理；掌握进度监控的方法和工具；学习进度预警机制', '《项目进度控制》中国建筑工业出版社\n《挣值管理》中国电力出版社\nPMI进度管理 https://www.pmi.org/learning', '进度监控、挣值管理、进度绩效指数、预警机制'],
-    ['第2周', '合同管理', '学习合同条款解读；掌握合同变更管理流程；分析合同风险点', '《合同法》 http://www.npc.gov.cn\n《建设工程施工合同（示范文本）》\n《FIDIC合同条件》 http://www.fidic.org', '合同条款、合同变更、合同风险、合同管理'],
-    ['第3周', '变更与索赔', '学习变更管理的程序和要求；掌握索赔依据和证据收集；模拟索赔案例分析', '《工程索赔》中国建筑工业出版社\n《索赔与反索赔》机械工业出版社\n《建设工程施工合同司法解释》', '工程变更、索赔程序、索赔依据、证据收集'],
-    ['第4周', '纠纷处理', '学习工程纠纷处理程序；掌握调解、仲裁、诉讼流程；分析典型纠纷案例', '《工程纠纷案例精选》法律出版社\n《仲裁法》中国法律网 http://www.court.gov.cn\n《中国建设工程法律评论》', '工程纠纷、调解、仲裁、诉讼、争议解决']
-])
-
-# 5. 施工管理
-create_weekly_plan('C:/Users/admin/.config/opencode/skills/annual_learning_plan/detail/05_施工管理_周计划.docx', '施工管理 - 周学习计划', [
-    ['第1周', '施组设计', '学习施工组织设计的内容和编制要求；掌握施工部署和施工方案制定；编制简单工程的施组设计', '《建筑施工组织设计规范》GB/T 50502-2009\n《建筑施工手册》第5版 中国建筑工业出版社\n筑龙网 https://www.zhulong.com/dict', '施工部署、施工方案、施组设计、工艺流程'],
-    ['第2周', '安装调试', '学习设备安装工艺流程；掌握调试方法和验收标准；了解安装过程的质量控制', '《机电工程管理与实务》中国建筑工业出版社\n《工业设备安装工程施工规范》GB 50231\n设备安装手册 http://www.cbichina.org.cn', '设备安装、工艺流程、调试方法、验收标准'],
-    ['第3周', '现场管理', '学习现场管理的要素；掌握现场布置原则；制定现场管理检查表', '《施工现场管理》中国建筑工业出版社\n《安全文明施工标准化》中国电力出版社\n5S管理协会 http://www.sechina.org', '人机料法环、现场布置、安全文明、5S管理'],
-    ['第4周', '综合实践', '参与现场巡查实践；总结施工管理要点；制作施工管理手册', '《建筑施工安全检查标准》JGJ 59-2011\n《工程项目管理》案例教程\nBIM技术 http://www.cbim.org.cn', '现场巡查、质量控制、安全管理、进度协调']
-])
-
-# 6. 项目现场管理
-create_weekly_plan('C:/Users/admin/.config/opencode/skills/annual_learning_plan/detail/06_项目现场管理_周计划.docx', '项目现场管理 - 周学习计划', [
-    ['第1周', '项目部管理', '学习项目部组织架构设置；掌握项目部管理制度制定；明确岗位职责和权限', '《建设工程项目管理规范》GB/T 50326\n《项目部设置与管理》中国建筑工业出版社\n建造师教材 http://www.coc.gov.cn', '项目部架构、管理制度、岗位职责、权限分配'],
-    ['第2周', '施工现场管理', '学习施工现场布置原则；掌握施工平面图绘制；制定现场安全文明施工措施', '《建筑施工现场管理》化学工业出版社\n《施工平面图绘制》教程\n安全文明施工标准 http://www.mohurd.gov.cn', '施工平面图、现场布置、安全文明、施工道路'],
-    ['第3周', '仓储管理', '学习仓储管理流程；掌握物资入库、出库、盘点；优化仓储布局提高效率', '《仓储管理实务》中国人民大学出版社\n《物资管理手册》机械工业出版社\nERP系统学习 https://www.netsuite.com', '仓储流程、入库出库、盘点、物资管理'],
-    ['第4周', '预安装管理', '学习预安装范围确定；掌握预安装计划编制；制定预安装质量控制措施', '《装配式混凝土建筑技术标准》GB/T 51231\n《预制构件安装技术规程》\n装配式建筑学习网 http://www.cnieia.org', '预安装范围、预安装计划、质量控制、成品保护']
-])
-
-# 7. 施工技术与发展
-create_weekly_plan('C:/Users/admin/.config/opencode/skills/annual_learning_plan/detail/07_施工技术与发展_周计划.docx', '施工技术与发展 - 周学习计划', [
-    ['第1周', '行业技术标准', '收集常用施工技术标准；学习标准规范查询方法；整理关键技术标准要点', '国家标准全文公开系统 http://www.gb688.cn\n《工程建设标准化》协会官网 http://www.ciecc.org.cn\n住建部标准定额司 http://www.mohurd.gov.cn', '国家标准、行业标准、企业标准、规范体系'],
-    ['第2周', '规范与图集', '学习施工规范体系；掌握常用图集查阅；规范与图集的实际应用', '国标图集 中国建筑标准设计研究院 https://www.china-building.com.cn\n《混凝土结构施工图集》16G101\n地方标准图集 http://www.cabplink.com', '施工规范、图集查阅、构造做法、标准图集'],
-    ['第3周', '施工技术要点', '学习各专业施工技术要点；掌握关键技术工艺流程；总结常见技术问题解决方法', '《建筑施工技术》同济大学出版社\n《施工工艺手册》化学工业出版社\n工程技术交底模板 http://www.cbi360.net', '施工工艺、技术要点、质量标准、工艺流程'],
-    ['第4周', '技术发展趋势', '了解装配式建筑技术；学习BIM技术在施工中的应用；关注绿色施工技术发展', '《装配式建筑概论》中国建筑工业出版社\n《BIM技术应用》中国建筑工业出版社\n《绿色建筑评价标准》GB/T 50378', '装配式建筑、BIM技术、绿色施工、智能建造']
-])
-
-# 8. 成本与造价管理
-create_weekly_plan('C:/Users/admin/.config/opencode/skills/annual_learning_plan/detail/08_成本与造价管理_周计划.docx', '成本与造价管理 - 周学习计划', [
-    ['第1周', '预算编制', '学习施工图预算编制方法；掌握工程量清单计价；练习使用造价软件', '《建设工程工程量清单计价规范》GB 50500-2013\n《施工图预算》中国建筑工业出版社\n广联达造价 https://www.glodon.com\n品茗造价 https://www.pmddjj.com', '施工图预算、工程量清单、清单计价、定额'],
-    ['第2周', '成本核算', '学习成本核算的对象和方法；掌握成本归集和分配；编制成本报表', '《施工企业会计》中国建筑工业出版社\n《成本管理》中国人民大学出版社\n《会计准则第15号》财政部 http://kjs.mof.gov.cn', '成本核算对象、成本归集、成本分配、成本报表'],
-    ['第3周', '成本控制体系', '建立成本控制体系框架；制定成本控制措施；学习目标成本管理', '《工程项目成本控制》机械工业出版社\n《目标成本管理》企业管理出版社\n《精益建造》中国建筑工业出版社', '目标成本、成本控制体系、责任成本、成本考核'],
-    ['第4周', '成本分析', '学习成本偏差分析方法；掌握成本纠偏措施；编制成本分析报告', '《成本分析》中国电力出版社\n《工程成本管理》化学工业出版社\n造价工程师教材 http://www.ceca.org.cn', '成本偏差、纠偏措施、成本分析、成本报告']
-])
-
-# 9. EPC总承包项目管理
-create_weekly_plan('C:/Users/admin/.config/opencode/skills/annual_learning_plan/detail/09_EPC总承包项目管理_周计划.docx', 'EPC总承包项目管理 - 周学习计划', [
-    ['第1周', 'EPC模式特点', '学习EPC总承包模式概念；对比传统承包模式差异；分析EPC模式优劣势', '《房屋建筑和市政基础设施项目工程总承包管理办法》\n《EPC工程总承包项目管理》中国建筑工业出版社\n总承包管理网 http://www.epc365.com', 'EPC总承包、设计采购施工、施工总承包、DBB模式'],
-    ['第2周', '设计采购施工协调', '学习设计与采购接口管理；掌握设计与施工协调要点；优化设计-采购-施工流程', '《工程总承包项目管理》机械工业出版社\n《接口管理》中国电力出版社\n设计管理手册 http://www.chinaeda.org', '设计-采购接口、设计-施工协调、接口管理、协同流程'],
-    ['第3周', '项目总控', '学习项目总控理念和方法；掌握项目总控组织架构；建立项目总控信息系统', '《项目总控管理》中国建筑工业出版社\n《PMC项目管理》化学工业出版社\n项目控制系统 http://www.pmshop.cn', '项目总控、PMC、项目控制、组织架构'],
-    ['第4周', '案例分析', '分析EPC项目成功案例；总结EPC项目风险点；制定EPC项目管理要点', '《EPC工程总承包案例分析》中国建筑工业出版社\n《国际工程承包》案例集\nFIDIC合同应用 http://www.fidic.org.cn', 'EPC风险、案例分析、最佳实践、管理要点']
-])
-
-# 10. 多Agent系统
-create_weekly_plan('C:/Users/admin/.config/opencode/skills/annual_learning_plan/detail/10_多Agent系统_周计划.docx', '多Agent系统 - 周学习计划', [
-    ['第1周', 'Agent架构基础', '学习Agent的基本概念和架构；了解Planner/Executor/Critic模式；分析Agent应用场景', 'LangChain官方文档 https://python.langchain.com\n吴恩达《AI Agent》课程 https://www.deeplearning.ai\nAutoGen官方文档 https://microsoft.github.io/autogen', 'Agent、Planner、Executor、Critic、协作机制'],
-    ['第2周', '多Agent协作机制', '学习多Agent通信协议；掌握Agent协作方式；设计简单的Agent交互流程', '《Multi-Agent Systems》论文集\nCrewAI官方文档 https://crewai.com\nMetaGPT GitHub https://github.com/geekan/MetaGPT', 'Agent通信、协作协议、任务分配、交互流程'],
-    ['第3周', 'Agent框架实践', '了解主流Agent框架；搭建简单的多Agent系统；实现Agent间的任务分配', 'LangChain Agents https://python.langchain.com/docs/modules/agents\nAutoGen示例库 https://github.com/microsoft/autogen\nLlamaIndex Agents https://docs.llamaindex.ai', 'LangChain、AutoGen、CrewAI、任务分配'],
-    ['第4周', '综合应用', '完成多Agent系统小项目；优化Agent协作效率；总结多Agent系统设计要点', 'GitHub Agent项目 https://github.com/topics/agent\nHugging Face Agents https://huggingface.co/agents\nAI Agent实战案例 https://www.langchain.com/agents', '系统设计、性能优化、经验总结、架构设计']
-])
-
-# 11. 编程辅助工具
-create_weekly_plan('C:/Users/admin/.config/opencode/skills/annual_learning_plan/detail/11_编程辅助工具_周计划.docx', '编程辅助工具 - 周学习计划', [
-    ['第1周', 'OpenCode基础', '安装和配置OpenCode；学习基本命令和操作；完成第一个OpenCode项目', 'OpenCode官网 https://opencode.ai\nOpenCode GitHub https://github.com/anomalyco/opencode\nOpenCode文档 https://docs.opencode.ai', 'OpenCode安装、项目创建、命令操作、代码生成'],
-    ['第2周', 'OpenCode进阶', '掌握代码生成功能；学习项目管理和协作；使用OpenCode重构代码', 'OpenCode最佳实践 https://docs.opencode.ai/guides\n《代码重构》Martin Fowler 机械工业出版社\n代码质量指南 https://google.github.io/styleguide', '代码生成、重构、项目管理、多文件协作'],
-    ['第3周', 'Claude Code应用', '学习Claude Code安装配置；掌握代码分析和优化；使用Claude Code辅助调试', 'Claude Code https://claude.com/claude-code\nAnthropic开发者文档 https://docs.anthropic.com\nClaude使用指南 https://www.anthropic.com/claude', 'Claude Code安装、代码分析、调试辅助、代码审查'],
-    ['第4周', '工具整合', '整合OpenCode和Claude Code；建立高效编程工作流；总结工具使用技巧', 'AI编程工具评测 https://www.toolify.ai\n《高效程序员》 O Reilly出版社\n工作流自动化 https://n8n.io', '工具整合、工作流优化、效率提升、最佳实践']
-])
-
-# 12. 大模型原理
-create_weekly_plan('C:/Users/admin/.config/opencode/skills/annual_learning_plan/detail/12_大模型原理_周计划.docx', '大模型原理 - 周学习计划', [
-    ['第1周', 'Transformer架构', '学习Attention注意力机制；掌握Transformer模型结构；解读Transformer原论文', '《Attention Is All You Need》论文 https://arxiv.org/abs/1706.03762\n李宏毅Transformer课程 https://www.youtube.com/watch?v=nFBqBlM5mvc\n《深度学习》花书 第11章', 'Self-Attention、Multi-Head Attention、位置编码、Encoder-Decoder'],
-    ['第2周', 'MoE混合专家模型', '学习MoE架构原理；掌握稀疏激活机制；分析MoE模型优势', 'Switch Transformer论文 https://arxiv.org/abs/2101.03961\nGShard论文 https://arxiv.org/abs/2006.16668\nMoE教程 https://www.vwalsh.com/posts/mixture-of-experts', '混合专家模型、稀疏激活、门控机制、负载均衡'],
-    ['第3周', 'SFT监督微调', '学习SFT训练方法；掌握数据准备和标注；实践SFT微调流程', 'LLaMA-Factory GitHub https://github.com/hiyouga/LLaMA-Factory\nAlpaca数据集 https://github.com/tatsu-lab/stanford_alpaca\nSFT教程 https://www.philschmid.de/fine-tuning-llamas', '监督微调、数据标注、指令微调、损失函数'],
-    ['第4周', 'RLHF强化学习', '学习RLHF训练框架；掌握PPO算法原理；了解Reward Model训练', 'InstructGPT论文 https://arxiv.org/abs/2203.02155\nPPO算法详解 https://spinningup.openai.com/en/algorithms/ppo.html\nRLHF教程 https://huggingface.co/blog/rlhf', 'RLHF、PPO算法、Reward Model、策略梯度'],
-    ['第5周', '开源模型实践', '学习使用LLAMA等开源模型；掌握模型部署方法；实践模型微调和推理', 'Hugging Face https://huggingface.co\nLLAMA模型 https://llama.meta.com\nOllama本地部署 https://ollama.com\nGGUF模型 https://github.com/ggerganov/llama.cpp', '开源模型、模型部署、模型微调、推理优化']
-])
-
-print('已生成12个周计划文档（含书籍信息和下载链接）！')
+    skeleton.save(doc, doc_path)
+
+def load_plans(data_path):
+    """
+    读取学习计划数据
+
+    数据格式（JSON 或 YAML）：
+        {"domains": [{"id": "01", "name": "工程项目整体管理", "weeks": [[周次, 学习主题, 具体内容, 学习资源, 主要概念], ...]}]}
+    可选字段 file 指定输出文件名（只取文件名部分），默认为"序号_领域_周计划.docx"。
+
+    Raises:
+        ValueError: 数据格式错误
+    """
+    with open(data_path, 'r', encoding='utf-8') as f:
+        if data_path.lower().endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("读取 YAML 数据文件需要安装 PyYAML：pip install pyyaml") from None
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+
+    domains = data.get('domains') if isinstance(data, dict) else data
+    if not isinstance(domains, list):
+        raise ValueError("数据文件中缺少 domains 列表")
+
+    seen = set()
+    filenames = set()
+    for index, domain in enumerate(domains, 1):
+        if not isinstance(domain, dict) or not domain.get('id') or not domain.get('name'):
+            raise ValueError(f"第 {index} 个学习领域缺少 id 或 name")
+        domain['id'] = str(domain['id'])
+        if domain['id'] in seen:
+            raise ValueError(f"学习领域 id 重复：{domain['id']}")
+        seen.add(domain['id'])
+        weeks = domain.get('weeks')
+        if not isinstance(weeks, list):
+            raise ValueError(f"{domain['name']}：weeks 必须是列表")
+        for row in weeks:
+            if not isinstance(row, list) or len(row) != len(headers):
+                raise ValueError(f"{domain['name']}：每周必须有 {len(headers)} 列（{'、'.join(headers)}）")
+        try:
+            filename = plan_filename(domain)
+        except ValueError as e:
+            raise ValueError(f"{domain['name']}：{e}") from None
+        if filename in filenames:
+            raise ValueError(f"{domain['name']}：输出文件名重复：{filename}")
+        filenames.add(filename)
+    return domains
+
+def plan_title(domain):
+    return f"{domain['name']} - 周学习计划"
+
+def _safe_filename(name):
+    """去掉文件名中不能出现的字符（包括路径分隔符和控制字符）"""
+    name = ''.join(c for c in str(name) if c not in UNSAFE_FILENAME_CHARS and c >= ' ')
+    return name.strip().rstrip('.')
+
+def plan_filename(domain):
+    """
+    输出文件名：file 字段只取文件名部分，数据中的路径（绝对路径、../）不能把文档写到输出目录之外
+
+    Raises:
+        ValueError: 去掉不安全字符后文件名为空
+    """
+    if domain.get('file'):
+        name = _safe_filename(str(domain['file']).replace('\\', '/').rsplit('/', 1)[-1])
+    else:
+        name = _safe_filename(f"{domain['id']}_{domain['name']}_周计划.docx")
+    # 以 . 开头的名字可能是 ..、隐藏文件或覆盖构建清单
+    if not name or name.startswith('.') or not os.path.splitext(name)[0].strip():
+        raise ValueError(f"无效的输出文件名：{domain.get('file') or domain['name']!r}")
+    return name
+
+def select_domains(domains, only):
+    """
+    按 --only 选择学习领域（逗号分隔，可重复），可以写序号（01 或 1）或领域名称
+
+    Raises:
+        ValueError: 没有匹配的学习领域
+    """
+    if not only:
+        return domains
+    selectors = [s.strip() for value in only for s in value.split(',') if s.strip()]
+    selected = []
+    for selector in selectors:
+        matches = [d for d in domains
+                   if selector in (d['id'], d['name'], d['id'].lstrip('0'))
+                   or os.path.splitext(plan_filename(d))[0] == selector]
+        if not matches:
+            raise ValueError(f"没有找到学习领域：{selector}")
+        selected.extend(d for d in matches if d not in selected)
+    return selected
+
+def _init_worker():
+    """工作进程启动时预先构建文档骨架"""
+    import docx_skeleton
+
+    docx_skeleton.get_skeleton('weekly_plan', build_plan_skeleton, key='|'.join(headers))
+
+def _build_item(item):
+    """在工作进程中生成一份文档，返回 (路径, 错误信息或 None)"""
+    doc_path, title, weeks_data = item
+    try:
+        create_weekly_plan(doc_path, title, weeks_data)
+        return doc_path, None
+    except Exception as e:
+        return doc_path, f"{type(e).__name__}: {e}"
+
+def build_plans(domains, output_dir, workers=None):
+    """
+    并行生成学习计划文档
+
+    周数多的文档先提交，逐个分配给空闲进程，总耗时接近最大的一份文档。
+
+    Args:
+        domains: 学习领域列表
+        output_dir: 输出目录
+        workers: 进程数，默认为 CPU 核数；为 1 时在当前进程内顺序生成
+
+    Yields:
+        (学习领域, 路径, 错误信息或 None)，按完成顺序
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = sorted(domains, key=lambda d: len(d['weeks']), reverse=True)
+    items = {d['id']: (os.path.join(output_dir, plan_filename(d)), plan_title(d), d['weeks']) for d in jobs}
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+
+    if workers <= 1:
+        for domain in jobs:
+            path, error = _build_item(items[domain['id']])
+            yield domain, path, error
+        return
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        futures = {executor.submit(_build_item, items[d['id']]): d for d in jobs}
+        for future in as_completed(futures):
+            path, error = future.result()
+            yield futures[future], path, error
+
+def plan_hash(domain):
+    """领域数据的哈希：生成器版本、表头、标题和每周内容，任何一项变化都要重新生成"""
+    payload = json.dumps([GENERATOR_VERSION, headers, plan_title(domain), domain['weeks']],
+                         ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def load_manifest(output_dir):
+    """读取构建清单 {文件名: {"id", "hash", "size", "mtime_ns"}}；不存在或损坏时返回空清单"""
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get('generator') != GENERATOR_VERSION:
+        return {}
+    documents = manifest.get('documents')
+    return documents if isinstance(documents, dict) else {}
+
+def save_manifest(output_dir, documents):
+    """原子写入构建清单"""
+    fd, tmp_path = tempfile.mkstemp(dir=output_dir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({"generator": GENERATOR_VERSION, "documents": documents}, f,
+                      ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, os.path.join(output_dir, MANIFEST_NAME))
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def _file_state(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+def _is_current(entry, path, digest):
+    """清单中的哈希一致，且文档仍是上次生成的那份（没有被删除或改动）"""
+    return (entry is not None and entry.get('hash') == digest
+            and _file_state(path) == (entry.get('size'), entry.get('mtime_ns')))
+
+def update_plans(domains, output_dir, workers=None, force=False, prune=False):
+    """
+    增量生成学习计划文档
+
+    Args:
+        domains: 要检查的学习领域
+        output_dir: 输出目录
+        workers: 进程数
+        force: 忽略构建清单，全部重新生成
+        prune: 删除清单中已不在 domains 里的文档（只在检查全部领域时使用）
+
+    Returns:
+        {"built": [路径], "skipped": [路径], "failed": [(路径, 错误信息)], "removed": [路径]}
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    documents = load_manifest(output_dir)
+    result = {"built": [], "skipped": [], "failed": [], "removed": []}
+
+    # 清单的键和查找、清理都使用同一个文件名
+    stale = []
+    digests = {}
+    filenames = {d['id']: plan_filename(d) for d in domains}
+    for domain in domains:
+        filename = filenames[domain['id']]
+        path = os.path.join(output_dir, filename)
+        digests[domain['id']] = digest = plan_hash(domain)
+        if not force and _is_current(documents.get(filename), path, digest):
+            result["skipped"].append(path)
+        else:
+            stale.append(domain)
+
+    changed = False
+    for domain, path, error in build_plans(stale, output_dir, workers):
+        filename = filenames[domain['id']]
+        if error is not None:
+            result["failed"].append((path, error))
+            if documents.pop(filename, None) is not None:
+                changed = True
+            continue
+        size, mtime_ns = _file_state(path)
+        documents[filename] = {"id": domain['id'], "hash": digests[domain['id']], "size": size, "mtime_ns": mtime_ns}
+        result["built"].append(path)
+        changed = True
+
+    if prune:
+        current = set(filenames.values())
+        for filename in [f for f in documents if f not in current]:
+            entry = documents.pop(filename)
+            path = os.path.join(output_dir, filename)
+            # 只删除输出目录中仍是本脚本生成的那份文档，被手动改动过的保留
+            if (filename == os.path.basename(filename) and isinstance(entry, dict)
+                    and _file_state(path) == (entry.get('size'), entry.get('mtime_ns'))):
+                os.remove(path)
+                result["removed"].append(path)
+            changed = True
+
+    if changed:
+        save_manifest(output_dir, documents)
+    return result
+
+def run_update(data_path, output_dir, only=None, workers=None, force=False):
+    """读取数据并增量生成，打印结果；返回是否全部成功"""
+    start = time.perf_counter()
+    try:
+        domains = select_domains(load_plans(data_path), only)
+        result = update_plans(domains, output_dir, workers, force=force, prune=not only)
+    except (OSError, ValueError) as e:
+        print(f"错误：{e}")
+        return False
+    elapsed = time.perf_counter() - start
+
+    for path in result["built"]:
+        print(f'已生成：{path}')
+    for path in result["removed"]:
+        print(f'已删除过期文档：{path}')
+    for path, error in result["failed"]:
+        print(f"❌ {path}：{error}")
+    print(f"已生成 {len(result['built'])} 个周计划文档，未变化 {len(result['skipped'])} 个，"
+          f"失败 {len(result['failed'])} 个，耗时 {elapsed:.2f} 秒")
+    return not result["failed"]
+
+def watch(data_path, output_dir, only=None, workers=None, interval=0.25):
+    """轮询数据文件，修改后增量生成；只检查文件的修改时间和大小，空闲时几乎没有开销"""
+    print(f"正在监视 {data_path}（Ctrl+C 退出）")
+    print("=" * 60)
+    last_state = None
+    try:
+        while True:
+            state = _file_state(data_path)
+            if state != last_state:
+                last_state = state
+                if state is None:
+                    print(f"错误：找不到数据文件 {data_path}")
+                else:
+                    print(time.strftime('[%H:%M:%S]'), "数据文件已更新")
+                    run_update(data_path, output_dir, only, workers)
+                print("-" * 60)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("已停止监视")
+
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='根据学习计划数据生成各学习领域的周计划文档')
+    parser.add_argument('--data', '-d', default=DEFAULT_DATA_PATH, help='学习计划数据文件（JSON 或 YAML）')
+    parser.add_argument('--output-dir', '-o', default=DEFAULT_OUTPUT_DIR, help='输出目录，默认为 detail/')
+    parser.add_argument('--only', action='append', default=None,
+                        help='只生成指定的学习领域：序号或名称，逗号分隔，可重复')
+    parser.add_argument('--workers', '-w', type=int, default=None, help='进程数，默认为 CPU 核数')
+    parser.add_argument('--force', '-f', action='store_true', help='忽略构建清单，全部重新生成')
+    parser.add_argument('--watch', action='store_true', help='监视数据文件，保存后只重新生成有变化的文档')
+    parser.add_argument('--interval', type=float, default=0.25, help='监视模式的轮询间隔（秒）')
+    parser.add_argument('--list', '-l', action='store_true', help='列出数据文件中的学习领域')
+    args = parser.parse_args()
+
+    if args.list:
+        try:
+            domains = select_domains(load_plans(args.data), args.only)
+        except (OSError, ValueError) as e:
+            print(f"错误：{e}")
+            sys.exit(1)
+        for domain in domains:
+            print(f"  {domain['id']}  {domain['name']}（{len(domain['weeks'])} 周）")
+        return
+
+    if args.watch:
+        if args.force:
+            run_update(args.data, args.output_dir, args.only, args.workers, force=True)
+        watch(args.data, args.output_dir, args.only, args.workers, args.interval)
+        return
+
+    if not run_update(args.data, args.output_dir, args.only, args.workers, force=args.force):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    # 确保 Windows 环境下正确处理 UTF-8
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+学习计划生成测试：数据中的 file 字段不能把文档写到输出目录之外
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加脚本目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import generate_plans
+
+
+def _domain(domain_id, name, file=None):
+    domain = {"id": domain_id, "name": name, "weeks": [["第1周", "主题", "内容", "资源", "概念"]]}
+    if file is not None:
+        domain["file"] = file
+    return domain
+
+
+class PlanFilenameTest(unittest.TestCase):
+
+    def test_file_reduced_to_basename(self):
+        for file in ("../../escape.docx", "/tmp/escape.docx", "C:\\temp\\escape.docx", "sub/dir/escape.docx"):
+            self.assertEqual(generate_plans.plan_filename(_domain("01", "领域", file)), "escape.docx")
+
+    def test_unsafe_characters_removed(self):
+        self.assertEqual(generate_plans.plan_filename(_domain("01", "领域", 'a:b*?"<>|\n.docx')), "ab.docx")
+        self.assertEqual(generate_plans.plan_filename(_domain("0/1", "A/B")), "01_AB_周计划.docx")
+
+    def test_empty_name_rejected(self):
+        for file in ("../", "..", "?*", ".docx", ".plans_manifest.json"):
+            with self.assertRaises(ValueError):
+                generate_plans.plan_filename(_domain("01", "领域", file))
+
+    def test_load_plans_rejects_bad_and_duplicate_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "plans.json")
+            for domains in ([_domain("01", "领域", "../")],
+                            [_domain("01", "甲", "a/plan.docx"), _domain("02", "乙", "b/plan.docx")]):
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump({"domains": domains}, f, ensure_ascii=False)
+                with self.assertRaises(ValueError):
+                    generate_plans.load_plans(path)
+
+    def test_update_writes_inside_output_dir(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output_dir = os.path.join(tmp, "detail")
+            result = generate_plans.update_plans([_domain("01", "领域", "../escape.docx")], output_dir, workers=1)
+            self.assertEqual(result["built"], [os.path.join(output_dir, "escape.docx")])
+            self.assertFalse(os.path.exists(os.path.join(tmp, "escape.docx")))
+            # 第二次运行按同一文件名查到清单，直接跳过
+            result = generate_plans.update_plans([_domain("01", "领域", "../escape.docx")], output_dir, workers=1)
+            self.assertEqual(result["skipped"], [os.path.join(output_dir, "escape.docx")])
+
+
+class ManifestKeyTest(unittest.TestCase):
+
+    def test_prune_uses_manifest_file_names(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            generate_plans.update_plans([_domain("01", "领域", "plan_a.docx")], output_dir, workers=1)
+            result = generate_plans.update_plans([_domain("01", "领域", "plan_b.docx")], output_dir,
+                                                 workers=1, prune=True)
+            self.assertEqual(result["removed"], [os.path.join(output_dir, "plan_a.docx")])
+            self.assertEqual(sorted(generate_plans.load_manifest(output_dir)), ["plan_b.docx"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+评分历史统计分析（需要 numpy）
+把评分历史加载为"天数 × 类别"的稠密矩阵（类别顺序同 CATEGORY_WEIGHTS），用向量化运算计算：
+滚动 7 天 / 30 天均值、分位数、连续天数、类别间相关性、异常日
+
+多用户时逐个用户加载矩阵，群体统计使用固定大小的累加器（直方图和二阶矩），
+内存占用只与单个用户的天数有关，与用户数无关。
+"""
+
+import json
+import sys
+import os
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+import numpy as np
+
+# 添加技能目录到路径
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, script_dir)
+
+from daily_life_rater import CATEGORY_WEIGHTS, LOGS_DIR
+from log_store import LogStore, user_logs_dir
+
+CATEGORIES = list(CATEGORY_WEIGHTS.keys())
+
+# 群体分位数使用 0.1 分一档的直方图（0.0 ~ 10.0 共 101 档），精度 0.1 分
+SCORE_BINS = 101
+
+# 单个用户评分矩阵的内存上限（MB）
+DEFAULT_MEMORY_BUDGET_MB = 256
+
+
+class ScoreMatrix:
+    """单个用户的评分矩阵
+
+    scores[i, j] 为第 i 天（从 start 起算）类别 j 的当日平均分，当天没有记录时为 NaN；
+    totals[i] 为当日平均总分，counts[i] 为当日记录数。
+    """
+
+    def __init__(self, start: np.datetime64, scores: np.ndarray, totals: np.ndarray, counts: np.ndarray):
+        self.start = start
+        self.scores = scores
+        self.totals = totals
+        self.counts = counts
+
+    @property
+    def days(self) -> int:
+        return len(self.counts)
+
+    @property
+    def dates(self) -> np.ndarray:
+        return self.start + np.arange(self.days)
+
+    @property
+    def valid(self) -> np.ndarray:
+        """有记录的日子"""
+        return self.counts > 0
+
+    @classmethod
+    def from_rows(cls, batches: Iterable[List[tuple]], span: Tuple[Optional[str], Optional[str]],
+                  memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB) -> Optional["ScoreMatrix"]:
+        """
+        由 LogStore.iter_score_rows 的结果构建矩阵
+
+        span 为数据的 (最早日期, 最晚日期)（见 LogStore.date_span）：先按天数检查内存预算并分配矩阵，
+        再把每一批记录累加进去，内存占用只与天数有关，与记录数无关。
+        每行为 (日期, 各类别评分..., 总分)；同一天多条记录取平均。没有数据时返回 None。
+        """
+        first, last = span
+        if first is None or last is None:
+            return None
+
+        start = np.datetime64(first, "D")
+        n_days = int((np.datetime64(last, "D") - start).astype(int)) + 1
+        n_cols = len(CATEGORIES) + 1
+        needed_mb = n_days * (n_cols * 2 + 1) * 8 / 1024 / 1024
+        if needed_mb > memory_budget_mb:
+            raise MemoryError(f"评分矩阵需要约 {needed_mb:.0f}MB，超过预算 {memory_budget_mb}MB，请缩小日期范围")
+
+        counts = np.zeros(n_days, dtype=np.int64)
+        sums = np.zeros((n_days, n_cols))
+        for rows in batches:
+            if not rows:
+                continue
+            batch = np.array(rows, dtype=object)
+            day_idx = (batch[:, 0].astype("datetime64[D]") - start).astype(np.int64)
+            if day_idx.min() < 0 or day_idx.max() >= n_days:
+                raise ValueError("评分记录超出给定的日期范围")
+            counts += np.bincount(day_idx, minlength=n_days)
+            np.add.at(sums, day_idx, np.nan_to_num(batch[:, 1:].astype(np.float64)))
+        if not counts.any():
+            return None
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = sums / counts[:, None]
+        means[counts == 0] = np.nan
+
+        return cls(start, means[:, :-1].astype(np.float32), means[:, -1].astype(np.float32), counts)
+
+    @classmethod
+    def from_store(cls, store: LogStore, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                   memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB) -> Optional["ScoreMatrix"]:
+        # 先取日期跨度检查预算，超出时不读取任何记录
+        span = store.date_span(date_from, date_to)
+        return cls.from_rows(store.iter_score_rows(CATEGORIES, date_from, date_to), span, memory_budget_mb)
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """按天滚动均值（忽略没有记录的日子），窗口内没有数据时为 NaN"""
+    values = np.asarray(values, dtype=np.float64)
+    present = ~np.isnan(values)
+    filled = np.where(present, values, 0.0)
+
+    zeros = np.zeros((1,) + values.shape[1:])
+    value_sums = np.concatenate([zeros, np.cumsum(filled, axis=0)])
+    present_sums = np.concatenate([zeros, np.cumsum(present, axis=0)])
+
+    upper = np.arange(1, len(values) + 1)
+    lower = np.maximum(upper - window, 0)
+    totals = value_sums[upper] - value_sums[lower]
+    counts = present_sums[upper] - present_sums[lower]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, totals / counts, np.nan)
+
+
+def streaks(active: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """每列最长连续 True 天数和截至最后一天的当前连续天数"""
+    active = np.asarray(active, dtype=bool)
+    if active.ndim == 1:
+        active = active[:, None]
+    n_days, n_cols = active.shape
+
+    padded = np.zeros((n_days + 2, n_cols), dtype=np.int8)
+    padded[1:-1] = active
+    edges = np.diff(padded, axis=0)
+    # 转置后 nonzero 按列、再按天排序，起止点一一对应
+    start_cols, start_days = np.nonzero(edges.T == 1)
+    _, end_days = np.nonzero(edges.T == -1)
+    lengths = end_days - start_days
+
+    longest = np.zeros(n_cols, dtype=np.int64)
+    np.maximum.at(longest, start_cols, lengths)
+    current = np.zeros(n_cols, dtype=np.int64)
+    ongoing = end_days == n_days
+    current[start_cols[ongoing]] = lengths[ongoing]
+    return longest, current
+
+
+def correlation(scores: np.ndarray) -> np.ndarray:
+    """类别间皮尔逊相关系数（只使用有记录的日子；某类别分数恒定时为 NaN）"""
+    rows = scores[~np.isnan(scores).any(axis=1)].astype(np.float64)
+    n_cols = scores.shape[1]
+    if len(rows) < 2:
+        return np.full((n_cols, n_cols), np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.corrcoef(rows, rowvar=False)
+
+
+def outlier_days(matrix: ScoreMatrix, threshold: float = 2.5) -> List[Tuple[str, float, float]]:
+    """总分 z 分数绝对值不小于 threshold 的日子：[(日期, 总分, z)]"""
+    valid = matrix.valid
+    totals = matrix.totals[valid].astype(np.float64)
+    if len(totals) < 2:
+        return []
+    std = totals.std()
+    if std == 0:
+        return []
+    z = (totals - totals.mean()) / std
+    hits = np.nonzero(np.abs(z) >= threshold)[0]
+    dates = matrix.dates[valid]
+    return [(str(dates[i]), round(float(totals[i]), 2), round(float(z[i]), 2)) for i in hits]
+
+
+def score_histogram(values: np.ndarray) -> np.ndarray:
+    """每列评分的直方图（SCORE_BINS 个 0.1 分的桶），忽略 NaN"""
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[:, None]
+    n_cols = values.shape[1]
+    present = ~np.isnan(values)
+    bins = np.clip(np.rint(np.where(present, values, 0) * 10), 0, SCORE_BINS - 1).astype(np.int64)
+    flat = (bins + np.arange(n_cols) * SCORE_BINS)[present]
+    return np.bincount(flat, minlength=n_cols * SCORE_BINS).reshape(n_cols, SCORE_BINS)
+
+
+def histogram_percentiles(histogram: np.ndarray, qs: Tuple[float, ...]) -> np.ndarray:
+    """由直方图求分位数（最近秩法），返回 [len(qs), 列数]"""
+    cumulative = np.cumsum(histogram, axis=1)
+    totals = cumulative[:, -1]
+    result = np.full((len(qs), histogram.shape[0]), np.nan)
+    for i, q in enumerate(qs):
+        rank = np.ceil(q / 100 * totals).clip(min=1)
+        idx = (cumulative < rank[:, None]).sum(axis=1)
+        result[i] = np.where(totals > 0, idx / 10, np.nan)
+    return result
+
+
+class CohortAccumulator:
+    """跨用户的群体统计，累加器大小固定：每日均值的直方图和二阶矩"""
+
+    def __init__(self, n_cols: int):
+        self.users = 0
+        self.days = 0
+        self.histogram = np.zeros((n_cols + 1, SCORE_BINS), dtype=np.int64)
+        self.sums = np.zeros(n_cols)
+        self.products = np.zeros((n_cols, n_cols))
+
+    def add(self, matrix: ScoreMatrix):
+        valid = matrix.valid
+        rows = matrix.scores[valid].astype(np.float64)
+        self.users += 1
+        self.days += len(rows)
+        self.histogram += score_histogram(np.column_stack([rows, matrix.totals[valid]]))
+        rows = np.nan_to_num(rows)
+        self.sums += rows.sum(axis=0)
+        self.products += rows.T @ rows
+
+    def means(self) -> np.ndarray:
+        return self.sums / self.days if self.days else np.full(len(self.sums), np.nan)
+
+    def correlation(self) -> np.ndarray:
+        if self.days < 2:
+            return np.full(self.products.shape, np.nan)
+        covariance = (self.products - np.outer(self.sums, self.sums) / self.days) / (self.days - 1)
+        std = np.sqrt(np.diag(covariance))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return covariance / np.outer(std, std)
+
+
+def summarize(matrix: ScoreMatrix, outlier_threshold: float = 2.5) -> Dict[str, Any]:
+    """单个用户的统计摘要"""
+    valid = matrix.valid
+    scores = matrix.scores
+    longest, current = streaks(np.nan_to_num(scores) > 0)
+    rolling_7 = rolling_mean(scores, 7)[-1]
+    rolling_30 = rolling_mean(scores, 30)[-1]
+    with np.errstate(invalid="ignore"):
+        percentiles = np.nanpercentile(scores[valid], [10, 50, 90], axis=0)
+
+    table = []
+    for j, category in enumerate(CATEGORIES):
+        table.append({
+            "category": category,
+            "mean": round(float(np.nanmean(scores[valid, j])), 2),
+            "p10": round(float(percentiles[0, j]), 2),
+            "p50": round(float(percentiles[1, j]), 2),
+            "p90": round(float(percentiles[2, j]), 2),
+            "mean_7d": round(float(rolling_7[j]), 2),
+            "mean_30d": round(float(rolling_30[j]), 2),
+            "longest_streak": int(longest[j]),
+            "current_streak": int(current[j])
+        })
+
+    return {
+        "start": str(matrix.start),
+        "end": str(matrix.dates[-1]),
+        "days": int(valid.sum()),
+        "entries": int(matrix.counts.sum()),
+        "total_mean": round(float(np.nanmean(matrix.totals)), 2),
+        "categories": table,
+        "correlations": top_correlations(correlation(scores)),
+        "outliers": outlier_days(matrix, outlier_threshold)
+    }
+
+
+def top_correlations(corr: np.ndarray, limit: int = 5, minimum: float = 0.3) -> List[Tuple[str, str, float]]:
+    """绝对值最大的若干对类别相关系数"""
+    i, j = np.triu_indices(len(CATEGORIES), k=1)
+    values = corr[i, j]
+    keep = ~np.isnan(values) & (np.abs(values) >= minimum)
+    order = np.argsort(-np.abs(values[keep]))[:limit]
+    return [(CATEGORIES[a], CATEGORIES[b], round(float(v), 2))
+            for a, b, v in zip(i[keep][order], j[keep][order], values[keep][order])]
+
+
+def analyze(stores: Dict[str, str], date_from: Optional[str] = None, date_to: Optional[str] = None,
+            memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB) -> Dict[str, Any]:
+    """
+    分析多个用户的评分历史
+
+    Args:
+        stores: {用户名: ratings.db 路径}
+    Returns:
+        {"users": {用户名: 摘要}, "cohort": 群体统计}
+    """
+    cohort = CohortAccumulator(len(CATEGORIES))
+    users = {}
+    for user, path in stores.items():
+        with LogStore(path) as store:
+            matrix = ScoreMatrix.from_store(store, date_from, date_to, memory_budget_mb)
+        if matrix is None:
+            continue
+        users[user] = summarize(matrix)
+        cohort.add(matrix)
+        del matrix
+
+    percentiles = histogram_percentiles(cohort.histogram, (10, 50, 90))
+    means = cohort.means()
+    cohort_table = [
+        {"category": category, "mean": round(float(means[j]), 2),
+         "p10": float(percentiles[0, j]), "p50": float(percentiles[1, j]), "p90": float(percentiles[2, j])}
+        for j, category in enumerate(CATEGORIES)
+    ]
+    return {
+        "users": users,
+        "cohort": {
+            "users": cohort.users,
+            "days": cohort.days,
+            "categories": cohort_table,
+            "total_p50": float(percentiles[1, -1]),
+            "correlations": top_correlations(cohort.correlation())
+        }
+    }
+
+
+def format_summary(result: Dict[str, Any]) -> str:
+    """把分析结果格式化为紧凑的文本表格"""
+    output = []
+    header = "类别 | 均值 | P10 | P50 | P90 | 近7天 | 近30天 | 最长连续 | 当前连续"
+
+    for user, summary in result["users"].items():
+        output.append("=" * 60)
+        output.append(f"{user}：{summary['start']} ~ {summary['end']}，"
+                      f"{summary['days']} 天 / {summary['entries']} 条，平均总分 {summary['total_mean']}")
+        output.append("=" * 60)
+        output.append(header)
+        output.append("-" * 60)
+        for row in summary["categories"]:
+            output.append(f"{row['category']} | {row['mean']} | {row['p10']} | {row['p50']} | {row['p90']} | "
+                          f"{row['mean_7d']} | {row['mean_30d']} | {row['longest_streak']} | {row['current_streak']}")
+        if summary["correlations"]:
+            output.append("相关性：" + "，".join(f"{a}-{b} {r:+.2f}" for a, b, r in summary["correlations"]))
+        if summary["outliers"]:
+            output.append("异常日：" + "，".join(f"{d}({t}, z={z:+.1f})" for d, t, z in summary["outliers"]))
+        output.append("")
+
+    cohort = result["cohort"]
+    if cohort["users"] > 1:
+        output.append("=" * 60)
+        output.append(f"群体：{cohort['users']} 人 / {cohort['days']} 天，总分中位数 {cohort['total_p50']}")
+        output.append("=" * 60)
+        output.append("类别 | 均值 | P10 | P50 | P90")
+        output.append("-" * 60)
+        for row in cohort["categories"]:
+            output.append(f"{row['category']} | {row['mean']} | {row['p10']} | {row['p50']} | {row['p90']}")
+        if cohort["correlations"]:
+            output.append("相关性：" + "，".join(f"{a}-{b} {r:+.2f}" for a, b, r in cohort["correlations"]))
+        output.append("")
+
+    return "\n".join(output)
+
+
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='评分历史统计分析')
+    parser.add_argument('--user', '-u', action='append', default=[],
+                        help='用户及其数据库，格式为 名称=路径，或只写用户名（使用该用户的日志目录），可重复；'
+                             '默认分析 logs/ratings.db')
+    parser.add_argument('--from', dest='date_from', type=str, help='起始日期 (YYYY-MM-DD)')
+    parser.add_argument('--to', dest='date_to', type=str, help='结束日期 (YYYY-MM-DD)')
+    parser.add_argument('--memory-budget', type=float, default=DEFAULT_MEMORY_BUDGET_MB,
+                        help='单个用户评分矩阵的内存上限 (MB)')
+    parser.add_argument('--json', action='store_true', help='输出 JSON')
+
+    args = parser.parse_args()
+
+    stores = {}
+    for spec in args.user:
+        name, sep, path = spec.partition('=')
+        if not sep:
+            try:
+                path = os.path.join(user_logs_dir(LOGS_DIR, name), 'ratings.db')
+            except ValueError:
+                print(f"用户参数格式应为 名称=路径 或用户名：{spec}")
+                sys.exit(1)
+        stores[name] = path
+    if not stores:
+        stores["默认"] = os.path.join(LOGS_DIR, 'ratings.db')
+
+    for name, path in stores.items():
+        if not os.path.exists(path):
+            print(f"数据库不存在：{path}")
+            sys.exit(1)
+
+    result = analyze(stores, args.date_from, args.date_to, args.memory_budget)
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print(format_summary(result))
+
+
+if __name__ == "__main__":
+    # 确保 Windows 环境下正确处理 UTF-8
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+    main()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+批量补录评分工具
+读取 JSONL 文件或目录中的 {date, text} 记录，使用进程池并行评分，按输入顺序输出结果
+"""
+
+import json
+import sys
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+# 添加技能目录到路径
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, script_dir)
+
+from daily_life_rater import generate_report, save_log, flush_logs
+from log_store import validate_user
+from metrics import METRICS, profile_call
+
+# 每处理多少条记录输出一次进度
+PROGRESS_INTERVAL = 1000
+
+
+def _iter_file_records(path: str) -> Iterator[Tuple[str, Any]]:
+    """逐条读取单个文件中的记录，产出 (来源位置, 原始记录)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield f"{path}:{line_no}", json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield f"{path}:{line_no}", e
+        else:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError as e:
+                yield path, e
+                return
+            if isinstance(data, list):
+                for idx, record in enumerate(data):
+                    yield f"{path}[{idx}]", record
+            else:
+                yield path, data
+
+
+def _validate_record(record: Any) -> Dict[str, str]:
+    """校验并规范化单条记录，不合法时抛出 ValueError"""
+    if isinstance(record, Exception):
+        raise ValueError(f"JSON 解析失败：{record}")
+    if not isinstance(record, dict):
+        raise ValueError("记录必须是包含 date 和 text 的对象")
+
+    text = record.get("text")
+    date = record.get("date")
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError("缺少 text 字段")
+    if not isinstance(date, str):
+        raise ValueError("缺少 date 字段")
+    # 统一为 YYYY-MM-DD
+    date = datetime.strptime(date.strip(), "%Y-%m-%d").strftime("%Y-%m-%d")
+
+    result = {"date": date, "text": text}
+    # 可选的 user 字段：日志写入该用户自己的目录
+    if record.get("user") is not None:
+        result["user"] = validate_user(record["user"])
+    return result
+
+
+def load_records(source: str, errors: Optional[List[str]] = None) -> List[Dict[str, str]]:
+    """
+    加载待评分记录
+
+    Args:
+        source: JSONL 文件，或包含 *.jsonl / *.json 文件的目录（按文件名顺序读取）
+        errors: 可选列表，收集无法解析的记录说明；为 None 时直接忽略
+
+    Returns:
+        [{"date": "YYYY-MM-DD", "text": "..."}]，保持输入顺序
+    """
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in sorted(os.listdir(source))
+                 if name.endswith('.jsonl') or name.endswith('.json')]
+    else:
+        paths = [source]
+
+    records = []
+    for path in paths:
+        for location, raw in _iter_file_records(path):
+            try:
+                records.append(_validate_record(raw))
+            except ValueError as e:
+                if errors is not None:
+                    errors.append(f"{location}: {e}")
+    return records
+
+
+def rate_record(record: Dict[str, str]) -> Dict[str, Any]:
+    """为单条记录评分（在工作进程中执行，不写日志）"""
+    return generate_report(record["text"], save_log_flag=False, date=record["date"])
+
+
+def rate_chunk(chunk: List[Dict[str, str]], collect_metrics: bool = False) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """在工作进程中为一批记录评分；collect_metrics 为 True 时一并返回本批的阶段统计"""
+    if collect_metrics:
+        METRICS.reset()
+        METRICS.enable()
+    reports = [rate_record(record) for record in chunk]
+    return reports, (METRICS.raw() if collect_metrics else None)
+
+
+def rate_records(records: List[Dict[str, str]], workers: Optional[int] = None,
+                 chunksize: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    并行评分，按输入顺序产出报告
+
+    Args:
+        records: load_records 返回的记录列表
+        workers: 进程数，默认为 CPU 核数；为 1 时在当前进程内顺序执行
+        chunksize: 每次分发给工作进程的记录数，默认按每个进程约 4 批计算
+    """
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(records) <= 1:
+        for record in records:
+            yield rate_record(record)
+        return
+
+    if chunksize is None:
+        chunksize = max(1, len(records) // (workers * 4))
+
+    chunks = [records[i:i + chunksize] for i in range(0, len(records), chunksize)]
+    collect = [METRICS.enabled] * len(chunks)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for reports, raw in executor.map(rate_chunk, chunks, collect):
+            if raw is not None:
+                METRICS.merge(raw)
+            yield from reports
+
+
+def run_batch(records: List[Dict[str, str]], output_path: Optional[str] = None,
+              workers: Optional[int] = None, chunksize: Optional[int] = None,
+              save_log_flag: bool = False, progress: bool = True) -> Dict[str, Any]:
+    """
+    执行批量评分并按顺序写出结果
+
+    报告写入 output_path（JSONL，每行一条，含原始输入）；
+    save_log_flag 为 True 时同时按记录自身日期写入 logs/output_YYYY-MM-DD.txt
+    （带 user 字段的记录写入该用户的日志目录）。
+    日志写入只在主进程中进行，保证同一天的多条记录顺序与输入一致。
+
+    Returns:
+        统计信息：{"total", "elapsed", "throughput", "workers"}
+    """
+    workers = workers or os.cpu_count() or 1
+    total = len(records)
+    start = time.perf_counter()
+
+    out = open(output_path, 'w', encoding='utf-8') if output_path else None
+    try:
+        for done, (record, report) in enumerate(
+                zip(records, rate_records(records, workers, chunksize)), 1):
+            if out:
+                line = dict(report, input=record["text"])
+                out.write(json.dumps(line, ensure_ascii=False) + '\n')
+            if save_log_flag:
+                save_log(record["text"], report, user=record.get("user"))
+            if progress and done % PROGRESS_INTERVAL == 0:
+                elapsed = time.perf_counter() - start
+                print(f"已评分 {done}/{total}（{done / elapsed:.0f} 条/秒）", file=sys.stderr)
+    finally:
+        if out:
+            out.close()
+        if save_log_flag:
+            flush_logs()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "total": total,
+        "elapsed": round(elapsed, 3),
+        "throughput": round(total / elapsed, 1) if elapsed > 0 else 0.0,
+        "workers": workers
+    }
+
+
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='批量补录每日作息评分')
+    parser.add_argument('source', type=str, help='JSONL 文件或包含 {date, text} 记录的目录')
+    parser.add_argument('--output', '-o', type=str, help='结果输出文件 (JSONL)')
+    parser.add_argument('--workers', '-w', type=int, default=None, help='工作进程数，默认为 CPU 核数')
+    parser.add_argument('--chunksize', type=int, default=None, help='每批分发的记录数')
+    parser.add_argument('--save-log', action='store_true', help='按记录日期写入 logs 日志')
+    parser.add_argument('--user', '-u', type=str, default=None, help='没有 user 字段的记录归属的用户')
+    parser.add_argument('--metrics', type=str, default=None,
+                        help='导出各阶段耗时统计（.json 为 JSON，其余为 Prometheus 文本格式）')
+    parser.add_argument('--profile', type=str, default=None,
+                        help='在单进程中运行并写出 cProfile 统计文件')
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.source):
+        print(f"输入不存在：{args.source}")
+        sys.exit(1)
+
+    if args.user is not None:
+        try:
+            validate_user(args.user)
+        except ValueError as e:
+            print(f"错误：{e}")
+            sys.exit(1)
+
+    errors = []
+    records = load_records(args.source, errors)
+    for error in errors:
+        print(f"跳过无效记录 {error}", file=sys.stderr)
+    if args.user is not None:
+        for record in records:
+            record.setdefault("user", args.user)
+
+    if not records:
+        print("没有可评分的记录")
+        sys.exit(1)
+
+    if args.metrics:
+        METRICS.enable()
+
+    if args.profile:
+        # 进程池中的评分不在主进程里执行，分析时改为单进程
+        stats = profile_call(args.profile, run_batch, records, args.output, 1,
+                             args.chunksize, args.save_log)
+    else:
+        stats = run_batch(records, args.output, args.workers, args.chunksize, args.save_log)
+
+    print("=" * 60)
+    print("批量评分完成")
+    print("-" * 60)
+    print(f"记录数：{stats['total']}（跳过 {len(errors)} 条）")
+    print(f"进程数：{stats['workers']}")
+    print(f"耗时：{stats['elapsed']} 秒")
+    print(f"吞吐：{stats['throughput']} 条/秒")
+    if args.output:
+        print(f"结果：{args.output}")
+    if args.metrics:
+        METRICS.export(args.metrics)
+        print(f"性能统计：{args.metrics}")
+    if args.profile:
+        print(f"性能分析：{args.profile}")
+    print()
+
+
+if __name__ == "__main__":
+    # 确保 Windows 环境下正确处理 UTF-8
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+    main()
@@ -6,12 +6,22 @@
 根据用户记录的活动自动计算评分
 """
 
+import functools
+import hashlib
 import json
 import sys
 import os
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterator, Optional, Tuple
 import re
+from collections import OrderedDict
+
+from keyword_matcher import KeywordMatcher
+from log_store import LogStore, user_logs_dir, validate_user
+from report_cache import ReportCache, make_key as make_cache_key
+from metrics import METRICS, profile_call
+from log_writer import LogWriter, DEFAULT_FLUSH_INTERVAL
+from report_model import Activity, CompactReport, OTHER_CATEGORY, RATINGS, rating_index
 
 # 确保在 Windows 上正确处理 UTF-8
 if sys.platform == 'win32':
@@ -22,10 +32,19 @@ if sys.platform == 'win32':
 # 日志文件夹路径
 LOGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs')
 
-# 创建 logs 文件夹（如果不存在）
-def ensure_logs_dir():
-    if not os.path.exists(LOGS_DIR):
-        os.makedirs(LOGS_DIR)
+# 各用户的结构化日志存储（None 为默认用户），首次写入时创建，最多同时打开 MAX_OPEN_STORES 个
+_log_stores: "OrderedDict[Optional[str], LogStore]" = OrderedDict()
+MAX_OPEN_STORES = 64
+
+# 文本日志组提交写入器，首次写入时创建
+_log_writer = None
+
+# 创建 logs 文件夹（如果不存在）；指定用户时创建该用户的日志目录
+def ensure_logs_dir(user: Optional[str] = None) -> str:
+    logs_dir = user_logs_dir(LOGS_DIR, user)
+    if not os.path.exists(logs_dir):
+        os.makedirs(logs_dir, exist_ok=True)
+    return logs_dir
 
 # 类别权重配置
 CATEGORY_WEIGHTS = {
@@ -51,127 +70,202 @@ CATEGORY_KEYWORDS = {
     "娱乐": ["电视", "电影", "游戏", "娱乐", "休闲", "放松", "音乐", "看电视", "看新闻"]
 }
 
+# 活动质量关键词
+QUALITY_KEYWORDS = ["完成", "很好", "优秀", "坚持", "持续", "深入", "规律", "跑了", "学习", "健康"]
+
+# 评分规则版本，修改评分逻辑时递增，使旧的缓存结果失效
+SCORING_VERSION = 1
+
+# 导入时一次性编译关键词自动机
+CATEGORY_MATCHER = KeywordMatcher(CATEGORY_KEYWORDS, ignore_case=True)
+QUALITY_MATCHER = KeywordMatcher({"质量": QUALITY_KEYWORDS})
+
+# 当前分类体系的指纹和版本哈希，见 taxonomy_version()
+_taxonomy_fingerprint = None
+_taxonomy_version = None
 
+# 评分结果缓存（内存 LRU），设为 None 可关闭；configure_cache() 可开启磁盘缓存
+REPORT_CACHE = ReportCache(maxsize=1024)
+
+# 活动切分：时间点活动（如"7点起床"）或句子分隔符，一个正则完成扫描
+ACTIVITY_TOKEN_PATTERN = re.compile(
+    r'(?P<hour>\d{1,2})[:点](?P<gap>\s*)(?P<content>[^，,；;。\n]+)'
+    r'|(?P<sep>[，,；;。\n])'
+)
+TIME_PREFIX_PATTERN = re.compile(r'\d{1,2}[:点]')
+
+
+def taxonomy_version() -> str:
+    """返回当前分类体系（权重、关键词、评分规则）的版本哈希
+
+    运行时修改了 CATEGORY_WEIGHTS / CATEGORY_KEYWORDS / QUALITY_KEYWORDS 时，
+    会重新编译关键词自动机，并得到新的版本号（旧缓存随之失效）。
+    """
+    global _taxonomy_fingerprint, _taxonomy_version, CATEGORY_MATCHER, QUALITY_MATCHER
+
+    fingerprint = hash((
+        tuple(CATEGORY_WEIGHTS.items()),
+        tuple((cat, tuple(keywords)) for cat, keywords in CATEGORY_KEYWORDS.items()),
+        tuple(QUALITY_KEYWORDS)
+    ))
+    if fingerprint != _taxonomy_fingerprint:
+        if _taxonomy_fingerprint is not None:
+            CATEGORY_MATCHER = KeywordMatcher(CATEGORY_KEYWORDS, ignore_case=True)
+            QUALITY_MATCHER = KeywordMatcher({"质量": QUALITY_KEYWORDS})
+        snapshot = json.dumps([SCORING_VERSION, CATEGORY_WEIGHTS, CATEGORY_KEYWORDS, QUALITY_KEYWORDS],
+                              ensure_ascii=False)
+        _taxonomy_version = hashlib.sha256(snapshot.encode("utf-8")).hexdigest()[:16]
+        _taxonomy_fingerprint = fingerprint
+    return _taxonomy_version
+
+
+def configure_cache(maxsize: int = 1024, disk_path: Optional[str] = None, enabled: bool = True):
+    """重新配置评分结果缓存；disk_path 指定时启用跨进程重启的磁盘缓存"""
+    global REPORT_CACHE
+    if REPORT_CACHE is not None:
+        REPORT_CACHE.close()
+    REPORT_CACHE = ReportCache(maxsize, disk_path) if enabled else None
+    return REPORT_CACHE
+
+
+@METRICS.timed("categorize_activity")
 def categorize_activity(activity: str) -> str:
     """根据活动内容判断类别"""
-    activity_lower = activity.lower()
-
-    # 检查每个类别的关键词
-    max_matches = 0
-    best_category = "其他"
-
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        matches = sum(1 for kw in keywords if kw.lower() in activity_lower)
-        if matches > max_matches:
-            max_matches = matches
-            best_category = category
-
-    return best_category
-
-
-def parse_activities(text: str) -> List[Dict[str, Any]]:
-    """解析用户输入的活动文本"""
-    activities = []
-
-    # 尝试匹配时间点的活动（如"7点起床"）
-    time_pattern = r'(\d{1,2})[:点]\s*([^，,；;。\n]+)'
-    time_matches = re.findall(time_pattern, text)
-
-    # 先处理时间点匹配的活动
-    time_contents = set()
-    for hour, content in time_matches:
-        if content.strip():
-            content_clean = content.strip()
-            time_contents.add(content_clean)
-            activities.append({
-                "time": f"{hour}:00",
-                "content": content_clean,
-                "category": categorize_activity(content_clean)
-            })
-
-    # 处理非时间点的句子，过滤掉已经被时间点匹配的内容
-    sentences = re.split(r'[，,；;。\n]', text)
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if sentence and not re.match(r'^\d{1,2}[:点]', sentence):
-            # 检查这个句子是否已经在时间点匹配中被包含
-            is_duplicate = False
-            for time_content in time_contents:
-                if time_content in sentence or sentence in time_content:
-                    is_duplicate = True
-                    break
-
-            if not is_duplicate:
-                activities.append({
-                    "time": None,
-                    "content": sentence,
-                    "category": categorize_activity(sentence)
-                })
-
-    return activities
+    # 一次扫描统计各类别命中的关键词数，命中最多者胜出，平局取靠前的类别
+    if METRICS.enabled:
+        METRICS.incr("keyword_scans")
+        METRICS.incr("keyword_scan_chars", len(activity))
+    return CATEGORY_MATCHER.best_group(activity, "其他")
+
+
+def tokenize_activities(text: str) -> Iterator[Tuple[Optional[str], str, int, int]]:
+    """单次扫描切分活动文本
+
+    按文本顺序产出 (小时, 内容, 起始偏移, 结束偏移)，未带时间点的活动小时为 None，
+    text[起始偏移:结束偏移] 即为去除首尾空白后的内容。
+    与时间点活动落在同一句中的句子视为重复，不再单独产出。
+    """
+    sent_start = 0
+    sent_has_timed = False
+
+    def flush(boundary: int):
+        raw = text[sent_start:boundary]
+        sentence = raw.strip()
+        if not sentence or sent_has_timed or TIME_PREFIX_PATTERN.match(sentence):
+            return None
+        start = sent_start + len(raw) - len(raw.lstrip())
+        return (None, sentence, start, start + len(sentence))
+
+    for m in ACTIVITY_TOKEN_PATTERN.finditer(text):
+        if m.lastgroup == "sep":
+            token = flush(m.start())
+            if token:
+                yield token
+            sent_start = m.end()
+            sent_has_timed = False
+            continue
+
+        # 时间点与内容之间的换行同样是句子边界
+        gap_start = m.start("gap")
+        for offset, ch in enumerate(m.group("gap")):
+            if ch == "\n":
+                token = flush(gap_start + offset)
+                if token:
+                    yield token
+                sent_start = gap_start + offset + 1
+                sent_has_timed = False
+
+        raw = m.group("content")
+        content = raw.strip()
+        if content:
+            start = m.start("content") + len(raw) - len(raw.lstrip())
+            sent_has_timed = True
+            yield (m.group("hour"), content, start, start + len(content))
+
+    token = flush(len(text))
+    if token:
+        yield token
+
+
+@METRICS.timed("parse_activities")
+def parse_activities(text: str, with_offsets: bool = False) -> List[Dict[str, Any]]:
+    """解析用户输入的活动文本
+
+    先返回带时间点的活动，再返回其余句子，各自保持文本顺序。
+    with_offsets 为 True 时，每个活动额外带上 "span": (起始偏移, 结束偏移)。
+    """
+    timed = []
+    untimed = []
+
+    for hour, content, start, end in tokenize_activities(text):
+        activity = {
+            "time": f"{hour}:00" if hour is not None else None,
+            "content": content,
+            "category": categorize_activity(content)
+        }
+        if with_offsets:
+            activity["span"] = (start, end)
+        (timed if hour is not None else untimed).append(activity)
+
+    return timed + untimed
 
 
 def rate_category(category: str, activities: List[Dict[str, Any]]) -> float:
     """为某个类别评分"""
-    category_activities = [a for a in activities if a["category"] == category]
+    return rate_contents([a["content"] for a in activities if a["category"] == category])
+
 
-    if not category_activities:
+@METRICS.timed("rate_category")
+def rate_contents(contents: List[str]) -> float:
+    """按同一类别下各活动的内容评分"""
+    if not contents:
         return 0.0
 
     # 根据活动数量和质量评分
     # 每个活动给5分基础分，最多2个活动后不再增加
-    base_score = min(len(category_activities) * 5, 10)
+    base_score = min(len(contents) * 5, 10)
 
     # 检查活动质量关键词
     quality_boost = 0
-    quality_keywords = ["完成", "很好", "优秀", "坚持", "持续", "深入", "规律", "跑了", "学习", "健康"]
-    for activity in category_activities:
-        if any(kw in activity["content"] for kw in quality_keywords):
+    if METRICS.enabled:
+        METRICS.incr("keyword_scans", len(contents))
+        METRICS.incr("keyword_scan_chars", sum(len(content) for content in contents))
+    for content in contents:
+        if QUALITY_MATCHER.contains_any(content):
             quality_boost += 1.0
 
     # 如果包含时间信息，给予额外加分
     time_boost = 0
-    for activity in category_activities:
-        if "小时" in activity["content"] or "h" in activity["content"]:
+    for content in contents:
+        if "小时" in content or "h" in content:
             time_boost += 1.0
-        if "分钟" in activity["content"] or "min" in activity["content"]:
+        if "分钟" in content or "min" in content:
             time_boost += 0.5
 
     score = min(base_score + quality_boost + time_boost, 10)
     return round(score, 1)
 
 
+def _weighted_total(category_scores) -> float:
+    return sum(score * CATEGORY_WEIGHTS[cat] for cat, score in category_scores)
+
+
+@METRICS.timed("calculate_total_score")
 def calculate_total_score(category_scores: Dict[str, float]) -> Dict[str, Any]:
     """计算总分"""
-    total = sum(score * CATEGORY_WEIGHTS[cat]
-                for cat, score in category_scores.items())
-
-    # 评级
-    if total >= 9:
-        rating = "优秀"
-    elif total >= 7:
-        rating = "良好"
-    elif total >= 5:
-        rating = "一般"
-    elif total >= 3:
-        rating = "较差"
-    else:
-        rating = "极差"
+    total = _weighted_total(category_scores.items())
 
     return {
         "total": round(total, 1),
-        "rating": rating
+        "rating": RATINGS[rating_index(total)]
     }
 
 
-def save_log(text: str, report: Dict[str, Any]):
-    """保存日志到文件"""
-    ensure_logs_dir()
-
-    # 生成日志文件名：output_YYYY-MM-DD.txt
-    today = datetime.now().strftime("%Y-%m-%d")
-    log_filename = f"output_{today}.txt"
-    log_path = os.path.join(LOGS_DIR, log_filename)
+def render_log_entry(text: str, report: Dict[str, Any], recorded_at: Optional[str] = None) -> str:
+    """把一条评分渲染为文本日志格式"""
+    today = report.get("date") or datetime.now().strftime("%Y-%m-%d")
+    if recorded_at is None:
+        recorded_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     # 准备日志内容
     log_content = []
@@ -226,71 +320,184 @@ def save_log(text: str, report: Dict[str, Any]):
 
     # 记录时间
     log_content.append("【记录时间】")
-    log_content.append(datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    log_content.append(recorded_at)
     log_content.append("")
     log_content.append("=" * 60)
     log_content.append("")
 
-    # 写入日志文件（追加模式）
+    return '\n'.join(log_content)
+
+
+def get_log_store(user: Optional[str] = None) -> LogStore:
+    """获取某个用户的结构化日志存储（每个进程每个用户共用一个连接，长期未用的连接会被关闭）"""
+    store = _log_stores.get(user)
+    if store is None:
+        logs_dir = ensure_logs_dir(user)
+        store = LogStore(os.path.join(logs_dir, 'ratings.db'))
+        _log_stores[user] = store
+        while len(_log_stores) > MAX_OPEN_STORES:
+            _, evicted = _log_stores.popitem(last=False)
+            evicted.close()
+    else:
+        _log_stores.move_to_end(user)
+    return store
+
+
+def get_log_writer() -> LogWriter:
+    """获取文本日志写入器（每个进程一个后台写入线程）"""
+    global _log_writer
+    if _log_writer is None:
+        _log_writer = LogWriter(DEFAULT_FLUSH_INTERVAL)
+    return _log_writer
+
+
+def configure_log_writer(flush_interval: float = DEFAULT_FLUSH_INTERVAL) -> LogWriter:
+    """调整文本日志的组提交刷新间隔（先写完旧写入器中的日志）"""
+    global _log_writer
+    if _log_writer is not None:
+        _log_writer.close()
+    _log_writer = LogWriter(flush_interval)
+    return _log_writer
+
+
+def flush_logs():
+    """等待已提交的文本日志全部写入文件"""
+    if _log_writer is not None:
+        _log_writer.flush()
+
+
+@METRICS.timed("save_log")
+def save_log(text: str, report: Dict[str, Any], text_log: bool = True, user: Optional[str] = None):
+    """保存日志
+
+    评分记录写入结构化存储 logs/ratings.db；
+    text_log 为 True 时同时追加可读的文本日志 logs/output_YYYY-MM-DD.txt。
+    指定 user 时写入该用户自己的日志目录（见 log_store.user_logs_dir），不与其他用户共用文件。
+    文本日志由后台写入器组提交，需要立即读取时先调用 flush_logs()。
+    """
+    logs_dir = ensure_logs_dir(user)
+    recorded_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
     try:
-        with open(log_path, 'a', encoding='utf-8') as f:
-            f.write('\n'.join(log_content))
+        get_log_store(user).append(text, report, recorded_at)
+        if METRICS.enabled:
+            METRICS.incr("store_writes")
+    except Exception as e:
+        print(f"保存结构化日志失败：{e}")
+
+    if not text_log:
+        return
+
+    # 生成日志文件名：output_YYYY-MM-DD.txt，以报告所属日期为准
+    today = report.get("date") or datetime.now().strftime("%Y-%m-%d")
+    log_filename = f"output_{today}.txt"
+    log_path = os.path.join(logs_dir, log_filename)
+
+    # 交给写入器追加（加锁、批量写入）
+    try:
+        entry = render_log_entry(text, report, recorded_at)
+        get_log_writer().append(log_path, entry)
+        if METRICS.enabled:
+            METRICS.incr("log_bytes_written", len(entry.encode('utf-8')))
     except Exception as e:
         print(f"保存日志失败：{e}")
 
 
-def generate_report(text: str, save_log_flag: bool = True) -> Dict[str, Any]:
-    """生成完整的评分报告"""
-    activities = parse_activities(text)
+def category_names() -> Tuple[str, ...]:
+    """当前类别表：带权重的类别按配置顺序，最后是"其他"（紧凑报告中的类别下标即为此表下标）
+
+    同一分类体系版本下总是返回同一个元组对象，所有紧凑报告共享这一份类别表。
+    """
+    return _category_table(taxonomy_version())[0]
+
+
+@functools.lru_cache(maxsize=8)
+def _category_table(version: str) -> Tuple[Tuple[str, ...], Dict[str, int]]:
+    """按分类体系版本缓存的 (类别表, 类别名 -> 下标)；版本由 taxonomy_version 计算，类别变化时随之变化"""
+    names = tuple(CATEGORY_WEIGHTS) + (OTHER_CATEGORY,)
+    return names, {name: i for i, name in enumerate(names)}
 
-    # 按类别分组
-    categories = {}
+
+@METRICS.timed("parse_activities")
+def parse_compact_activities(text: str, category_ids: Dict[str, int]) -> Tuple[Activity, ...]:
+    """与 parse_activities 相同的解析顺序，产出紧凑的 Activity 对象"""
+    timed = []
+    untimed = []
+    for hour, content, _, _ in tokenize_activities(text):
+        activity = Activity(hour, content, category_ids[categorize_activity(content)])
+        (timed if hour is not None else untimed).append(activity)
+    return tuple(timed + untimed)
+
+
+def build_compact_report(text: str, date: Optional[str] = None) -> CompactReport:
+    """解析并评分，返回紧凑报告"""
+    names, category_ids = _category_table(taxonomy_version())
+    activities = parse_compact_activities(text, category_ids)
+    if METRICS.enabled:
+        METRICS.incr("activities_parsed", len(activities))
+
+    # 按类别收集活动内容并评分
+    contents: List[List[str]] = [[] for _ in names]
     for activity in activities:
-        cat = activity["category"]
-        if cat not in categories:
-            categories[cat] = []
-        categories[cat].append(activity)
-
-    # 为每个类别评分
-    category_scores = {}
-    for category in CATEGORY_WEIGHTS.keys():
-        cat_activities = [a for a in activities if a["category"] == category]
-        category_scores[category] = rate_category(category, cat_activities)
-
-    # 计算总分
-    total_score = calculate_total_score(category_scores)
-
-    # 识别亮点
-    highlights = []
-    for cat, score in category_scores.items():
-        if score >= 8:
-            cat_activities = categories.get(cat, [])
-            if cat_activities:
-                highlights.append(f"{cat}方面表现优秀")
-
-    # 生成改进建议
-    suggestions = []
-    for cat, score in category_scores.items():
-        if score < 5 and score > 0:
-            suggestions.append(f"增加{cat}方面的投入")
-
-    result = {
-        "date": datetime.now().strftime("%Y-%m-%d"),
-        "activities": activities,
-        "categories": categories,
-        "category_scores": category_scores,
-        "total_score": total_score,
-        "highlights": highlights,
-        "suggestions": suggestions
-    }
+        contents[activity.category].append(activity.content)
+    scores = [rate_contents(contents[i]) for i in range(len(names) - 1)]
+
+    # 计算总分（评级按未取整的总分判断）
+    total = _weighted_total(zip(names, scores))
+
+    return CompactReport(date, activities, scores, round(total, 1), rating_index(total), names)
+
+
+def build_report(text: str) -> Dict[str, Any]:
+    """解析并评分，返回不含日期的报告内容"""
+    return build_compact_report(text).to_dict()
+
+
+@METRICS.timed("generate_report")
+def generate_report(text: str, save_log_flag: bool = True, date: Optional[str] = None,
+                    user: Optional[str] = None) -> Dict[str, Any]:
+    """生成完整的评分报告
+
+    date 为报告所属日期（YYYY-MM-DD），默认为今天；补录历史记录时传入原始日期。
+    user 为日志所属用户，默认写入单用户日志目录。
+    启用结果缓存时，规范化后相同的输入直接返回缓存的报告。
+    """
+    version = taxonomy_version()
+    if METRICS.enabled:
+        METRICS.incr("reports")
+
+    content = None
+    cache_key = None
+    if REPORT_CACHE is not None:
+        cache_key = make_cache_key(text, version)
+        content = REPORT_CACHE.get(cache_key)
+    if content is None:
+        if METRICS.enabled:
+            METRICS.incr("cache_misses" if cache_key is not None else "uncached_reports")
+        content = build_report(text)
+        if cache_key is not None:
+            REPORT_CACHE.put(cache_key, content)
+
+    result = {"date": date or datetime.now().strftime("%Y-%m-%d")}
+    result.update(content)
 
     # 保存日志
     if save_log_flag:
-        save_log(text, result)
+        save_log(text, result, user=user)
 
     return result
 
 
+def profile_report(text: str, output_path: str, **kwargs) -> Dict[str, Any]:
+    """在 cProfile 下生成一次报告（绕过结果缓存），统计数据写入 output_path"""
+    global REPORT_CACHE
+    cache, REPORT_CACHE = REPORT_CACHE, None
+    try:
+        return profile_call(output_path, generate_report, text, **kwargs)
+    finally:
+        REPORT_CACHE = cache
+
+
 def format_report(report: Dict[str, Any]) -> str:
     """格式化报告输出"""
     output = []
@@ -332,17 +539,150 @@ def format_report(report: Dict[str, Any]) -> str:
     return "\n".join(output)
 
 
-if __name__ == "__main__":
-    import sys
+# 流式模式可输出的字段（"input" 为原始输入文本）
+STREAM_FIELDS = ("date", "input", "activities", "categories", "category_scores",
+                 "total_score", "highlights", "suggestions")
+
+# 流式输出缓冲区大小（字节）
+STREAM_BUFFER_SIZE = 1 << 16
+
+
+def iter_stream_records(lines, input_format: str = "auto", errors=None) -> Iterator[Dict[str, Any]]:
+    """
+    逐行解析流式输入，产出 {"text": ..., "date": ..., "user": ...}（date、user 可能为 None）
+
+    Args:
+        lines: 可迭代的文本行（如 sys.stdin），逐行读取，不整体载入内存
+        input_format: "json" 每行一个 JSON 对象；"text" 每行一段活动描述；
+                      "auto" 以 { 开头的行按 JSON 解析，其余按文本处理
+        errors: 可选的文本流，写入无法解析的行的说明；为 None 时直接忽略
+    """
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+
+        if input_format == "text" or (input_format == "auto" and not line.startswith("{")):
+            yield {"text": line, "date": None, "user": None}
+            continue
+
+        try:
+            raw = json.loads(line)
+            if not isinstance(raw, dict):
+                raise ValueError("记录必须是 JSON 对象")
+            text = raw.get("text")
+            if not isinstance(text, str) or not text.strip():
+                raise ValueError("缺少 text 字段")
+            date = raw.get("date")
+            if date is not None:
+                datetime.strptime(date, "%Y-%m-%d")
+            user = raw.get("user")
+            if user is not None:
+                validate_user(user)
+        except (ValueError, TypeError) as e:
+            if errors is not None:
+                errors.write(f"错误：第 {line_no} 行：{e}\n")
+            continue
+
+        yield {"text": text, "date": date, "user": user}
+
+
+def stream_reports(records, save_log_flag: bool = True, fields: Optional[List[str]] = None,
+                   user: Optional[str] = None) -> Iterator[str]:
+    """为每条记录评分，逐条产出一行 JSON（不含换行符）；user 为未指定用户的记录的默认用户"""
+    for record in records:
+        report = generate_report(record["text"], save_log_flag=save_log_flag, date=record["date"],
+                                 user=record["user"] or user)
+        report["input"] = record["text"]
+        if fields:
+            report = {field: report[field] for field in fields}
+        yield json.dumps(report, ensure_ascii=False)
+
+
+def run_stream(input_stream, output_stream, input_format: str = "auto", save_log_flag: bool = True,
+               fields: Optional[List[str]] = None, line_buffered: bool = False, errors=None,
+               user: Optional[str] = None) -> int:
+    """
+    流式评分：从 input_stream 读入，每条记录向 output_stream 写一行 JSON
+
+    整个流程是生成器管道，内存占用与输入大小无关；输出按缓冲区批量写出，
+    下游读取变慢时写入会阻塞，自然形成背压。line_buffered 为 True 时每行立即刷新。
+
+    Returns:
+        输出的报告条数
+    """
+    count = 0
+    records = iter_stream_records(input_stream, input_format, errors)
+    for line in stream_reports(records, save_log_flag, fields, user):
+        output_stream.write(line)
+        output_stream.write("\n")
+        count += 1
+        if line_buffered:
+            output_stream.flush()
+    output_stream.flush()
+    if save_log_flag:
+        flush_logs()
+    return count
+
+
+def main():
+    """主函数"""
+    import argparse
     import io
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
-    # 测试示例
-    test_input = """
+    parser = argparse.ArgumentParser(description='每日作息评分')
+    parser.add_argument('--stream', action='store_true',
+                        help='流式模式：从标准输入逐行读取记录，每条记录向标准输出写一行 JSON 报告')
+    parser.add_argument('--input-format', choices=['auto', 'json', 'text'], default='auto',
+                        help='输入格式：json 每行 {"text": ..., "date": ...}；text 每行一段描述；auto 自动判断')
+    parser.add_argument('--fields', type=str, default=None,
+                        help=f'输出字段，逗号分隔（可选：{",".join(STREAM_FIELDS)}），默认全部')
+    parser.add_argument('--no-log', action='store_true', help='不写入评分日志')
+    parser.add_argument('--user', '-u', type=str, default=None, help='日志所属用户（JSON 记录中的 user 字段优先）')
+    parser.add_argument('--line-buffered', action='store_true', help='每条报告立即刷新输出（交互使用）')
+
+    args = parser.parse_args()
+
+    if args.user is not None:
+        try:
+            validate_user(args.user)
+        except ValueError as e:
+            print(f"错误：{e}", file=sys.stderr)
+            sys.exit(1)
+
+    if not args.stream:
+        # 测试示例
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+        test_input = """
     今天早上7点起床，跑了5公里；8点吃健康早餐；9点开始工作，
     完成了项目报告；中午陪孩子做作业1小时；下午学习了Python编程2小时；
     晚上做了晚饭；和家人一起看电视；11点睡觉
     """
 
-    report = generate_report(test_input)
-    print(format_report(report))
+        report = generate_report(test_input, save_log_flag=not args.no_log, user=args.user)
+        print(format_report(report))
+        return
+
+    fields = None
+    if args.fields:
+        fields = [field.strip() for field in args.fields.split(',') if field.strip()]
+        unknown = [field for field in fields if field not in STREAM_FIELDS]
+        if unknown:
+            print(f"错误：未知字段 {', '.join(unknown)}", file=sys.stderr)
+            sys.exit(1)
+
+    input_stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', errors='replace')
+    output_stream = open(sys.stdout.fileno(), 'w', encoding='utf-8',
+                         buffering=STREAM_BUFFER_SIZE, closefd=False)
+    try:
+        run_stream(input_stream, output_stream, args.input_format, not args.no_log,
+                   fields, args.line_buffered, errors=sys.stderr, user=args.user)
+    except BrokenPipeError:
+        # 下游提前退出（如 | head）：剩余输出丢弃到 devnull，静默结束
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+多模式关键词匹配器
+基于 Aho-Corasick 自动机，一次线性扫描即可找出文本中命中的全部关键词
+按字符（而非字节）建树，中文关键词无需分词
+"""
+
+from typing import Dict, List, Sequence, Set, Tuple
+
+
+class KeywordMatcher:
+    """按分组编译的关键词自动机
+
+    groups 为 {分组名: [关键词, ...]}，分组顺序即判定平局时的优先顺序。
+    同一分组内重复出现的关键词按出现次数计数，与逐个 `kw in text` 求和的结果一致。
+    """
+
+    def __init__(self, groups: Dict[str, Sequence[str]], ignore_case: bool = False):
+        self.ignore_case = ignore_case
+        self.labels: List[str] = list(groups.keys())
+
+        # 去重后的模式串，以及每个模式串对应的 (分组下标, 次数)
+        self.patterns: List[str] = []
+        pattern_ids: Dict[str, int] = {}
+        pattern_groups: List[Dict[int, int]] = []
+        # 空关键词在任何文本中都算命中
+        self._always: List[int] = []
+
+        for group_idx, keywords in enumerate(groups.values()):
+            for kw in keywords:
+                if ignore_case:
+                    kw = kw.lower()
+                pid = pattern_ids.get(kw)
+                if pid is None:
+                    pid = len(self.patterns)
+                    pattern_ids[kw] = pid
+                    self.patterns.append(kw)
+                    pattern_groups.append({})
+                    if not kw:
+                        self._always.append(pid)
+                counts = pattern_groups[pid]
+                counts[group_idx] = counts.get(group_idx, 0) + 1
+
+        self._pattern_groups: List[Tuple[Tuple[int, int], ...]] = [
+            tuple(counts.items()) for counts in pattern_groups
+        ]
+        self._build()
+
+    def _build(self):
+        """构建 goto / fail / output 表"""
+        goto: List[Dict[str, int]] = [{}]
+        output: List[List[int]] = [[]]
+
+        for pid, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    output.append([])
+                state = nxt
+            output[state].append(pid)
+
+        # 广度优先计算失败指针，并把后缀节点的输出合并进来
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                output[nxt].extend(output[fail[nxt]])
+
+        self._goto = goto
+        self._fail = fail
+        self._output: List[Tuple[int, ...]] = [tuple(o) for o in output]
+
+    def _prepare(self, text: str) -> str:
+        return text.lower() if self.ignore_case else text
+
+    def find(self, text: str) -> Set[int]:
+        """返回文本中命中的模式串下标集合"""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+
+        found = set(self._always)
+        state = 0
+        for ch in self._prepare(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+    def contains_any(self, text: str) -> bool:
+        """文本中是否包含任一关键词（命中即返回）"""
+        if self._always:
+            return True
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+
+        state = 0
+        for ch in self._prepare(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                return True
+        return False
+
+    def count_by_group(self, text: str) -> List[int]:
+        """按分组统计命中的关键词个数"""
+        counts = [0] * len(self.labels)
+        pattern_groups = self._pattern_groups
+        for pid in self.find(text):
+            for group_idx, n in pattern_groups[pid]:
+                counts[group_idx] += n
+        return counts
+
+    def best_group(self, text: str, default: str) -> str:
+        """返回命中最多的分组；平局取靠前的分组，全无命中返回 default"""
+        max_matches = 0
+        best = default
+        for label, matches in zip(self.labels, self.count_by_group(text)):
+            if matches > max_matches:
+                max_matches = matches
+                best = label
+        return best
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+文本日志归档
+把已结束月份的 output_YYYY-MM-DD.txt 打包为压缩段文件 archive/output_YYYY-MM.<代>.seg：
+每天的日志是一个可独立解压的帧（raw deflate + 预置字典），
+索引 archive/output_YYYY-MM.idx 记录当前段文件名和 日期 -> (偏移, 压缩长度, 原始长度, CRC32)，
+查看某一天只需解压这一帧。
+
+重新归档某月时段文件写到新的代号下，原子替换索引完成切换后再删除旧段文件，
+中途崩溃时索引仍指向完整的旧段。
+"""
+
+import json
+import os
+import re
+import sys
+import zlib
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+from log_writer import lock_file, unlock_file
+
+ARCHIVE_DIR_NAME = 'archive'
+
+# 段文件格式版本，决定帧的压缩方式和预置字典
+ARCHIVE_VERSION = 1
+
+COMPRESS_LEVEL = 9
+
+LOG_FILE_PATTERN = re.compile(r'^output_(\d{4}-\d{2})-(\d{2})\.txt$')
+
+# 预置字典：日志里反复出现的固定文本，单条记录的小帧也能获得较高压缩率。
+# 字典一经发布不可修改（旧段文件依赖它解压），调整时应递增 ARCHIVE_VERSION 并保留旧字典。
+_ZDICT_PARTS = [
+    "=" * 60, "-" * 60,
+    "每日作息评分日志 - ",
+    "【输入内容】", "【活动分类汇总】", "【评分详情】", "【综合评分】",
+    "【亮点】", "【改进建议】", "【记录时间】",
+    "家庭: ", "自我提升: ", "健康: ", "学习: ", "工作: ", "生活技巧: ", "社交: ", "娱乐: ", "其他: ",
+    "家庭: 0.0/10 (权重20%)", "自我提升: 0.0/10 (权重20%)", "健康: 0.0/10 (权重25%)",
+    "学习: 0.0/10 (权重15%)", "工作: 0.0/10 (权重10%)", "生活技巧: 0.0/10 (权重5%)",
+    "社交: 0.0/10 (权重3%)", "娱乐: 0.0/10 (权重2%)",
+    "/10 - 优秀", "/10 - 良好", "/10 - 一般", "/10 - 较差", "/10 - 极差",
+    "✓ 家庭方面表现优秀", "✓ 自我提升方面表现优秀", "✓ 健康方面表现优秀", "✓ 学习方面表现优秀",
+    "• 增加家庭方面的投入", "• 增加自我提升方面的投入", "• 增加健康方面的投入", "• 增加学习方面的投入",
+    "• 增加工作方面的投入", "• 增加生活技巧方面的投入", "• 增加社交方面的投入", "• 增加娱乐方面的投入",
+    "起床", "睡觉", "早餐", "工作", "学习", "小时", "分钟", "跑步", "孩子", "家人",
+]
+ZDICTS = {1: "\n".join(_ZDICT_PARTS).encode('utf-8')}
+
+
+def compress_frame(data: bytes, version: int = ARCHIVE_VERSION) -> bytes:
+    compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, -15, zdict=ZDICTS[version])
+    return compressor.compress(data) + compressor.flush()
+
+
+def decompress_frame(frame: bytes, version: int = ARCHIVE_VERSION) -> bytes:
+    decompressor = zlib.decompressobj(-15, zdict=ZDICTS[version])
+    return decompressor.decompress(frame) + decompressor.flush()
+
+
+def segment_paths(logs_dir: str, month: str) -> Tuple[str, str]:
+    """返回某月旧格式（不带代号）的段文件和索引文件路径"""
+    archive_dir = os.path.join(logs_dir, ARCHIVE_DIR_NAME)
+    base = os.path.join(archive_dir, f"output_{month}")
+    return f"{base}.seg", f"{base}.idx"
+
+
+def segment_path(logs_dir: str, month: str, index: Dict[str, Any]) -> str:
+    """索引当前指向的段文件路径（旧索引没有 segment 字段，使用不带代号的段文件）"""
+    name = index.get("segment") or f"output_{month}.seg"
+    return os.path.join(logs_dir, ARCHIVE_DIR_NAME, name)
+
+
+def load_index(logs_dir: str, month: str) -> Optional[Dict[str, Any]]:
+    """读取某月索引，不存在时返回 None"""
+    _, idx_path = segment_paths(logs_dir, month)
+    if not os.path.exists(idx_path):
+        return None
+    with open(idx_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def read_archived(logs_dir: str, date: str) -> Optional[str]:
+    """读取某天已归档的日志，只解压对应的一帧；未归档时返回 None"""
+    month = date[:7]
+    for attempt in range(2):
+        index = load_index(logs_dir, month)
+        if index is None or date not in index["entries"]:
+            return None
+
+        offset, length, size, crc = index["entries"][date]
+        try:
+            with open(segment_path(logs_dir, month, index), 'rb') as f:
+                f.seek(offset)
+                frame = f.read(length)
+            break
+        except FileNotFoundError:
+            # 读索引和打开段文件之间恰好完成了一次重新归档，重新读取索引
+            if attempt:
+                raise
+
+    data = decompress_frame(frame, index["version"])
+    if len(data) != size or zlib.crc32(data) != crc:
+        raise ValueError(f"归档数据校验失败：{date}")
+    return data.decode('utf-8')
+
+
+def archived_dates(logs_dir: str) -> List[str]:
+    """列出所有已归档的日期"""
+    archive_dir = os.path.join(logs_dir, ARCHIVE_DIR_NAME)
+    if not os.path.exists(archive_dir):
+        return []
+
+    dates = []
+    for name in os.listdir(archive_dir):
+        if name.startswith('output_') and name.endswith('.idx'):
+            index = load_index(logs_dir, name[len('output_'):-len('.idx')])
+            dates.extend(index["entries"].keys())
+    return dates
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _remove_stale_segments(logs_dir: str, month: str, current: str):
+    """删除该月不再被索引引用的段文件（旧代号，或上次崩溃时写了一半的新段）"""
+    archive_dir = os.path.join(logs_dir, ARCHIVE_DIR_NAME)
+    pattern = re.compile(rf'^output_{re.escape(month)}(\.\d+)?\.seg$')
+    for name in os.listdir(archive_dir):
+        if name != current and pattern.match(name):
+            try:
+                os.remove(os.path.join(archive_dir, name))
+            except OSError:
+                pass
+
+
+def archive_month(logs_dir: str, month: str, files: List[str]) -> Dict[str, int]:
+    """
+    把某月的日志文件打包进段文件
+
+    段文件已存在时（例如补录了已归档月份的记录），新内容追加到对应日期之后，写出新一代段文件。
+    读取到删除期间一直持有与 log_writer.append_locked 相同的文件锁，期间的补录追加会等到
+    文件删除后写入新文件，留给下次归档；段文件和索引都写好之后才删除原始文本文件，中途失败不会丢数据。
+    """
+    days: Dict[str, bytes] = {}
+
+    existing = load_index(logs_dir, month)
+    if existing is not None:
+        for date in existing["entries"]:
+            days[date] = read_archived(logs_dir, date).encode('utf-8')
+
+    raw_bytes = 0
+    locked = []
+    try:
+        for path in files:
+            date = os.path.basename(path)[len('output_'):-len('.txt')]
+            f = open(path, 'r+b')
+            locked.append(f)
+            lock_file(f)
+            f.seek(0)
+            data = f.read()
+            raw_bytes += len(data)
+            days[date] = days.get(date, b"") + data
+
+        segment = bytearray()
+        entries = {}
+        for date in sorted(days):
+            data = days[date]
+            frame = compress_frame(data)
+            entries[date] = [len(segment), len(frame), len(data), zlib.crc32(data)]
+            segment += frame
+
+        # 新段写到下一代文件名，替换索引即完成切换
+        generation = (existing or {}).get("generation", 0) + 1
+        segment_name = f"output_{month}.{generation}.seg"
+        _, idx_path = segment_paths(logs_dir, month)
+        os.makedirs(os.path.dirname(idx_path), exist_ok=True)
+        _write_atomic(os.path.join(os.path.dirname(idx_path), segment_name), bytes(segment))
+        index = {"version": ARCHIVE_VERSION, "month": month, "generation": generation,
+                 "segment": segment_name, "entries": entries}
+        _write_atomic(idx_path, json.dumps(index, ensure_ascii=False).encode('utf-8'))
+        _remove_stale_segments(logs_dir, month, segment_name)
+
+        if sys.platform != 'win32':
+            # 持有锁时删除：等待中的追加拿到锁后会发现文件已删除，转而写入新文件
+            for path in files:
+                os.remove(path)
+    finally:
+        for f in locked:
+            try:
+                unlock_file(f)
+            finally:
+                f.close()
+
+    if sys.platform == 'win32':
+        # Windows 下打开中的文件不能删除，只能解锁关闭后再删
+        for path in files:
+            os.remove(path)
+
+    return {"files": len(files), "raw_bytes": raw_bytes, "segment_bytes": len(segment)}
+
+
+def archive_logs(logs_dir: str, before_month: Optional[str] = None) -> Dict[str, Any]:
+    """
+    归档 before_month（YYYY-MM，默认为本月）之前所有月份的文本日志
+
+    Returns:
+        {"months": [...], "files": 文件数, "raw_bytes": 原始字节数, "segment_bytes": 压缩后字节数}
+    """
+    if before_month is None:
+        before_month = datetime.now().strftime("%Y-%m")
+
+    by_month: Dict[str, List[str]] = {}
+    if os.path.exists(logs_dir):
+        for name in os.listdir(logs_dir):
+            m = LOG_FILE_PATTERN.match(name)
+            if m and m.group(1) < before_month:
+                by_month.setdefault(m.group(1), []).append(os.path.join(logs_dir, name))
+
+    summary = {"months": [], "files": 0, "raw_bytes": 0, "segment_bytes": 0}
+    for month in sorted(by_month):
+        stats = archive_month(logs_dir, month, sorted(by_month[month]))
+        summary["months"].append(month)
+        summary["files"] += stats["files"]
+        summary["raw_bytes"] += stats["raw_bytes"]
+        summary["segment_bytes"] += stats["segment_bytes"]
+    return summary
+
+
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='归档已结束月份的评分日志')
+    parser.add_argument('--logs-dir', type=str,
+                        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs'),
+                        help='日志目录')
+    parser.add_argument('--before', type=str, default=None, help='归档该月份 (YYYY-MM) 之前的日志，默认为本月')
+    parser.add_argument('--user', '-u', type=str, default=None, help='只归档该用户的日志')
+
+    args = parser.parse_args()
+
+    from log_store import user_logs_dir
+    try:
+        logs_dir = user_logs_dir(args.logs_dir, args.user)
+    except ValueError as e:
+        print(f"错误：{e}")
+        sys.exit(1)
+
+    summary = archive_logs(logs_dir, args.before)
+    if not summary["months"]:
+        print("没有需要归档的日志")
+        return
+
+    print(f"已归档 {len(summary['months'])} 个月、{summary['files']} 个日志文件")
+    print(f"月份：{'、'.join(summary['months'])}")
+    if summary["segment_bytes"]:
+        print(f"新增原始 {summary['raw_bytes']} 字节，段文件合计 {summary['segment_bytes']} 字节")
+
+
+if __name__ == "__main__":
+    # 确保 Windows 环境下正确处理 UTF-8
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+    main()
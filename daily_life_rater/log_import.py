@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+文本日志导入
+把 save_log 写出的 output_YYYY-MM-DD.txt（以及已归档的段文件）逐条解析为结构化记录，
+批量写入 ratings.db。文件按行流式读取、分批提交，多个文件由进程池并行处理；
+重复运行不会产生重复记录，格式错误的条目只报告并跳过。
+"""
+
+import hashlib
+import os
+import re
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
+
+# 添加技能目录到路径
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, script_dir)
+
+from log_archive import LOG_FILE_PATTERN, archived_dates, read_archived
+from log_store import LogStore, user_logs_dir
+
+SEPARATOR = "=" * 60
+RULE = "-" * 60
+TITLE_PREFIX = "每日作息评分日志 - "
+
+SCORE_LINE_PATTERN = re.compile(r'^(.+): (\d+(?:\.\d+)?)/10 \(权重\d+%\)$')
+TOTAL_LINE_PATTERN = re.compile(r'^(\d+(?:\.\d+)?)/10 - (\S+)$')
+
+# 每个事务写入的记录数
+IMPORT_BATCH_SIZE = 1000
+
+
+class MalformedEntry(ValueError):
+    """无法解析的日志条目，line 为出错行相对条目起始行的偏移"""
+
+    def __init__(self, message: str, line: int = 0):
+        super().__init__(message)
+        self.line = line
+
+
+def _number(value: str):
+    # 与评分时的数值类型保持一致：日志中的 5 是整数，5.0 是浮点数
+    return float(value) if '.' in value else int(value)
+
+
+def split_entries(lines: Iterable[str]) -> Iterator[Tuple[int, List[str]]]:
+    """
+    把日志行流切分为条目，逐条产出 (起始行号, 条目各行)
+
+    条目以 分隔线 / 标题行 / 分隔线 三行开头；只缓存当前一条，内存占用与文件大小无关。
+    第一条之前的内容作为一个不以标题开头的条目产出，由解析时报告。
+    """
+    buffer: List[str] = []
+    start = 1
+    for line_no, line in enumerate(lines, 1):
+        line = line.rstrip('\n')
+        # 分隔线、标题行、分隔线：新条目开始，之前缓存的是上一条
+        if (line == SEPARATOR and len(buffer) >= 2 and buffer[-1].startswith(TITLE_PREFIX)
+                and buffer[-2] == SEPARATOR):
+            previous = buffer[:-2]
+            if any(previous):
+                yield start, previous
+            buffer = [SEPARATOR, buffer[-1]]
+            start = line_no - 2
+        buffer.append(line)
+
+    if any(buffer):
+        yield start, buffer
+
+
+def _section(lines: List[str], index: int, title: str) -> int:
+    """检查 lines[index] 是某个小节标题且下一行是横线，返回小节内容的起始位置"""
+    if index >= len(lines) or lines[index] != title:
+        raise MalformedEntry(f"缺少 {title}", index)
+    if index + 1 >= len(lines) or lines[index + 1] != RULE:
+        raise MalformedEntry(f"{title} 后缺少分隔线", index + 1)
+    return index + 2
+
+
+def _until_blank(lines: List[str], index: int, title: str) -> Tuple[List[str], int]:
+    """读取小节内容直到空行，返回 (内容各行, 空行之后的位置)"""
+    end = index
+    while end < len(lines) and lines[end] != "":
+        end += 1
+    if end >= len(lines):
+        raise MalformedEntry(f"{title} 未正常结束", end)
+    return lines[index:end], end + 1
+
+
+def parse_entry(lines: List[str]) -> Tuple[str, Dict[str, Any], str]:
+    """
+    把一条日志解析为 (输入文本, 报告, 记录时间)
+
+    报告与 generate_report 的结构相同，可直接写入 LogStore。日志中只有各类别活动内容，
+    没有时间点，还原的活动 time 为 None。格式不符时抛出 MalformedEntry。
+    """
+    if len(lines) < 4 or lines[0] != SEPARATOR or not lines[1].startswith(TITLE_PREFIX) or lines[2] != SEPARATOR:
+        raise MalformedEntry("缺少日志标题")
+    date = lines[1][len(TITLE_PREFIX):]
+    try:
+        datetime.strptime(date, "%Y-%m-%d")
+    except ValueError:
+        raise MalformedEntry(f"无效的日期：{date}", 1)
+
+    if len(lines) < 5 or lines[4] != "【输入内容】":
+        raise MalformedEntry("缺少 【输入内容】", 4)
+
+    # 输入内容可能有多行，以最后一个【活动分类汇总】为界（之后的小节格式固定）
+    try:
+        summary_index = len(lines) - 1 - lines[::-1].index("【活动分类汇总】")
+    except ValueError:
+        raise MalformedEntry("缺少 【活动分类汇总】", len(lines) - 1)
+    if summary_index < 6 or lines[summary_index - 1] != "":
+        raise MalformedEntry("【输入内容】 未正常结束", summary_index)
+    text = "\n".join(lines[5:summary_index - 1])
+
+    index = _section(lines, summary_index, "【活动分类汇总】")
+    category_lines, index = _until_blank(lines, index, "【活动分类汇总】")
+    activities = []
+    categories = {}
+    for offset, line in enumerate(category_lines):
+        category, sep, contents = line.partition(": ")
+        if not sep:
+            raise MalformedEntry(f"无法解析的分类行：{line}", summary_index + 2 + offset)
+        group = [{"time": None, "content": content, "category": category}
+                 for content in contents.split("、")]
+        activities.extend(group)
+        categories[category] = group
+
+    detail_index = index
+    index = _section(lines, index, "【评分详情】")
+    score_lines, index = _until_blank(lines, index, "【评分详情】")
+    category_scores = {}
+    for offset, line in enumerate(score_lines):
+        m = SCORE_LINE_PATTERN.match(line)
+        if not m:
+            raise MalformedEntry(f"无法解析的评分行：{line}", detail_index + 2 + offset)
+        category_scores[m.group(1)] = _number(m.group(2))
+    if not category_scores:
+        raise MalformedEntry("【评分详情】 为空", detail_index)
+
+    total_index = index
+    index = _section(lines, index, "【综合评分】")
+    m = TOTAL_LINE_PATTERN.match(lines[index]) if index < len(lines) else None
+    if not m or index + 1 >= len(lines) or lines[index + 1] != "":
+        raise MalformedEntry("无法解析的综合评分", total_index + 2)
+    total, rating = _number(m.group(1)), m.group(2)
+    index += 2
+
+    highlights = []
+    if index < len(lines) and lines[index] == "【亮点】":
+        index = _section(lines, index, "【亮点】")
+        items, index = _until_blank(lines, index, "【亮点】")
+        highlights = [item[2:] if item.startswith("✓ ") else item for item in items]
+
+    suggestions = []
+    if index < len(lines) and lines[index] == "【改进建议】":
+        index = _section(lines, index, "【改进建议】")
+        items, index = _until_blank(lines, index, "【改进建议】")
+        suggestions = [item[2:] if item.startswith("• ") else item for item in items]
+
+    if index >= len(lines) or lines[index] != "【记录时间】":
+        raise MalformedEntry("缺少 【记录时间】", index)
+    recorded_at = lines[index + 1] if index + 1 < len(lines) else ""
+    try:
+        datetime.strptime(recorded_at, "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        raise MalformedEntry(f"无效的记录时间：{recorded_at}", index + 1)
+    if lines[index + 2:] != ["", SEPARATOR]:
+        raise MalformedEntry("条目结尾不完整", index + 2)
+
+    report = {
+        "date": date,
+        "activities": activities,
+        "categories": categories,
+        "category_scores": category_scores,
+        "total_score": {"total": total, "rating": rating},
+        "highlights": highlights,
+        "suggestions": suggestions
+    }
+    return text, report, recorded_at
+
+
+def iter_parsed(lines: Iterable[str], source: str,
+                errors: List[str]) -> Iterator[Tuple[str, Dict[str, Any], str]]:
+    """逐条解析日志行，产出 (输入文本, 报告, 记录时间)；格式错误的条目说明追加到 errors"""
+    for start, entry_lines in split_entries(lines):
+        try:
+            yield parse_entry(entry_lines)
+        except MalformedEntry as e:
+            errors.append(f"{source}:{start + e.line}: {e}")
+
+
+def import_source(task: Tuple[str, str, str], db_path: str,
+                  batch_size: int = IMPORT_BATCH_SIZE) -> Tuple[int, int, List[str]]:
+    """
+    流式解析一个日志来源并分批写入存储（在工作进程中执行）
+
+    task 为 ("file", 文件路径, "") 或 ("archive", 日志目录, 日期)。
+    每攒满 batch_size 条提交一次，内存中只保留一批记录和每条记录键的 16 字节摘要（用于计算出现序号）。
+
+    Returns:
+        (解析出的记录数, 新写入数, 错误说明列表)
+    """
+    kind, path, date = task
+    errors: List[str] = []
+    parsed = imported = 0
+
+    with LogStore(db_path) as store:
+        if kind == "archive":
+            f = None
+            entries = iter_parsed(read_archived(path, date).splitlines(), f"{path}/archive@{date}", errors)
+        else:
+            f = open(path, 'r', encoding='utf-8')
+            entries = iter_parsed(f, path, errors)
+
+        try:
+            batch = []
+            seen: Counter = Counter()
+            for text, report, recorded_at in entries:
+                digest = hashlib.blake2b(
+                    "\0".join((report["date"], recorded_at, text)).encode('utf-8'), digest_size=16
+                ).digest()
+                seen[digest] += 1
+                batch.append((text, report, recorded_at, seen[digest]))
+                if len(batch) >= batch_size:
+                    imported += store.import_entries(batch)
+                    parsed += len(batch)
+                    batch = []
+            if batch:
+                imported += store.import_entries(batch)
+                parsed += len(batch)
+        finally:
+            if f is not None:
+                f.close()
+
+    return parsed, imported, errors
+
+
+def collect_sources(paths: List[str]) -> List[Tuple[str, str, str]]:
+    """展开待导入的来源：日志目录（含已归档的日期）或单个日志文件"""
+    tasks = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if LOG_FILE_PATTERN.match(name):
+                    tasks.append(("file", os.path.join(path, name), ""))
+            for date in sorted(archived_dates(path)):
+                tasks.append(("archive", path, date))
+        else:
+            tasks.append(("file", path, ""))
+    return tasks
+
+
+def import_logs(paths: List[str], db_path: str, workers: Optional[int] = None,
+                errors: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    导入文本日志到结构化存储
+
+    Args:
+        paths: 日志目录或 output_YYYY-MM-DD.txt 文件
+        db_path: 目标 ratings.db
+        workers: 解析进程数，默认为 CPU 核数；为 1 时在当前进程内解析
+        errors: 可选列表，收集格式错误的条目说明
+
+    Returns:
+        {"sources": 来源数, "parsed": 解析出的记录数, "imported": 新写入数,
+         "existing": 已存在而跳过的记录数, "malformed": 格式错误的条目数}
+    """
+    tasks = collect_sources(paths)
+    workers = workers or os.cpu_count() or 1
+    summary = {"sources": len(tasks), "parsed": 0, "imported": 0, "existing": 0, "malformed": 0}
+    if not tasks:
+        return summary
+
+    # 每个来源由一个工作进程解析并分批写入；写事务在 SQLite 中依次执行
+    if workers == 1 or len(tasks) == 1:
+        results = (import_source(task, db_path) for task in tasks)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(import_source, tasks, [db_path] * len(tasks))
+
+    try:
+        for parsed, imported, source_errors in results:
+            summary["parsed"] += parsed
+            summary["imported"] += imported
+            summary["existing"] += parsed - imported
+            summary["malformed"] += len(source_errors)
+            if errors is not None:
+                errors.extend(source_errors)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return summary
+
+
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='把文本评分日志导入结构化存储')
+    parser.add_argument('paths', nargs='*', help='日志目录或 output_YYYY-MM-DD.txt 文件，默认为 logs 目录')
+    parser.add_argument('--db', type=str, default=None, help='目标数据库，默认为日志目录下的 ratings.db')
+    parser.add_argument('--user', '-u', type=str, default=None, help='导入该用户的日志目录')
+    parser.add_argument('--workers', '-w', type=int, default=None, help='解析进程数，默认为 CPU 核数')
+
+    args = parser.parse_args()
+
+    try:
+        logs_dir = user_logs_dir(os.path.join(script_dir, 'logs'), args.user)
+    except ValueError as e:
+        print(f"错误：{e}")
+        sys.exit(1)
+
+    paths = args.paths or [logs_dir]
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"输入不存在：{path}")
+            sys.exit(1)
+
+    errors = []
+    summary = import_logs(paths, args.db or os.path.join(logs_dir, 'ratings.db'), args.workers, errors)
+    for error in errors:
+        print(f"跳过格式错误的记录 {error}", file=sys.stderr)
+
+    print("=" * 60)
+    print("日志导入完成")
+    print("-" * 60)
+    print(f"来源：{summary['sources']} 个")
+    print(f"解析记录：{summary['parsed']} 条（格式错误 {summary['malformed']} 条）")
+    print(f"新写入：{summary['imported']} 条，已存在：{summary['existing']} 条")
+
+
+if __name__ == "__main__":
+    # 确保 Windows 环境下正确处理 UTF-8
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+    main()
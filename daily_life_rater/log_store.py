@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+评分记录结构化存储
+基于 SQLite 的只追加存储，按日期建索引，保存原始输入、活动、各类别评分、总分、评级和记录时间
+"""
+
+import calendar
+import hashlib
+import json
+import os
+import re
+import sqlite3
+from collections import Counter
+from datetime import date as date_cls, datetime, timedelta
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+# 默认数据库路径：与文本日志同在 logs 文件夹下
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs', 'ratings.db')
+
+# 多用户日志根目录（相对 logs 文件夹）
+USERS_DIR_NAME = 'users'
+
+# 用户名只允许字母、数字、汉字、下划线、点、@ 和 -，且不能以点开头
+USER_NAME_PATTERN = re.compile(r'^[\w@-][\w.@-]*$')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    recorded_at TEXT NOT NULL,
+    input TEXT NOT NULL,
+    activities TEXT NOT NULL,
+    category_scores TEXT NOT NULL,
+    total REAL NOT NULL,
+    rating TEXT NOT NULL,
+    highlights TEXT NOT NULL,
+    suggestions TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_date ON entries (date);
+CREATE TABLE IF NOT EXISTS rollups (
+    period TEXT NOT NULL,
+    period_key TEXT NOT NULL,
+    period_start TEXT NOT NULL,
+    period_end TEXT NOT NULL,
+    category TEXT NOT NULL,
+    total REAL NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (period, period_key, category)
+);
+CREATE INDEX IF NOT EXISTS idx_rollups_range ON rollups (period, period_start);
+"""
+
+# 汇总周期：日、周（ISO 周）、月、年
+ROLLUP_PERIODS = ("day", "week", "month", "year")
+
+# 汇总表中总分使用的类别名
+TOTAL_KEY = "__total__"
+
+COLUMNS = ("id", "date", "recorded_at", "input", "activities", "category_scores",
+           "total", "rating", "highlights", "suggestions")
+
+# 以 JSON 文本保存的列
+JSON_COLUMNS = ("activities", "category_scores", "highlights", "suggestions")
+
+
+def validate_user(user: str) -> str:
+    """检查用户名可以安全地用作目录名，不合法时抛出 ValueError"""
+    if not isinstance(user, str) or not USER_NAME_PATTERN.match(user):
+        raise ValueError(f"无效的用户名：{user!r}")
+    return user
+
+
+def validate_date(date: Any) -> str:
+    """检查日期为 YYYY-MM-DD，返回规范化后的日期（2026-3-1 -> 2026-03-01），不合法时抛出 ValueError"""
+    try:
+        return datetime.strptime(str(date).strip(), "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise ValueError(f"无效的日期：{date}，应为 YYYY-MM-DD") from None
+
+
+def user_logs_dir(logs_dir: str, user: Optional[str] = None) -> str:
+    """
+    某个用户的日志目录
+
+    未指定用户时为 logs 文件夹本身（单用户布局）；
+    指定用户时为 logs/users/<用户名哈希前两位>/<用户名>/，目录下的布局与单用户完全相同
+    （ratings.db、output_YYYY-MM-DD.txt、archive/）。不同用户的数据互不共享文件，
+    按哈希分桶使每个目录下的条目数不随用户数增长。
+    """
+    if user is None:
+        return logs_dir
+    validate_user(user)
+    bucket = hashlib.sha1(user.encode('utf-8')).hexdigest()[:2]
+    return os.path.join(logs_dir, USERS_DIR_NAME, bucket, user)
+
+
+def list_users(logs_dir: str) -> List[str]:
+    """列出有日志目录的用户"""
+    root = os.path.join(logs_dir, USERS_DIR_NAME)
+    if not os.path.exists(root):
+        return []
+    users = []
+    for bucket in os.listdir(root):
+        bucket_dir = os.path.join(root, bucket)
+        if os.path.isdir(bucket_dir):
+            users.extend(name for name in os.listdir(bucket_dir)
+                         if os.path.isdir(os.path.join(bucket_dir, name)))
+    return sorted(users)
+
+
+def record_to_report(record: Dict[str, Any]) -> Dict[str, Any]:
+    """把存储记录还原为 generate_report 的报告结构（用于重新渲染）"""
+    categories = {}
+    for activity in record["activities"]:
+        categories.setdefault(activity["category"], []).append(activity)
+
+    return {
+        "date": record["date"],
+        "activities": record["activities"],
+        "categories": categories,
+        "category_scores": record["category_scores"],
+        "total_score": {"total": record["total"], "rating": record["rating"]},
+        "highlights": record["highlights"],
+        "suggestions": record["suggestions"]
+    }
+
+
+def period_bounds(period: str, date: str) -> Tuple[str, str, str]:
+    """返回日期所在周期的 (周期标识, 起始日期, 结束日期)"""
+    d = date_cls.fromisoformat(date)
+    if period == "day":
+        return date, date, date
+    if period == "week":
+        year, week, _ = d.isocalendar()
+        start = d - timedelta(days=d.weekday())
+        return f"{year}-W{week:02d}", start.isoformat(), (start + timedelta(days=6)).isoformat()
+    if period == "month":
+        last_day = calendar.monthrange(d.year, d.month)[1]
+        return d.strftime("%Y-%m"), d.replace(day=1).isoformat(), d.replace(day=last_day).isoformat()
+    if period == "year":
+        return str(d.year), f"{d.year}-01-01", f"{d.year}-12-31"
+    raise ValueError(f"未知的汇总周期：{period}")
+
+
+class LogStore:
+    """评分记录存储，只支持追加和按日期查询"""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        # timeout 让多个评分进程同时写入时排队等待，而不是直接报错
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        # 旧版本数据库没有汇总表数据时，从已有记录补建一次
+        if (self.conn.execute("SELECT 1 FROM rollups LIMIT 1").fetchone() is None
+                and self.conn.execute("SELECT 1 FROM entries LIMIT 1").fetchone() is not None):
+            self.rebuild_rollups()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @staticmethod
+    def _entry_row(text: str, report: Dict[str, Any], recorded_at: str) -> tuple:
+        return (
+            report["date"],
+            recorded_at,
+            text,
+            json.dumps(report["activities"], ensure_ascii=False),
+            json.dumps(report["category_scores"], ensure_ascii=False),
+            report["total_score"]["total"],
+            report["total_score"]["rating"],
+            json.dumps(report["highlights"], ensure_ascii=False),
+            json.dumps(report["suggestions"], ensure_ascii=False)
+        )
+
+    def _insert(self, row: tuple):
+        return self.conn.execute(
+            "INSERT INTO entries (date, recorded_at, input, activities, category_scores, "
+            "total, rating, highlights, suggestions) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            row
+        )
+
+    def append(self, text: str, report: Dict[str, Any], recorded_at: Optional[str] = None) -> int:
+        """追加一条评分记录，返回记录 id"""
+        if recorded_at is None:
+            recorded_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        row = self._entry_row(text, report, recorded_at)
+        with self.conn:
+            cursor = self._insert(row)
+            # 同一事务内增量更新各周期汇总
+            self._update_rollups(report["date"], report["category_scores"],
+                                 report["total_score"]["total"])
+        return cursor.lastrowid
+
+    def import_entries(self, entries: List[Tuple[str, Dict[str, Any], str, int]]) -> int:
+        """
+        批量导入 (输入文本, 报告, 记录时间, 出现序号) 形式的记录，单个事务提交，返回实际写入的条数
+
+        以 (日期, 记录时间, 输入文本) 识别同一条记录，出现序号为该记录在导入来源中第几次出现（从 1 开始）：
+        存储中同键记录已有不少于该序号的条数时不再写入。因此重复导入同一批日志、
+        或导入已由 save_log 写入过的记录都不会产生重复，同一秒内对相同输入的多次评分也不会被合并。
+        事务一开始就取得写锁，多个进程同时导入时依次执行，查重结果不会过期。
+        """
+        by_date: Dict[str, List[Tuple[str, Dict[str, Any], str, int]]] = {}
+        for entry in entries:
+            by_date.setdefault(entry[1]["date"], []).append(entry)
+
+        imported = 0
+        # 汇总表的增量先在内存中合并，整批只更新一次
+        deltas: Dict[Tuple[str, str, str, str, str], List[float]] = {}
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            for date, day_entries in by_date.items():
+                existing = Counter(self.conn.execute(
+                    "SELECT recorded_at, input FROM entries WHERE date = ?", (date,)
+                ))
+                for text, report, recorded_at, occurrence in day_entries:
+                    key = (recorded_at, text)
+                    if existing[key] >= occurrence:
+                        continue
+                    existing[key] += 1
+                    self._insert(self._entry_row(text, report, recorded_at))
+                    values = list(report["category_scores"].items()) + [(TOTAL_KEY, report["total_score"]["total"])]
+                    for period in ROLLUP_PERIODS:
+                        bounds = period_bounds(period, date)
+                        for category, score in values:
+                            delta = deltas.setdefault((period,) + bounds + (category,), [0.0, 0])
+                            delta[0] += score
+                            delta[1] += 1
+                    imported += 1
+
+            self.conn.executemany(
+                "INSERT INTO rollups (period, period_key, period_start, period_end, category, total, count) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (period, period_key, category) "
+                "DO UPDATE SET total = total + excluded.total, count = count + excluded.count",
+                [key + (total, count) for key, (total, count) in deltas.items()]
+            )
+        return imported
+
+    def _update_rollups(self, date: str, category_scores: Dict[str, float], total: float):
+        values = list(category_scores.items()) + [(TOTAL_KEY, total)]
+        rows = []
+        for period in ROLLUP_PERIODS:
+            key, start, end = period_bounds(period, date)
+            rows.extend((period, key, start, end, category, score) for category, score in values)
+        self.conn.executemany(
+            "INSERT INTO rollups (period, period_key, period_start, period_end, category, total, count) "
+            "VALUES (?, ?, ?, ?, ?, ?, 1) "
+            "ON CONFLICT (period, period_key, category) "
+            "DO UPDATE SET total = total + excluded.total, count = count + 1",
+            rows
+        )
+
+    def rebuild_rollups(self):
+        """根据全部记录重建汇总表"""
+        with self.conn:
+            self.conn.execute("DELETE FROM rollups")
+            cursor = self.conn.execute("SELECT date, category_scores, total FROM entries ORDER BY id")
+            for date, category_scores, total in cursor.fetchall():
+                self._update_rollups(date, json.loads(category_scores), total)
+
+    def rollups(self, period: str, date_from: Optional[str] = None,
+                date_to: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        查询汇总数据
+
+        返回与日期范围有交集的周期，按时间排列：
+            [{"period": "2026-W03", "start": ..., "end": ..., "count": 记录数,
+              "averages": {类别: 平均分}, "total": 平均总分}]
+        超出日期范围的首尾周期按日汇总裁剪，start/end 为裁剪后的实际范围，只统计范围内的记录。
+        """
+        if period not in ROLLUP_PERIODS:
+            raise ValueError(f"未知的汇总周期：{period}")
+
+        sql = ("SELECT period_key, period_start, period_end, category, total, count "
+               "FROM rollups WHERE period = ?")
+        params = [period]
+        if date_to:
+            sql += " AND period_start <= ?"
+            params.append(date_to)
+        if date_from:
+            sql += " AND period_end >= ?"
+            params.append(date_from)
+        sql += " ORDER BY period_start"
+
+        results = []
+        current = None
+        for key, start, end, category, total, count in self.conn.execute(sql, params):
+            if current is None or current["period"] != key:
+                current = {"period": key, "start": start, "end": end,
+                           "count": 0, "averages": {}, "total": 0.0}
+                results.append(current)
+            self._add_rollup(current, category, total, count)
+
+        # 首尾周期可能只有一部分在范围内：改用范围内的日汇总重新计算
+        clipped = []
+        for current in results:
+            start = max(current["start"], date_from) if date_from else current["start"]
+            end = min(current["end"], date_to) if date_to else current["end"]
+            if (start, end) != (current["start"], current["end"]):
+                current = {"period": current["period"], "start": start, "end": end,
+                           "count": 0, "averages": {}, "total": 0.0}
+                for category, total, count in self.conn.execute(
+                        "SELECT category, SUM(total), SUM(count) FROM rollups "
+                        "WHERE period = 'day' AND period_start BETWEEN ? AND ? GROUP BY category",
+                        (start, end)):
+                    self._add_rollup(current, category, total, count)
+                if not current["count"]:
+                    continue
+            clipped.append(current)
+        return clipped
+
+    @staticmethod
+    def _add_rollup(current: Dict[str, Any], category: str, total: float, count: int):
+        average = round(total / count, 2)
+        if category == TOTAL_KEY:
+            current["count"] = count
+            current["total"] = average
+        else:
+            current["averages"][category] = average
+
+    def extreme_days(self, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                     limit: int = 3, worst: bool = False) -> List[Tuple[str, float]]:
+        """按当日平均总分返回最好（或最差）的若干天：[(日期, 平均总分)]"""
+        sql = ("SELECT period_key, total / count AS average FROM rollups "
+               "WHERE period = 'day' AND category = ?")
+        params = [TOTAL_KEY]
+        if date_from:
+            sql += " AND period_start >= ?"
+            params.append(date_from)
+        if date_to:
+            sql += " AND period_start <= ?"
+            params.append(date_to)
+        sql += f" ORDER BY average {'ASC' if worst else 'DESC'}, period_key LIMIT ?"
+        params.append(limit)
+        return [(key, round(average, 2)) for key, average in self.conn.execute(sql, params)]
+
+    def _row_to_record(self, row) -> Dict[str, Any]:
+        record = dict(zip(COLUMNS, row))
+        for column in JSON_COLUMNS:
+            record[column] = json.loads(record[column])
+        return record
+
+    def iter_entries(self, date_from: Optional[str] = None,
+                     date_to: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """按日期范围（含两端）遍历记录，按日期和写入顺序排列"""
+        conditions = []
+        params = []
+        if date_from:
+            conditions.append("date >= ?")
+            params.append(date_from)
+        if date_to:
+            conditions.append("date <= ?")
+            params.append(date_to)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        cursor = self.conn.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM entries{where} ORDER BY date, id", params
+        )
+        for row in cursor:
+            yield self._row_to_record(row)
+
+    def get_entries(self, date: str) -> List[Dict[str, Any]]:
+        """获取某一天的全部记录"""
+        return list(self.iter_entries(date, date))
+
+    def list_dates(self) -> List[str]:
+        """列出有记录的日期（降序）"""
+        cursor = self.conn.execute("SELECT DISTINCT date FROM entries ORDER BY date DESC")
+        return [row[0] for row in cursor]
+
+    def iter_score_rows(self, categories: List[str], date_from: Optional[str] = None,
+                        date_to: Optional[str] = None, batch_size: int = 10000) -> Iterator[List[tuple]]:
+        """按批读取评分数值：每行为 (日期, 各类别评分..., 总分)，由 SQLite 直接展开 JSON，便于向量化加载"""
+        columns = ", ".join(f"json_extract(category_scores, ?)" for _ in categories)
+        params = [f'$."{category}"' for category in categories]
+        sql = f"SELECT date, {columns}, total FROM entries WHERE 1 = 1"
+        if date_from:
+            sql += " AND date >= ?"
+            params.append(date_from)
+        if date_to:
+            sql += " AND date <= ?"
+            params.append(date_to)
+        sql += " ORDER BY date"
+
+        cursor = self.conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+
+    def date_span(self, date_from: Optional[str] = None,
+                  date_to: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+        """范围内记录的 (最早日期, 最晚日期)，没有记录时为 (None, None)；走日期索引，不扫描记录"""
+        sql = "SELECT MIN(date), MAX(date) FROM entries WHERE 1 = 1"
+        params = []
+        if date_from:
+            sql += " AND date >= ?"
+            params.append(date_from)
+        if date_to:
+            sql += " AND date <= ?"
+            params.append(date_to)
+        return tuple(self.conn.execute(sql, params).fetchone())
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
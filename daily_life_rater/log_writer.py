@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+文本日志写入器
+所有追加写入交给一个后台线程，按刷新间隔把积攒的日志分文件批量写入（组提交）；
+每批写入前对目标文件加排他锁，多个评分进程同时写同一天的日志也不会交错。
+"""
+
+import atexit
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+if sys.platform == 'win32':
+    import msvcrt
+else:
+    import fcntl
+
+# 默认刷新间隔（秒）：从一批中的第一条日志入队开始计时，到时即写入
+DEFAULT_FLUSH_INTERVAL = 0.05
+
+# 单次组提交最多包含的日志条数
+DEFAULT_MAX_BATCH = 1000
+
+
+def lock_file(f):
+    """对已打开的文件加排他锁（阻塞）"""
+    if sys.platform == 'win32':
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+
+def unlock_file(f):
+    if sys.platform == 'win32':
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _is_current(f, path: str) -> bool:
+    """加锁期间文件仍在原路径上（没有被归档删除）"""
+    if sys.platform == 'win32':
+        # Windows 下打开中的文件不能删除，无需检查
+        return True
+    try:
+        current = os.stat(path)
+    except FileNotFoundError:
+        return False
+    opened = os.fstat(f.fileno())
+    return (opened.st_dev, opened.st_ino) == (current.st_dev, current.st_ino)
+
+
+def append_locked(path: str, data: str):
+    """加锁后一次性追加写入（同步）
+
+    归档会在持有同一把锁时删除日志文件；拿到锁后发现文件已被删除时重新打开（新建）再写，
+    避免写进已删除的文件而丢失。
+    """
+    while True:
+        with open(path, 'a', encoding='utf-8') as f:
+            lock_file(f)
+            try:
+                if _is_current(f, path):
+                    f.write(data)
+                    f.flush()
+                    return
+            finally:
+                unlock_file(f)
+
+
+class LogWriter:
+    """后台组提交写入器
+
+    append() 只把日志放入队列；后台线程从一批的第一条日志起最多等待 flush_interval 秒
+    （或攒满 max_batch 条）按文件合并写入一次，持续有日志进来时也不会无限推迟。
+    flush() 等待已提交的日志全部落盘，close() 在退出时自动调用。
+    """
+
+    def __init__(self, flush_interval: float = DEFAULT_FLUSH_INTERVAL, max_batch: int = DEFAULT_MAX_BATCH):
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[Optional[Tuple[str, str]]]" = queue.Queue()
+        self._closed = False
+        # 保证检查 _closed 和入队是原子的：close() 之后不会再有日志进入队列而无人写入
+        self._lock = threading.Lock()
+        self.commits = 0
+        self.entries = 0
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def append(self, path: str, data: str):
+        """提交一条日志；写入器已关闭时直接同步写入"""
+        with self._lock:
+            if not self._closed:
+                self._queue.put((path, data))
+                return
+        append_locked(path, data)
+
+    def flush(self):
+        """阻塞直到已提交的日志全部写入"""
+        if not self._closed:
+            self._queue.join()
+
+    def close(self):
+        """写完剩余日志并停止后台线程"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            batch: List[Tuple[str, str]] = []
+            taken = 1
+            if item is None:
+                stopping = True
+            else:
+                batch.append(item)
+
+            # 从第一条日志起，在刷新间隔内继续收集，组成一次提交
+            deadline = time.monotonic() + self.flush_interval
+            while not stopping and len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                taken += 1
+                if item is None:
+                    stopping = True
+                else:
+                    batch.append(item)
+
+            # 关闭时把队列里剩下的也一并写完
+            if stopping:
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    taken += 1
+                    if item is not None:
+                        batch.append(item)
+
+            try:
+                self._commit(batch)
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
+
+    def _commit(self, batch: List[Tuple[str, str]]):
+        # 按文件分组，保持同一文件内的提交顺序
+        by_path: Dict[str, List[str]] = {}
+        for path, data in batch:
+            by_path.setdefault(path, []).append(data)
+
+        for path, chunks in by_path.items():
+            try:
+                append_locked(path, ''.join(chunks))
+                self.commits += 1
+                self.entries += len(chunks)
+            except Exception as e:
+                print(f"保存日志失败：{e}")
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+评分流程性能统计
+记录各阶段耗时和计数，可导出为 JSON 快照或 Prometheus 文本格式；支持对单次评分做 cProfile 分析
+
+默认关闭，关闭时每个被统计的函数只多一次布尔判断。
+通过环境变量 DAILY_LIFE_RATER_METRICS=1 或 METRICS.enable() 开启。
+"""
+
+import cProfile
+import functools
+import json
+import os
+import pstats
+import threading
+import time
+from typing import Dict, Any, Callable
+
+
+class Metrics:
+    """累计的阶段耗时和计数器"""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        # 阶段名 -> [调用次数, 总耗时（秒）, 最大耗时（秒）]
+        self.timings: Dict[str, list] = {}
+        self.counters: Dict[str, int] = {}
+        self.started_at = time.time()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.timings.clear()
+            self.counters.clear()
+            self.started_at = time.time()
+
+    def observe(self, stage: str, seconds: float):
+        """记录一次阶段耗时"""
+        with self._lock:
+            entry = self.timings.get(stage)
+            if entry is None:
+                self.timings[stage] = [1, seconds, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+                if seconds > entry[2]:
+                    entry[2] = seconds
+
+    def incr(self, name: str, value: int = 1):
+        """累加计数器"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def raw(self) -> Dict[str, Any]:
+        """可序列化的原始累计数据，用于跨进程合并"""
+        with self._lock:
+            return {"timings": {k: list(v) for k, v in self.timings.items()},
+                    "counters": dict(self.counters)}
+
+    def merge(self, raw: Dict[str, Any]):
+        """合并另一个进程的 raw() 数据"""
+        with self._lock:
+            for stage, (count, total, peak) in raw["timings"].items():
+                entry = self.timings.setdefault(stage, [0, 0.0, 0.0])
+                entry[0] += count
+                entry[1] += total
+                entry[2] = max(entry[2], peak)
+            for name, value in raw["counters"].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def timed(self, stage: str) -> Callable:
+        """装饰器：统计被装饰函数的耗时（嵌套阶段的耗时会同时计入外层阶段）"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(stage, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def snapshot(self) -> Dict[str, Any]:
+        """当前累计数据"""
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": count,
+                    "total_ms": round(total * 1000, 3),
+                    "avg_ms": round(total * 1000 / count, 4) if count else 0.0,
+                    "max_ms": round(peak * 1000, 3)
+                }
+                for stage, (count, total, peak) in self.timings.items()
+            }
+            return {
+                "since": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started_at)),
+                "stages": stages,
+                "counters": dict(self.counters)
+            }
+
+    def to_prometheus(self, prefix: str = "daily_life_rater") -> str:
+        """导出为 Prometheus 文本格式"""
+        with self._lock:
+            timings = {k: list(v) for k, v in self.timings.items()}
+            counters = dict(self.counters)
+
+        lines = [
+            f"# HELP {prefix}_stage_seconds_total 各阶段累计耗时",
+            f"# TYPE {prefix}_stage_seconds_total counter"
+        ]
+        for stage, (_, total, _) in sorted(timings.items()):
+            lines.append(f'{prefix}_stage_seconds_total{{stage="{stage}"}} {total:.6f}')
+        lines.append(f"# HELP {prefix}_stage_calls_total 各阶段调用次数")
+        lines.append(f"# TYPE {prefix}_stage_calls_total counter")
+        for stage, (count, _, _) in sorted(timings.items()):
+            lines.append(f'{prefix}_stage_calls_total{{stage="{stage}"}} {count}')
+        lines.append(f"# HELP {prefix}_stage_max_seconds 各阶段单次最大耗时")
+        lines.append(f"# TYPE {prefix}_stage_max_seconds gauge")
+        for stage, (_, _, peak) in sorted(timings.items()):
+            lines.append(f'{prefix}_stage_max_seconds{{stage="{stage}"}} {peak:.6f}')
+        for name, value in sorted(counters.items()):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str):
+        """写出统计文件：.json 为 JSON 快照，其余为 Prometheus 文本格式（原子替换）"""
+        if path.endswith(".json"):
+            content = json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+        else:
+            content = self.to_prometheus()
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+
+def profile_call(output_path: str, func: Callable, *args, **kwargs):
+    """在 cProfile 下执行一次 func，把统计数据写入 output_path（可用 pstats / snakeviz 查看）"""
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        profiler.dump_stats(output_path)
+
+
+def print_profile(path: str, limit: int = 20):
+    """按累计耗时打印 cProfile 统计"""
+    pstats.Stats(path).sort_stats("cumulative").print_stats(limit)
+
+
+# 全局统计实例
+METRICS = Metrics(enabled=os.environ.get("DAILY_LIFE_RATER_METRICS", "") not in ("", "0"))
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+评分服务客户端
+优先调用常驻评分服务（rater_server.py）；服务未运行时退回到进程内评分
+"""
+
+import http.client
+import json
+import sys
+import os
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Dict, List, Any, Optional, Tuple
+
+# 添加技能目录到路径
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, script_dir)
+
+from log_store import validate_date, validate_user
+
+# 服务地址，可通过环境变量覆盖
+SERVER_URL = os.environ.get("DAILY_LIFE_RATER_URL", "http://127.0.0.1:8765")
+
+# 连接超时（秒）：本地服务不可用时应尽快退回进程内评分
+CONNECT_TIMEOUT = 0.5
+
+
+def _post(path: str, payload: Dict[str, Any], url: Optional[str] = None,
+          timeout: float = 30) -> Optional[Dict[str, Any]]:
+    """向评分服务发送请求；只有连接阶段失败（服务未运行）时返回 None
+
+    连接建立后服务可能已经开始评分并写入日志，此时读取超时或连接中断直接报错，
+    不能再退回本地重新评分，否则同一条记录会写入两次。
+    """
+    parts = urllib.parse.urlsplit(url or SERVER_URL)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=CONNECT_TIMEOUT)
+    try:
+        try:
+            connection.connect()
+        except OSError:
+            return None
+
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        try:
+            connection.sock.settimeout(timeout)
+            connection.request("POST", parts.path.rstrip("/") + path, body=data,
+                               headers={"Content-Type": "application/json; charset=utf-8"})
+            response = connection.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            raise ConnectionError(f"评分服务请求失败（请求可能已被处理，不再本地重新评分）：{e}")
+    finally:
+        connection.close()
+
+    if response.status != 200:
+        # 服务可达但请求有误：直接报错，不再退回本地
+        try:
+            message = json.loads(body.decode("utf-8")).get("error", response.reason)
+        except (ValueError, AttributeError):
+            # 错误响应不是 JSON（例如被代理改写），退回到状态行
+            message = f"{response.status} {response.reason}"
+        raise ValueError(f"评分服务返回错误（{response.status}）：{message}")
+    return json.loads(body.decode("utf-8"))
+
+
+def server_available(url: Optional[str] = None) -> bool:
+    """检查评分服务是否在运行"""
+    try:
+        with urllib.request.urlopen((url or SERVER_URL) + "/health", timeout=CONNECT_TIMEOUT) as response:
+            return response.status == 200
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        return False
+
+
+def _check_record(text: Any, date: Optional[str], user: Optional[str]) -> Tuple[str, Optional[str], Optional[str]]:
+    """与评分服务相同的请求检查，返回 (文本, 规范化日期, 用户)；不合法时抛出 ValueError"""
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError("缺少 text 字段")
+    if user is not None:
+        validate_user(user)
+    if date is not None:
+        date = validate_date(date)
+    return text, date, user
+
+
+def rate(text: str, save_log_flag: bool = True, date: Optional[str] = None,
+         url: Optional[str] = None, user: Optional[str] = None) -> Dict[str, Any]:
+    """评分，返回与 generate_report 相同结构的报告"""
+    result = _post("/rate", {"text": text, "date": date, "save_log": save_log_flag, "user": user}, url)
+    if result is not None:
+        return result["report"]
+
+    from daily_life_rater import generate_report
+    text, date, user = _check_record(text, date, user)
+    return generate_report(text, save_log_flag=save_log_flag, date=date, user=user)
+
+
+def rate_batch(records: List[Dict[str, str]], save_log_flag: bool = False,
+               url: Optional[str] = None) -> List[Dict[str, Any]]:
+    """批量评分，records 为 [{"text": ..., "date": ..., "user": ...}]，按输入顺序返回报告"""
+    result = _post("/rate/batch", {"records": records, "save_log": save_log_flag}, url)
+    if result is not None:
+        return result["reports"]
+
+    from daily_life_rater import generate_report
+    # 与服务一致：先检查全部记录，再开始评分和写日志
+    parsed = []
+    for index, record in enumerate(records, 1):
+        try:
+            if not isinstance(record, dict):
+                raise ValueError("每条记录必须是 JSON 对象")
+            parsed.append(_check_record(record.get("text"), record.get("date"), record.get("user")))
+        except ValueError as e:
+            raise ValueError(f"第 {index} 条记录：{e}")
+    return [generate_report(text, save_log_flag=save_log_flag, date=date, user=user)
+            for text, date, user in parsed]
+
+
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='每日作息评分（优先使用常驻服务）')
+    parser.add_argument('text', type=str, help='今日活动描述')
+    parser.add_argument('--date', '-d', type=str, help='报告日期 (YYYY-MM-DD)，默认为今天')
+    parser.add_argument('--no-log', action='store_true', help='不保存日志')
+    parser.add_argument('--user', '-u', type=str, default=None, help='日志所属用户')
+
+    args = parser.parse_args()
+
+    try:
+        result = _post("/rate", {"text": args.text, "date": args.date, "user": args.user,
+                                 "save_log": not args.no_log, "format": True})
+        if result is not None:
+            print(result["formatted"])
+            return
+
+        from daily_life_rater import generate_report, format_report
+        text, date, user = _check_record(args.text, args.date, args.user)
+        report = generate_report(text, save_log_flag=not args.no_log, date=date, user=user)
+        print(format_report(report))
+    except (ValueError, ConnectionError) as e:
+        print(f"错误：{e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    # 确保 Windows 环境下正确处理 UTF-8
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+    main()
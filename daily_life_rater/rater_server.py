@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+常驻评分服务
+基于 asyncio 的本地 HTTP 服务，关键词自动机常驻内存，避免每次评分都重新启动解释器
+
+接口：
+    POST /rate          {"text": "...", "date": "YYYY-MM-DD", "user": "...", "save_log": true, "format": false}
+    POST /rate/batch    {"records": [{"text": "...", "date": "...", "user": "..."}], "save_log": false}
+    GET  /health
+    GET  /stats
+"""
+
+import asyncio
+import json
+import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Tuple
+
+# 添加技能目录到路径
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, script_dir)
+
+import daily_life_rater
+from daily_life_rater import generate_report, format_report
+from log_store import validate_date, validate_user
+from metrics import METRICS
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# 请求体大小上限，防止误传超大文件
+MAX_BODY_SIZE = 16 * 1024 * 1024
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found",
+               405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    """带状态码的请求错误"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class RaterServer:
+    """评分服务
+
+    评分和写日志都在同一个工作线程中执行：不阻塞事件循环，
+    同时保证结构化日志的 SQLite 连接只在一个线程中使用。
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self.host = host
+        self.port = port
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rater")
+        self.started_at = time.time()
+        self.stats = {
+            "requests": 0,
+            "errors": 0,
+            "ratings": 0,
+            "rating_seconds": 0.0
+        }
+
+    # ---------- 评分 ----------
+
+    @staticmethod
+    def _parse_record(payload: Any) -> Tuple[str, Optional[str], Optional[str]]:
+        """检查一条评分请求，返回 (文本, 日期, 用户)；不合法时抛出 HTTPError(400)"""
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "每条记录必须是 JSON 对象")
+        text = payload.get("text")
+        if not isinstance(text, str) or not text.strip():
+            raise HTTPError(400, "缺少 text 字段")
+        user = payload.get("user")
+        date = payload.get("date")
+        try:
+            if user is not None:
+                validate_user(user)
+            if date is not None:
+                # 与批量评分一致，统一为 YYYY-MM-DD；无效日期不能写入日志文件名和数据库
+                date = validate_date(date)
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        return text, date, user
+
+    def _rate_one(self, payload: Dict[str, Any], save_log_flag: bool) -> Dict[str, Any]:
+        text, date, user = self._parse_record(payload)
+        return generate_report(text, save_log_flag=save_log_flag, date=date, user=user)
+
+    def _rate(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        report = self._rate_one(payload, payload.get("save_log", True))
+        self.stats["ratings"] += 1
+        self.stats["rating_seconds"] += time.perf_counter() - start
+
+        result = {"report": report}
+        if payload.get("format"):
+            result["formatted"] = format_report(report)
+        return result
+
+    def _rate_batch(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        records = payload.get("records")
+        if not isinstance(records, list):
+            raise HTTPError(400, "缺少 records 列表")
+
+        # 先检查全部记录，避免前面的记录已经写入日志后才发现后面的记录有误
+        parsed = []
+        for index, record in enumerate(records, 1):
+            try:
+                parsed.append(self._parse_record(record))
+            except HTTPError as e:
+                raise HTTPError(e.status, f"第 {index} 条记录：{e}")
+
+        start = time.perf_counter()
+        save_log_flag = payload.get("save_log", False)
+        reports = [generate_report(text, save_log_flag=save_log_flag, date=date, user=user)
+                   for text, date, user in parsed]
+        self.stats["ratings"] += len(reports)
+        self.stats["rating_seconds"] += time.perf_counter() - start
+        return {"reports": reports}
+
+    def _health(self) -> Dict[str, Any]:
+        return {"status": "ok", "pid": os.getpid()}
+
+    def _stats(self) -> Dict[str, Any]:
+        ratings = self.stats["ratings"]
+        cache = daily_life_rater.REPORT_CACHE
+        return dict(
+            self.stats,
+            uptime=round(time.time() - self.started_at, 1),
+            avg_rating_ms=round(self.stats["rating_seconds"] * 1000 / ratings, 3) if ratings else 0.0,
+            taxonomy_version=daily_life_rater.taxonomy_version(),
+            cache=cache.stats() if cache is not None else None,
+            metrics=METRICS.snapshot() if METRICS.enabled else None
+        )
+
+    # ---------- HTTP ----------
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> Dict[str, Any]:
+        routes = {
+            ("GET", "/health"): (self._health, False),
+            ("GET", "/stats"): (self._stats, False),
+            ("POST", "/rate"): (self._rate, True),
+            ("POST", "/rate/batch"): (self._rate_batch, True),
+        }
+        route = routes.get((method, path))
+        if route is None:
+            if any(p == path for _, p in routes):
+                raise HTTPError(405, f"不支持的方法：{method}")
+            raise HTTPError(404, f"未知路径：{path}")
+
+        handler, has_body = route
+        if not has_body:
+            return handler()
+
+        try:
+            payload = json.loads(body.decode("utf-8") or "{}")
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise HTTPError(400, f"请求体不是合法的 JSON：{e}")
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "请求体必须是 JSON 对象")
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, handler, payload)
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "无效的请求行")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length", 0) or 0)
+        if length > MAX_BODY_SIZE:
+            raise HTTPError(413, "请求体过大")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target.split("?", 1)[0], headers, body
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, path, headers, body = request
+                    keep_alive = headers.get("connection", "").lower() == "keep-alive"
+                    self.stats["requests"] += 1
+                    status, result = 200, await self._dispatch(method, path, body)
+                except HTTPError as e:
+                    self.stats["errors"] += 1
+                    status, result = e.status, {"error": str(e)}
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    status, result = 500, {"error": str(e)}
+
+                data = json.dumps(result, ensure_ascii=False).encode("utf-8")
+                head = (
+                    f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                    "Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                    "\r\n"
+                )
+                writer.write(head.encode("latin-1") + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def serve_forever(self):
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        print(f"评分服务已启动：http://{self.host}:{self.port}")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='常驻每日作息评分服务')
+    parser.add_argument('--host', type=str, default=DEFAULT_HOST, help='监听地址')
+    parser.add_argument('--port', '-p', type=int, default=DEFAULT_PORT, help='监听端口')
+    parser.add_argument('--cache-size', type=int, default=1024, help='内存结果缓存条数')
+    parser.add_argument('--cache-db', type=str, default=None, help='磁盘结果缓存文件 (SQLite)，重启后仍然有效')
+    parser.add_argument('--metrics', action='store_true', help='开启各阶段耗时统计（在 /stats 中返回）')
+
+    args = parser.parse_args()
+
+    daily_life_rater.configure_cache(args.cache_size, args.cache_db)
+    if args.metrics:
+        METRICS.enable()
+
+    server = RaterServer(args.host, args.port)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("评分服务已停止")
+
+
+if __name__ == "__main__":
+    # 确保 Windows 环境下正确处理 UTF-8
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+评分结果缓存
+以"规范化输入文本 + 分类体系版本"为键缓存评分报告：内存 LRU 一级缓存，可选 SQLite 磁盘二级缓存
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+DISK_SCHEMA = """
+CREATE TABLE IF NOT EXISTS report_cache (
+    key TEXT PRIMARY KEY,
+    report TEXT NOT NULL
+);
+"""
+
+
+def normalize_text(text: str) -> str:
+    """规范化输入：去掉每行首尾空白和空行
+
+    只处理分词时会被忽略的空白：活动按 "\n" 断行，内容去掉首尾空白，
+    因此只按 "\n" 拆行（不用 splitlines，它还会在 \r、\u2028 等字符处断行），
+    行内空白原样保留（它们是活动内容的一部分）。
+    """
+    lines = (line.strip() for line in text.split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def make_key(text: str, version: str) -> str:
+    """计算缓存键"""
+    digest = hashlib.sha256()
+    digest.update(version.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalize_text(text).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ReportCache:
+    """评分报告缓存
+
+    报告以 JSON 文本保存，命中时返回新解析的字典，调用方修改返回值不会污染缓存。
+    """
+
+    def __init__(self, maxsize: int = 1024, disk_path: Optional[str] = None):
+        self.maxsize = maxsize
+        self.disk_path = disk_path
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+        if disk_path:
+            directory = os.path.dirname(disk_path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            self._disk = sqlite3.connect(disk_path, timeout=30, check_same_thread=False)
+            self._disk.execute("PRAGMA journal_mode=WAL")
+            self._disk.executescript(DISK_SCHEMA)
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """查找缓存，未命中返回 None"""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return json.loads(data)
+
+            if self._disk is not None:
+                row = self._disk.execute(
+                    "SELECT report FROM report_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    self.disk_hits += 1
+                    self._remember(key, row[0])
+                    return json.loads(row[0])
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, report: Dict[str, Any]):
+        """写入缓存（磁盘缓存开启时同时落盘）"""
+        data = json.dumps(report, ensure_ascii=False)
+        with self._lock:
+            self._remember(key, data)
+            if self._disk is not None:
+                with self._disk:
+                    self._disk.execute(
+                        "INSERT OR REPLACE INTO report_cache (key, report) VALUES (?, ?)",
+                        (key, data)
+                    )
+
+    def _remember(self, key: str, data: str):
+        self._memory[key] = data
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def clear(self):
+        """清空内存和磁盘缓存"""
+        with self._lock:
+            self._memory.clear()
+            if self._disk is not None:
+                with self._disk:
+                    self._disk.execute("DELETE FROM report_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        """命中统计"""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+            "size": len(self._memory),
+            "maxsize": self.maxsize,
+            "disk_path": self.disk_path
+        }
+
+    def close(self):
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+紧凑的评分数据模型
+活动和报告使用 __slots__ 对象：类别存为类别表中的整数下标，各类别评分存为定长字节数组（单位 0.5 分），
+按类别分组、亮点、改进建议都在读取时从这些字段推导，不再重复保存。
+需要原有字典格式（format_report / save_log / JSON 输出）时调用 to_dict()。
+"""
+
+import sys
+from array import array
+from typing import Dict, List, Any, Iterator, Optional, Sequence, Tuple
+
+# 未命中任何关键词的活动类别，固定排在类别表最后
+OTHER_CATEGORY = "其他"
+
+# 评级从高到低，报告中只保存下标
+RATINGS = ("优秀", "良好", "一般", "较差", "极差")
+
+
+def rating_index(total: float) -> int:
+    """总分对应的评级下标"""
+    if total >= 9:
+        return 0
+    elif total >= 7:
+        return 1
+    elif total >= 5:
+        return 2
+    elif total >= 3:
+        return 3
+    return 4
+
+
+class Activity:
+    """一条活动：小时（字符串，无时间点为 None）、内容、类别下标"""
+
+    __slots__ = ("hour", "content", "category")
+
+    def __init__(self, hour: Optional[str], content: str, category: int):
+        # 小时只有几十种取值，驻留后所有报告共用同一个字符串
+        self.hour = sys.intern(hour) if hour is not None else None
+        self.content = content
+        self.category = category
+
+    @property
+    def time(self) -> Optional[str]:
+        return f"{self.hour}:00" if self.hour is not None else None
+
+    def to_dict(self, names: Sequence[str]) -> Dict[str, Any]:
+        return {"time": self.time, "content": self.content, "category": names[self.category]}
+
+    def __repr__(self):
+        return f"Activity({self.hour!r}, {self.content!r}, {self.category})"
+
+
+class CompactReport:
+    """
+    紧凑的评分报告
+
+    names 为生成报告时的类别表（带权重的类别按权重配置顺序排列，最后是"其他"），
+    由同一分类体系下的所有报告共享；half_scores[i] 是 names[i] 评分的两倍（"其他"不评分）。
+    类别评分都是 0.5 的整数倍，按字节保存没有精度损失；int_mask 记录哪些评分原本是整数，
+    to_dict() 据此还原出与字典格式完全相同的数值类型（日志中显示为 5 而不是 5.0）。
+    """
+
+    __slots__ = ("date", "activities", "half_scores", "int_mask", "total", "rating", "names")
+
+    def __init__(self, date: Optional[str], activities: Tuple[Activity, ...], scores: Sequence[float],
+                 total: float, rating: int, names: Tuple[str, ...]):
+        self.date = date
+        self.activities = activities
+        self.half_scores = array('B', (int(score * 2) for score in scores))
+        self.int_mask = sum(1 << i for i, score in enumerate(scores) if isinstance(score, int))
+        self.total = total
+        self.rating = rating
+        self.names = names
+
+    def score(self, category: int):
+        """某个类别的评分"""
+        half = self.half_scores[category]
+        if self.int_mask >> category & 1:
+            return half // 2
+        return half / 2
+
+    @property
+    def scores(self) -> List[float]:
+        return [self.score(i) for i in range(len(self.half_scores))]
+
+    def group(self, category: int) -> Iterator[Activity]:
+        """某个类别下的活动（按报告中的顺序惰性产出）"""
+        return (a for a in self.activities if a.category == category)
+
+    def category_order(self) -> List[int]:
+        """出现过的类别下标，按首次出现的顺序"""
+        seen = []
+        for activity in self.activities:
+            if activity.category not in seen:
+                seen.append(activity.category)
+        return seen
+
+    def iter_categories(self) -> Iterator[Tuple[str, Iterator[Activity]]]:
+        """按首次出现顺序产出 (类别名, 该类活动)"""
+        for category in self.category_order():
+            yield self.names[category], self.group(category)
+
+    def category_score(self, name: str) -> float:
+        return self.score(self.names.index(name))
+
+    @property
+    def rating_name(self) -> str:
+        return RATINGS[self.rating]
+
+    @property
+    def highlights(self) -> List[str]:
+        # 评分达到 8 分必然有该类活动
+        return [f"{self.names[i]}方面表现优秀" for i, half in enumerate(self.half_scores) if half >= 16]
+
+    @property
+    def suggestions(self) -> List[str]:
+        return [f"增加{self.names[i]}方面的投入" for i, half in enumerate(self.half_scores) if 0 < half < 10]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为原有的报告字典格式（date 为 None 时不含日期）"""
+        names = self.names
+        activities = [a.to_dict(names) for a in self.activities]
+
+        categories: Dict[str, List[Dict[str, Any]]] = {}
+        for activity in activities:
+            categories.setdefault(activity["category"], []).append(activity)
+
+        result: Dict[str, Any] = {} if self.date is None else {"date": self.date}
+        result.update({
+            "activities": activities,
+            "categories": categories,
+            "category_scores": {names[i]: score for i, score in enumerate(self.scores)},
+            "total_score": {"total": self.total, "rating": RATINGS[self.rating]},
+            "highlights": self.highlights,
+            "suggestions": self.suggestions
+        })
+        return result
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+评分存储测试：按周期汇总时只统计日期范围内的记录
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加技能目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_store import LogStore
+
+
+def _report(date, score):
+    return {"date": date, "activities": {}, "category_scores": {"健康": score},
+            "total_score": {"total": score, "rating": ""}, "highlights": [], "suggestions": []}
+
+
+class RollupsRangeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = LogStore(os.path.join(self.tmp.name, "ratings.db"))
+        # 2026-03-01 是周日，02 是下一周的周一
+        for date, score in [("2026-02-27", 2.0), ("2026-03-01", 4.0),
+                            ("2026-03-02", 6.0), ("2026-03-31", 8.0), ("2026-04-01", 10.0)]:
+            self.store.append("记录", _report(date, score), f"{date}T20:00:00")
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_month_clipped_to_range(self):
+        rows = self.store.rollups("month", "2026-03-02", "2026-03-31")
+        self.assertEqual([(r["period"], r["start"], r["end"], r["count"], r["total"]) for r in rows],
+                         [("2026-03", "2026-03-02", "2026-03-31", 2, 7.0)])
+        self.assertEqual(rows[0]["averages"], {"健康": 7.0})
+
+    def test_week_edges_clipped(self):
+        rows = self.store.rollups("week", "2026-03-01", "2026-03-02")
+        self.assertEqual([(r["start"], r["end"], r["count"], r["total"]) for r in rows],
+                         [("2026-03-01", "2026-03-01", 1, 4.0), ("2026-03-02", "2026-03-02", 1, 6.0)])
+
+    def test_clipped_period_without_records_dropped(self):
+        rows = self.store.rollups("month", "2026-03-10", "2026-03-20")
+        self.assertEqual(rows, [])
+
+    def test_full_periods_unchanged(self):
+        rows = self.store.rollups("month")
+        self.assertEqual([(r["period"], r["count"], r["total"]) for r in rows],
+                         [("2026-02", 1, 2.0), ("2026-03", 3, 6.0), ("2026-04", 1, 10.0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+日志写入器测试：持续写入时按刷新间隔提交，关闭时不丢日志
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+# 添加技能目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_writer import LogWriter
+
+
+class LogWriterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "output_2026-03-01.txt")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _lines(self):
+        with open(self.path, encoding="utf-8") as f:
+            return f.read().splitlines()
+
+    def test_steady_stream_commits_every_interval(self):
+        writer = LogWriter(flush_interval=0.1)
+        try:
+            # 间隔小于刷新间隔的持续写入：按空闲计时会一直等到攒满 max_batch
+            end = time.monotonic() + 0.6
+            while time.monotonic() < end:
+                writer.append(self.path, "记录\n")
+                time.sleep(0.01)
+            self.assertGreaterEqual(writer.commits, 2)
+        finally:
+            writer.close()
+
+    def test_close_while_appending_keeps_every_line(self):
+        writer = LogWriter(flush_interval=0.01)
+        started = threading.Event()
+
+        def produce(index):
+            started.set()
+            for n in range(300):
+                writer.append(self.path, f"{index}-{n}\n")
+
+        threads = [threading.Thread(target=produce, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        started.wait()
+        writer.close()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self._lines()), 1200)
+
+    def test_append_after_close_writes_directly(self):
+        writer = LogWriter()
+        writer.close()
+        writer.append(self.path, "记录\n")
+        self.assertEqual(self._lines(), ["记录"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+评分服务客户端测试：只有连接失败时才退回本地评分
+"""
+
+import http.server
+import os
+import socket
+import sys
+import threading
+import unittest
+
+# 添加技能目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import rater_client
+
+
+def _unused_url():
+    """返回一个没有服务监听的本地地址"""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return f"http://127.0.0.1:{port}"
+
+
+class _Server:
+    """在后台线程中运行的测试服务"""
+
+    def __init__(self, handler):
+        self.httpd = http.server.HTTPServer(("127.0.0.1", 0), handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class SlowHandler(http.server.BaseHTTPRequestHandler):
+    """读取请求后迟迟不响应，模拟正在评分的服务"""
+    release = threading.Event()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.release.wait(5)
+
+    def log_message(self, *args):
+        pass
+
+
+class ProxyErrorHandler(http.server.BaseHTTPRequestHandler):
+    """返回非 JSON 错误页面，模拟被代理改写的响应"""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = b"<html>Bad Gateway</html>"
+        self.send_response(502)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class RaterClientTest(unittest.TestCase):
+
+    def test_connection_refused_falls_back(self):
+        url = _unused_url()
+        self.assertIsNone(rater_client._post("/rate", {"text": "跑步30分钟"}, url))
+        report = rater_client.rate("跑步30分钟", save_log_flag=False, date="2026-3-1", url=url)
+        self.assertEqual(report["date"], "2026-03-01")
+
+    def test_read_timeout_raises(self):
+        with _Server(SlowHandler) as server:
+            try:
+                with self.assertRaises(ConnectionError):
+                    rater_client._post("/rate", {"text": "跑步30分钟"}, server.url, timeout=0.2)
+            finally:
+                SlowHandler.release.set()
+
+    def test_non_json_error_uses_status_line(self):
+        with _Server(ProxyErrorHandler) as server:
+            with self.assertRaisesRegex(ValueError, "502 Bad Gateway"):
+                rater_client._post("/rate", {"text": "跑步30分钟"}, server.url)
+
+    def test_fallback_validates_date_and_user(self):
+        url = _unused_url()
+        with self.assertRaisesRegex(ValueError, "无效的日期"):
+            rater_client.rate("跑步30分钟", save_log_flag=False, date="2026-13-01", url=url)
+        with self.assertRaisesRegex(ValueError, "无效的用户名"):
+            rater_client.rate("跑步30分钟", save_log_flag=False, user="../etc", url=url)
+        with self.assertRaisesRegex(ValueError, "第 2 条记录"):
+            rater_client.rate_batch([{"text": "跑步"}, {"text": "跑步", "date": "昨天"}], url=url)
+
+
+if __name__ == "__main__":
+    unittest.main()
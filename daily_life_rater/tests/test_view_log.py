@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+日志查看测试：--follow 时跨两次追加的多字节字符不能被替换为 U+FFFD
+"""
+
+import io
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# 添加技能目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import view_log
+
+
+class FollowFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "output_2026-03-01.txt")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_follow_keeps_split_character(self):
+        data = "跑步30分钟，学习Python\n".encode("utf-8")
+        # 每次追加都切在多字节字符中间
+        pieces = [data[:1], data[1:4], data[4:8], data[8:]]
+        with open(self.path, "wb"):
+            pass
+
+        def append_next(delay):
+            if not pieces:
+                raise KeyboardInterrupt
+            with open(self.path, "ab") as f:
+                f.write(pieces.pop(0))
+
+        out = io.StringIO()
+        with mock.patch.object(view_log.time, "sleep", append_next):
+            view_log.follow_file(self.path, 0, out=out)
+        self.assertEqual(out.getvalue(), data.decode("utf-8"))
+
+    def test_stream_file_finalizes_without_decoder(self):
+        with open(self.path, "wb") as f:
+            f.write("评分".encode("utf-8")[:4])
+        out = io.StringIO()
+        self.assertEqual(view_log.stream_file(self.path, 0, out), 4)
+        self.assertEqual(out.getvalue(), "评�")
+
+
+if __name__ == "__main__":
+    unittest.main()
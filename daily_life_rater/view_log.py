@@ -5,15 +5,36 @@
 查看每日评分日志
 """
 
+import codecs
+import mmap
 import sys
 import os
+import time
 from datetime import datetime
+from typing import Optional, Tuple
 
 # 添加技能目录到路径
 script_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, script_dir)
 
+from log_store import user_logs_dir, list_users, validate_date
+
 LOGS_DIR = os.path.join(script_dir, 'logs')
+DB_PATH = os.path.join(LOGS_DIR, 'ratings.db')
+
+# 日志条目开头：分隔线 + 标题行（用于从文件末尾向前定位）
+ENTRY_SEPARATOR = ("=" * 60).encode('utf-8')
+ENTRY_TITLE = "每日作息评分日志 - ".encode('utf-8')
+
+# 流式输出每次读取的字节数
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# --follow 轮询间隔（秒）：有新内容时为 FOLLOW_INTERVAL，空闲时逐步放慢到 FOLLOW_MAX_INTERVAL
+FOLLOW_INTERVAL = 0.2
+FOLLOW_MAX_INTERVAL = 2.0
+
+# 汇总周期显示名称
+PERIOD_NAMES = {"day": "日", "week": "周", "month": "月", "year": "年"}
 
 
 def get_log_filename(date: str = None):
@@ -23,67 +44,302 @@ def get_log_filename(date: str = None):
     return f"output_{date}.txt"
 
 
-def show_log(date: str = None):
-    """显示指定日期的日志"""
+def find_tail_start(buf, count: int, end: Optional[int] = None) -> Tuple[int, int]:
+    """
+    从末尾向前查找最后 count 条日志的起始偏移
+
+    buf 为 bytes 或 mmap，只向前查找分隔线 + 标题行，不从头读取。
+    返回 (起始偏移, 实际找到的条数)；条数不足时起始偏移为 0。
+    """
+    if end is None:
+        end = len(buf)
+    found = 0
+    while found < count:
+        pos = buf.rfind(ENTRY_TITLE, 0, end)
+        if pos < 0:
+            return 0, found
+        end = pos
+        # 标题行前一行必须是完整的分隔线（兼容 \r\n 换行）
+        line_end = pos - 1
+        if line_end >= 0 and buf[line_end:pos] == b"\n":
+            if line_end >= 1 and buf[line_end - 1:line_end] == b"\r":
+                line_end -= 1
+            line_start = line_end - len(ENTRY_SEPARATOR)
+            if (line_start >= 0 and buf[line_start:line_end] == ENTRY_SEPARATOR
+                    and (line_start == 0 or buf[line_start - 1:line_start] == b"\n")):
+                found += 1
+                end = line_start
+    return end, found
+
+
+def tail_file(path: str, count: int) -> Tuple[int, int]:
+    """文件中最后 count 条日志的起始偏移和实际条数（通过 mmap 向前查找，不读取整个文件）"""
+    size = os.path.getsize(path)
+    if size == 0:
+        return 0, 0
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return find_tail_start(mm, count)
+
+
+def stream_file(path: str, offset: int = 0, out=None, decoder=None) -> int:
+    """
+    从 offset 开始分块输出文件内容，返回读到的结尾偏移；内存占用与文件大小无关
+
+    传入 decoder 时不结束解码：结尾不完整的多字节字符留在 decoder 中，
+    与下一次读到的内容拼接（--follow 时写入方可能正好写到字符中间）。
+    """
+    out = out or sys.stdout
+    final = decoder is None
+    if final:
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        while True:
+            chunk = f.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            offset += len(chunk)
+            out.write(decoder.decode(chunk))
+    if final:
+        out.write(decoder.decode(b"", final=True))
+    out.flush()
+    return offset
+
+
+def follow_file(path: str, offset: int, interval: float = FOLLOW_INTERVAL, out=None, decoder=None):
+    """
+    持续输出文件新追加的内容，直到 Ctrl+C
+
+    只轮询文件大小（os.stat），有新内容时才读取；长时间没有新内容时逐步放慢轮询，
+    最长间隔 FOLLOW_MAX_INTERVAL 秒。文件被截断或重建时从头开始。
+    整个过程共用一个增量解码器，跨两次追加的多字节字符也能正确输出。
+    """
+    out = out or sys.stdout
+    decoder = decoder or codecs.getincrementaldecoder('utf-8')(errors='replace')
+    delay = interval
+    try:
+        while True:
+            try:
+                size = os.stat(path).st_size
+            except FileNotFoundError:
+                size = 0
+            if size < offset:
+                offset = 0
+                decoder.reset()
+            if size > offset:
+                offset = stream_file(path, offset, out, decoder)
+                delay = interval
+            else:
+                delay = min(delay * 2, FOLLOW_MAX_INTERVAL)
+            time.sleep(delay)
+    except KeyboardInterrupt:
+        pass
+
+
+def show_log(date: str = None, user: str = None, tail: Optional[int] = None, follow: bool = False):
+    """
+    显示指定日期的日志（指定 user 时只读取该用户的日志目录）
+
+    文件分块流式输出；tail 指定时只显示最后 tail 条，从文件末尾向前定位；
+    follow 为 True 时输出完毕后继续等待并显示新追加的日志。
+    """
     if date is None:
         date = datetime.now().strftime("%Y-%m-%d")
 
+    from log_archive import read_archived
+
+    logs_dir = user_logs_dir(LOGS_DIR, user)
     log_filename = get_log_filename(date)
-    log_path = os.path.join(LOGS_DIR, log_filename)
+    log_path = os.path.join(logs_dir, log_filename)
 
-    if not os.path.exists(log_path):
+    # 已归档的月份只解压这一天的帧；归档后补录的记录仍在文本文件中
+    archived = read_archived(logs_dir, date)
+
+    if archived is None and not os.path.exists(log_path) and not follow:
         print(f"日志文件不存在：{log_filename}")
         return
 
     print("=" * 60)
-    print(f"日志文件：{log_filename}")
+    print(f"日志文件：{log_filename}{'（已归档）' if archived is not None else ''}")
     print("=" * 60)
     print()
 
-    with open(log_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-        print(content)
+    offset = 0
+    remaining = tail
+    if tail is not None and os.path.exists(log_path):
+        offset, found = tail_file(log_path, tail)
+        remaining = tail - found
+
+    if archived is not None and remaining != 0:
+        data = archived.encode('utf-8')
+        start = find_tail_start(data, remaining)[0] if remaining is not None else 0
+        sys.stdout.write(data[start:].decode('utf-8'))
+        sys.stdout.flush()
+
+    # --follow 时与后续轮询共用解码器，不在已有内容的结尾截断多字节字符
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace') if follow else None
+    if os.path.exists(log_path):
+        offset = stream_file(log_path, offset, decoder=decoder)
 
+    if follow:
+        follow_file(log_path, offset, decoder=decoder)
 
-def list_logs():
-    """列出所有日志文件"""
-    if not os.path.exists(LOGS_DIR):
-        print("logs 文件夹不存在")
+
+def list_logs(user: str = None):
+    """列出所有日志文件（指定 user 时只列出该用户的日志）"""
+    logs_dir = user_logs_dir(LOGS_DIR, user)
+    if not os.path.exists(logs_dir):
+        print("logs 文件夹不存在" if user is None else f"用户 {user} 暂无日志")
         return
 
-    log_files = [f for f in os.listdir(LOGS_DIR) if f.startswith('output_') and f.endswith('.txt')]
+    from log_archive import archived_dates
+
+    log_files = [f for f in os.listdir(logs_dir) if f.startswith('output_') and f.endswith('.txt')]
+    dates = {f.replace('output_', '').replace('.txt', '') for f in log_files}
+    archived = set(archived_dates(logs_dir))
 
-    if not log_files:
+    if not dates and not archived:
         print("暂无日志文件")
         return
 
-    log_files.sort(reverse=True)  # 按日期降序排列
-
     print("可用日志文件：")
     print("-" * 60)
-    for log_file in log_files:
-        date = log_file.replace('output_', '').replace('.txt', '')
-        print(f"  {date}")
+    for date in sorted(dates | archived, reverse=True):  # 按日期降序排列
+        print(f"  {date}{'（已归档）' if date in archived else ''}")
     print()
 
 
+def list_user_logs():
+    """列出有日志的用户"""
+    users = list_users(LOGS_DIR)
+    if not users:
+        print("暂无用户日志")
+        return
+
+    print("用户：")
+    print("-" * 60)
+    for user in users:
+        print(f"  {user}")
+    print()
+
+
+def open_store(user: str = None):
+    """打开结构化日志存储，不存在时返回 None"""
+    db_path = os.path.join(user_logs_dir(LOGS_DIR, user), 'ratings.db')
+    if not os.path.exists(db_path):
+        print(f"结构化日志不存在：{os.path.relpath(db_path, script_dir)}")
+        return None
+    from log_store import LogStore
+    return LogStore(db_path)
+
+
+def show_summary(date_from: str = None, date_to: str = None, period: str = "day", top: int = 3,
+                 user: str = None):
+    """按周期显示各类别平均分、总分趋势，以及最好和最差的日子"""
+    from daily_life_rater import CATEGORY_WEIGHTS
+
+    store = open_store(user)
+    if store is None:
+        return
+
+    with store:
+        rows = store.rollups(period, date_from, date_to)
+        if not rows:
+            print("指定范围内没有评分记录")
+            return
+
+        categories = list(CATEGORY_WEIGHTS.keys())
+        range_text = f"{date_from or rows[0]['start']} ~ {date_to or rows[-1]['end']}"
+        # 首尾周期可能被日期范围裁剪，按周/月/年汇总时显示每个周期实际统计的日期
+        show_bounds = period != "day"
+
+        print("=" * 60)
+        print(f"评分汇总（按{PERIOD_NAMES[period]}）：{range_text}")
+        print("=" * 60)
+        print(" | ".join(["周期"] + (["日期"] if show_bounds else []) + ["记录数"] + categories + ["总分"]))
+        print("-" * 60)
+        for row in rows:
+            bounds = [f"{row['start']}~{row['end']}"] if show_bounds else []
+            values = [f"{row['averages'].get(cat, 0.0):.1f}" for cat in categories]
+            print(" | ".join([row["period"]] + bounds + [str(row["count"])] + values + [f"{row['total']:.1f}"]))
+        print()
+
+        print("【总分趋势】")
+        print("-" * 60)
+        for row in rows:
+            bar = "█" * int(round(row["total"]))
+            print(f"{row['period']:<12} {row['total']:>4.1f} {bar}")
+        print()
+
+        print("【最好的日子】")
+        print("-" * 60)
+        for date, total in store.extreme_days(date_from, date_to, top):
+            print(f"  {date}  {total:.1f}")
+        print()
+
+        print("【最差的日子】")
+        print("-" * 60)
+        for date, total in store.extreme_days(date_from, date_to, top, worst=True):
+            print(f"  {date}  {total:.1f}")
+        print()
+
+
+def _date_arg(value):
+    """日期参数：必须是 YYYY-MM-DD，统一补零后与数据库中的日期按字符串比较"""
+    import argparse
+
+    try:
+        return validate_date(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
 def main():
     """主函数"""
     import argparse
 
     parser = argparse.ArgumentParser(description='查看每日作息评分日志')
-    parser.add_argument('--date', '-d', type=str, help='指定日期 (YYYY-MM-DD)')
+    parser.add_argument('--date', '-d', type=_date_arg, help='指定日期 (YYYY-MM-DD)')
     parser.add_argument('--list', '-l', action='store_true', help='列出所有日志文件')
+    parser.add_argument('--user', '-u', type=str, default=None, help='只查看该用户的日志')
+    parser.add_argument('--tail', '-n', type=int, default=None, help='只显示最后 N 条日志')
+    parser.add_argument('--follow', '-f', action='store_true', help='持续显示新追加的日志（Ctrl+C 退出）')
+    parser.add_argument('--users', action='store_true', help='列出有日志的用户')
+    parser.add_argument('--from', dest='date_from', type=_date_arg, help='汇总起始日期 (YYYY-MM-DD)')
+    parser.add_argument('--to', dest='date_to', type=_date_arg, help='汇总结束日期 (YYYY-MM-DD)')
+    parser.add_argument('--by', type=str, choices=list(PERIOD_NAMES.keys()),
+                        help='按日/周/月/年汇总 (day/week/month/year)')
+    parser.add_argument('--top', type=int, default=3, help='显示最好和最差的天数')
+    parser.add_argument('--archive', action='store_true', help='把已结束月份的日志打包为压缩段文件')
 
     args = parser.parse_args()
+    if args.date_from and args.date_to and args.date_from > args.date_to:
+        parser.error(f"--from {args.date_from} 晚于 --to {args.date_to}")
+
+    if args.user is not None:
+        from log_store import validate_user
+        try:
+            validate_user(args.user)
+        except ValueError as e:
+            print(f"错误：{e}")
+            sys.exit(1)
 
-    if args.list:
-        list_logs()
+    if args.users:
+        list_user_logs()
+    elif args.archive:
+        from log_archive import archive_logs
+        summary = archive_logs(user_logs_dir(LOGS_DIR, args.user))
+        print(f"已归档 {len(summary['months'])} 个月、{summary['files']} 个日志文件，"
+              f"{summary['raw_bytes']} 字节 -> {summary['segment_bytes']} 字节")
+    elif args.list:
+        list_logs(args.user)
+    elif args.date_from or args.date_to or args.by:
+        show_summary(args.date_from, args.date_to, args.by or "day", args.top, args.user)
     elif args.date:
-        show_log(args.date)
+        show_log(args.date, args.user, args.tail, args.follow)
     else:
         # 默认显示今天的日志
-        show_log()
+        show_log(user=args.user, tail=args.tail, follow=args.follow)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+周报任务归类脚本
+
+把一周零散的工作列表整理成 generate_report.py 需要的周报数据（category / items / workload），
+完全在本地按规则完成，不依赖模型，毫秒级返回、结果可复现。
+
+处理步骤（与 SKILL.md 的核心工作流一致）：
+1. 按天拆分 - 编号断层（如 1、2 之后又从 1 开始）或"周一""[周二的工作]"等标题开始新的一天
+2. 按功能模块归类 - 条目归入第一个命中的模块关键词所在的模块；
+   只命中通用关键词（表结构、原型等）的条目跟随同一天中含相同关键词的条目归类
+3. 分配工时 - 按工作类型权重（会议 0.8、需求/梳理 1.0、设计 1.2、开发 1.5、调研/总结 1.0）
+   把总工时按 0.5 取整分配到各模块，总和精确等于总工时
+"""
+
+import json
+import os
+import re
+import sys
+from datetime import datetime
+
+# 功能模块：(模块名, 模块关键词)
+MODULES = [
+    ("拌合站发料管理模块", ["拌合站", "拌和站", "发料", "配合比"]),
+    ("供应商发货系统", ["供应商发货", "供应商"]),
+    ("项目部发货管理", ["项目部发货", "发货申请"]),
+    ("实验室成品管理模块", ["实验室", "成品"]),
+    ("电子签名功能优化", ["电子签名", "签名", "签章"]),
+    ("前端基础设施", ["前端基础设施", "前端框架", "脚手架", "组件库"]),
+]
+
+# 通用关键词及找不到同一天的相关条目时归入的模块
+GENERIC_KEYWORDS = {
+    "表结构": "表结构设计",
+    "数据库": "表结构设计",
+    "原型": "原型设计",
+    "H5": "原型设计",
+    "接口": "后端接口开发",
+}
+
+# 无法归类的条目
+OTHER_MODULE = "其他工作"
+
+# 工作类型权重（SKILL.md 第三步）；会议讨论类条目按会议计，其余取命中类型中的最大权重
+MEETING_WEIGHT = 0.8
+MEETING_KEYWORDS = ["会议", "讨论", "评审", "沟通", "对接"]
+WORK_TYPE_WEIGHTS = [
+    (1.5, ["开发", "实现", "接口", "H5", "页面", "编码", "联调"]),
+    (1.2, ["设计", "表结构", "原型", "建模"]),
+    (1.0, ["需求", "梳理", "分析", "流程", "调研", "总结", "文档"]),
+]
+DEFAULT_WEIGHT = 1.0
+
+# 一周总工时（人/天）和取整粒度
+TOTAL_WORKLOAD = 5.0
+WORKLOAD_STEP = 0.5
+
+# 编号条目：1. / 1、/ 1) / （1）等
+ITEM_PATTERN = re.compile(r'^[（(]?(\d{1,3})(?:[.．](?!\d)|[、)）]|\s)\s*')
+# 无编号条目的项目符号
+BULLET_PATTERN = re.compile(r'^\s*[-*•·]\s*')
+# 日期标题：周一、星期二、[周三的工作]、Monday 等
+DAY_HEADER_PATTERN = re.compile(
+    r'^[\[【(（]?\s*(?:周[一二三四五六日天]|星期[一二三四五六日天]|礼拜[一二三四五六日天]|'
+    r'(?:mon|tues|wednes|thurs|fri|satur|sun)day)(?:的工作|工作)?\s*[\]】)）]?\s*[：:，,]?\s*', re.IGNORECASE)
+WEIGHT_PATTERN = re.compile('|'.join(re.escape(k) for k in sorted(
+    MEETING_KEYWORDS + [k for _, keywords in WORK_TYPE_WEIGHTS for k in keywords], key=len, reverse=True)))
+_KEYWORD_WEIGHTS = {k: weight for weight, keywords in WORK_TYPE_WEIGHTS for k in keywords}
+
+
+class ModuleIndex:
+    """
+    预编译的模块关键词索引
+
+    所有关键词编译成一个正则（长关键词优先），一次扫描即可找出条目中命中的全部关键词。
+    """
+
+    def __init__(self, modules=None, generic=None):
+        modules = MODULES if modules is None else modules
+        generic = GENERIC_KEYWORDS if generic is None else generic
+
+        self.keyword_modules = {}
+        for name, keywords in modules:
+            for keyword in keywords:
+                self.keyword_modules.setdefault(keyword, name)
+        self.generic = {k: v for k, v in generic.items() if k not in self.keyword_modules}
+
+        keywords = sorted(set(self.keyword_modules) | set(self.generic), key=len, reverse=True)
+        self.pattern = re.compile('|'.join(re.escape(k) for k in keywords)) if keywords else None
+
+    def match(self, text):
+        """返回 (第一个命中的模块名或 None, 命中的通用关键词列表)"""
+        module = None
+        generic = []
+        if self.pattern is None:
+            return module, generic
+        for m in self.pattern.finditer(text):
+            keyword = m.group(0)
+            if keyword in self.keyword_modules:
+                if module is None:
+                    module = self.keyword_modules[keyword]
+            elif keyword not in generic:
+                generic.append(keyword)
+        return module, generic
+
+
+DEFAULT_INDEX = ModuleIndex()
+
+
+def load_rules(path):
+    """
+    读取自定义分类规则
+
+    JSON 格式：{"模块名": ["关键词", ...], ...}，排在默认模块之前优先匹配。
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        rules = json.load(f)
+    if not isinstance(rules, dict) or not all(
+            isinstance(v, list) and all(isinstance(k, str) for k in v) for v in rules.values()):
+        raise ValueError("分类规则必须是 {模块名: [关键词, ...]} 格式")
+    return ModuleIndex(list(rules.items()) + MODULES)
+
+
+def split_days(text):
+    """
+    按天拆分工作内容
+
+    Returns:
+        [[条目, ...], ...]，每个子列表是一天的工作
+    """
+    days = []
+    current = []
+    last_number = None
+
+    def close_day():
+        nonlocal current, last_number
+        if current:
+            days.append(current)
+        current = []
+        last_number = None
+
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+
+        m = DAY_HEADER_PATTERN.match(line)
+        if m:
+            close_day()
+            # "周一：完成 xx"这样标题后直接跟工作内容时，其余部分作为当天的条目
+            line = line[m.end():]
+            if not line:
+                continue
+
+        m = ITEM_PATTERN.match(line)
+        if m:
+            number = int(m.group(1))
+            item = line[m.end():].strip()
+            # 编号断层：编号没有递增，说明进入了新的一天
+            if last_number is not None and number <= last_number:
+                close_day()
+            last_number = number
+            if item:
+                current.append(item)
+            continue
+
+        if line.endswith(('：', ':')):
+            # "生成周报，本周工作内容："之类的说明行
+            continue
+
+        item = BULLET_PATTERN.sub('', line).strip()
+        if item:
+            current.append(item)
+
+    close_day()
+    return days
+
+
+def item_weight(item):
+    """条目的工作类型权重"""
+    keywords = WEIGHT_PATTERN.findall(item)
+    if any(k in MEETING_KEYWORDS for k in keywords):
+        return MEETING_WEIGHT
+    weights = [_KEYWORD_WEIGHTS[k] for k in keywords if k in _KEYWORD_WEIGHTS]
+    return max(weights) if weights else DEFAULT_WEIGHT
+
+
+def categorize(days, index=DEFAULT_INDEX):
+    """
+    按功能模块归类
+
+    Returns:
+        {模块名: [条目, ...]}，模块按首次出现的顺序排列，条目保持原有顺序
+    """
+    categories = {}
+    for day in days:
+        matches = [index.match(item) for item in day]
+        for i, (item, (module, generic)) in enumerate(zip(day, matches)):
+            if module is None and generic:
+                # 跟随同一天中距离最近、含相同通用关键词且能确定模块的条目
+                neighbours = sorted(range(len(day)), key=lambda j: (abs(j - i), j))
+                for j in neighbours:
+                    other_module, other_generic = matches[j]
+                    if j != i and other_module is not None and set(generic) & set(other_generic):
+                        module = other_module
+                        break
+                else:
+                    module = index.generic[generic[0]]
+            categories.setdefault(module or OTHER_MODULE, []).append(item)
+    return categories
+
+
+def workload_units(total=TOTAL_WORKLOAD, step=WORKLOAD_STEP):
+    """
+    总工时折合的取整单位数
+
+    Raises:
+        ValueError: total 不是 step 的正整数倍（否则分配结果的总和无法精确等于 total）
+    """
+    units = int(round(total / step))
+    if units <= 0 or abs(units * step - total) > 1e-9:
+        raise ValueError(f"总工时必须是 {step:g} 的正整数倍：{total:g}")
+    return units
+
+
+def allocate_workload(weights, total=TOTAL_WORKLOAD, step=WORKLOAD_STEP):
+    """
+    把总工时按权重分配到各模块
+
+    以 step 为单位用最大余数法取整，总和精确等于 total，每个模块至少分到 step。
+
+    Args:
+        weights: [权重, ...]
+
+    Returns:
+        [工时, ...]，与 weights 顺序一致
+
+    Raises:
+        ValueError: total 不是 step 的整数倍，或模块数超过可分配的单位数
+            （build_tasks 会先把多余的模块合并为"其他工作"）
+    """
+    if not weights:
+        return []
+    units = workload_units(total, step)
+    if len(weights) > units:
+        raise ValueError(f"{len(weights)} 个模块超过了总工时 {total:g} 能分配的 {units} 份")
+    weight_sum = sum(weights)
+    if weight_sum <= 0:
+        weights = [1.0] * len(weights)
+        weight_sum = float(len(weights))
+
+    free_units = units - len(weights)
+    ideal = [w / weight_sum * free_units for w in weights]
+    allocated = [int(x) for x in ideal]
+
+    # 剩余单位按小数部分从大到小分配，相同时优先权重大的模块
+    order = sorted(range(len(weights)), key=lambda i: (-(ideal[i] - allocated[i]), -weights[i], i))
+    for i in order[:free_units - sum(allocated)]:
+        allocated[i] += 1
+
+    return [(a + 1) * step for a in allocated]
+
+
+def merge_small_modules(categories, names, weights, units):
+    """
+    模块数超过可分配的单位数时，保留权重最大的 units - 1 个模块，其余条目合并到"其他工作"
+
+    保证每个模块至少分到一个单位，不会出现工时为 0 的行。categories 中的条目就地合并。
+
+    Returns:
+        (模块名列表, 权重列表)
+    """
+    if len(names) <= units:
+        return names, weights
+
+    ranked = sorted((i for i, name in enumerate(names) if name != OTHER_MODULE),
+                    key=lambda i: (-weights[i], i))
+    keep = set(ranked[:units - 1])
+    merged_items = []
+    merged_weight = 0.0
+    for i, name in enumerate(names):
+        if i not in keep:
+            merged_items.extend(categories.pop(name))
+            merged_weight += weights[i]
+    categories[OTHER_MODULE] = merged_items
+
+    kept = [i for i in range(len(names)) if i in keep]
+    return [names[i] for i in kept] + [OTHER_MODULE], [weights[i] for i in kept] + [merged_weight]
+
+
+def build_tasks(text, index=DEFAULT_INDEX, total=TOTAL_WORKLOAD):
+    """
+    从一周的工作内容生成周报任务列表
+
+    Returns:
+        [{"category", "items", "workload"}, ...]，按工时从大到小排列
+    """
+    categories = categorize(split_days(text), index)
+    names = list(categories)
+    weights = [sum(item_weight(item) for item in categories[name]) for name in names]
+    names, weights = merge_small_modules(categories, names, weights, workload_units(total))
+    workloads = allocate_workload(weights, total)
+
+    order = sorted(range(len(names)), key=lambda i: (-workloads[i], i))
+    return [
+        {"category": names[i], "items": categories[names[i]], "workload": workloads[i]}
+        for i in order
+    ]
+
+
+def build_report_data(text, name, title, date=None, index=DEFAULT_INDEX, total=TOTAL_WORKLOAD):
+    """生成 generate_report.py 使用的周报数据"""
+    return {
+        "name": name,
+        "title": title,
+        "date": date or datetime.now().strftime("%Y%m%d"),
+        "tasks": build_tasks(text, index, total)
+    }
+
+
+def format_summary(report_data):
+    """工作总结文本"""
+    lines = ["📊 工作总结："]
+    for task in report_data['tasks']:
+        workload = task['workload']
+        workload_text = str(int(workload)) if workload == int(workload) else f"{workload:.1f}"
+        lines.append(f"✓ {task['category']}（{workload_text}人/天）")
+        for i, item in enumerate(task['items'], 1):
+            lines.append(f"  {i}. {item}")
+        lines.append("")
+    return "\n".join(lines).rstrip()
+
+
+def _total_arg(value):
+    """--total 参数：必须是取整粒度的正整数倍"""
+    import argparse
+
+    try:
+        total = float(value)
+        workload_units(total)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return total
+
+
+def main():
+    """
+    主函数 - 用于命令行调用
+
+    用法：
+        python categorize_tasks.py <工作内容文本文件|-> --name 姓名 --title 职责 [--date YYYYMMDD] [-o 输出JSON]
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description='把一周的工作内容整理成周报数据')
+    parser.add_argument('input', help='工作内容文本文件，- 表示从标准输入读取')
+    parser.add_argument('--name', required=True, help='姓名')
+    parser.add_argument('--title', required=True, help='职责')
+    parser.add_argument('--date', default=None, help='周报日期 (YYYYMMDD)，默认为今天')
+    parser.add_argument('--rules', default=None, help='自定义分类规则 JSON：{"模块名": ["关键词", ...]}')
+    parser.add_argument('--total', type=_total_arg, default=TOTAL_WORKLOAD,
+                        help=f'一周总工时（人/天），须为 {WORKLOAD_STEP:g} 的整数倍，默认 5')
+    parser.add_argument('--output', '-o', default=None, help='输出 JSON 文件，默认输出到标准输出')
+    args = parser.parse_args()
+
+    try:
+        if args.input == '-':
+            text = sys.stdin.read()
+        else:
+            with open(args.input, 'r', encoding='utf-8') as f:
+                text = f.read()
+        index = load_rules(args.rules) if args.rules else DEFAULT_INDEX
+    except (OSError, ValueError) as e:
+        print(f"错误：{e}")
+        sys.exit(1)
+
+    report_data = build_report_data(text, args.name, args.title, args.date, index, args.total)
+    if not report_data['tasks']:
+        print("错误：没有识别到工作条目")
+        sys.exit(1)
+
+    if args.output is None:
+        print(json.dumps(report_data, ensure_ascii=False, indent=2))
+        return
+
+    output_dir = os.path.dirname(os.path.abspath(args.output))
+    os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report_data, f, ensure_ascii=False, indent=2)
+    print(format_summary(report_data))
+    print()
+    print(f"✅ 周报数据已保存：{args.output}")
+
+
+if __name__ == '__main__':
+    # 确保 Windows 环境下正确处理 UTF-8
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+python-docx 文档骨架缓存
+
+python-docx 每次 Document() 都要重新加载默认模板、解析全部样式部件，保存时再把所有部件序列化一遍；
+而周报、学习计划这类文档的字体、表格样式、表头每次都完全相同。
+
+骨架缓存把这些固定内容构建成一份骨架文档，每个进程只构建一次（可选持久化到磁盘，
+其他进程直接读取）。生成每份文档时只复制正文部件（word/document.xml），样式查找共用骨架的部件；
+保存时只序列化正文，其余部件直接写出骨架中已序列化好的字节。
+
+用法：
+    skeleton = get_skeleton("weekly_report", build_function, key="宋体|姓名|职责|任务|工时(人/天)")
+    doc = skeleton.clone()
+    ...  # 使用 python-docx 接口填充内容（不能添加图片、超链接等新部件）
+    skeleton.save(doc, output_path)
+"""
+
+import copy
+import hashlib
+import inspect
+import io
+import marshal
+import os
+import tempfile
+import zipfile
+
+import docx
+from docx.document import Document as DocumentProxy
+from docx.opc.oxml import serialize_part_xml
+
+# 设置该环境变量后，骨架文档持久化到此目录，后续进程直接读取
+SKELETON_DIR_ENV = 'DOCX_SKELETON_DIR'
+
+DOCUMENT_PART = 'word/document.xml'
+
+# 骨架文件格式版本：DocxSkeleton 读写方式变化时递增，使持久化的骨架全部失效
+SKELETON_VERSION = 1
+
+# zip 条目使用固定的修改时间，内容相同的文档逐字节相同，重复生成不会让同步工具认为文件有变化
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+# 进程内缓存：{(名称, 键): DocxSkeleton}
+_skeletons = {}
+
+
+def _zip_info(name):
+    info = zipfile.ZipInfo(name, date_time=ZIP_DATE_TIME)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.external_attr = 0o600 << 16
+    return info
+
+
+class DocxSkeleton:
+    """一份构建好的骨架文档，可反复克隆"""
+
+    def __init__(self, data):
+        self.data = data
+        self._document = docx.Document(io.BytesIO(data))
+
+        # 除正文外的部件预先压缩成一个 zip，保存时在其后追加正文即可，不必重新压缩
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(io.BytesIO(data)) as source, \
+                zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as package:
+            names = source.namelist()
+            if DOCUMENT_PART not in names:
+                raise ValueError(f"骨架文档缺少 {DOCUMENT_PART}")
+            for name in names:
+                if name != DOCUMENT_PART:
+                    package.writestr(_zip_info(name), source.read(name))
+        self._package = buffer.getvalue()
+
+    def clone(self):
+        """复制骨架正文，返回可用 python-docx 接口填充的文档"""
+        return DocumentProxy(copy.deepcopy(self._document.element), self._document.part)
+
+    def save(self, document, output_path):
+        """保存克隆出的文档：只序列化和压缩正文，其余部件沿用骨架"""
+        buffer = io.BytesIO(self._package)
+        with zipfile.ZipFile(buffer, 'a', zipfile.ZIP_DEFLATED) as package:
+            package.writestr(_zip_info(DOCUMENT_PART), serialize_part_xml(document.element))
+        with open(output_path, 'wb') as f:
+            f.write(buffer.getvalue())
+
+
+def _builder_digest(build):
+    """构建函数源码的哈希：修改版式代码后持久化的旧骨架自动失效"""
+    try:
+        source = inspect.getsource(build).encode('utf-8')
+    except (OSError, TypeError):
+        # 没有源码（如交互式定义、只有 .pyc）时退回到字节码
+        code = getattr(build, '__code__', None)
+        source = marshal.dumps(code) if code is not None else repr(build).encode('utf-8')
+    return hashlib.sha1(source).hexdigest()
+
+
+def _skeleton_path(directory, name, key, build):
+    payload = f"{key}|python-docx {docx.__version__}|v{SKELETON_VERSION}|{_builder_digest(build)}"
+    digest = hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(directory, f"{name}-{digest}.docx")
+
+
+def _persist(path, data):
+    """原子写入骨架文件，多个进程同时写入时不会读到半个文件"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def get_skeleton(name, build, key='', cache_dir=None):
+    """
+    获取骨架文档（每个进程只构建一次）
+
+    Args:
+        name: 骨架名称
+        build: 构建函数，返回填好固定内容的 python-docx Document
+        key: 影响骨架内容的参数（字体、表头等），变化时重新构建；
+            持久化的骨架还按构建函数源码区分，修改构建函数后重新构建
+        cache_dir: 持久化目录，默认读取环境变量 DOCX_SKELETON_DIR；都没有时只缓存在内存中
+
+    Returns:
+        DocxSkeleton
+    """
+    cache_key = (name, key)
+    skeleton = _skeletons.get(cache_key)
+    if skeleton is not None:
+        return skeleton
+
+    cache_dir = cache_dir or os.environ.get(SKELETON_DIR_ENV)
+    path = _skeleton_path(cache_dir, name, key, build) if cache_dir else None
+
+    if path and os.path.exists(path):
+        try:
+            with open(path, 'rb') as f:
+                skeleton = DocxSkeleton(f.read())
+        except Exception:
+            # 文件损坏或无法读取时重新构建
+            skeleton = None
+
+    if skeleton is None:
+        buffer = io.BytesIO()
+        build().save(buffer)
+        skeleton = DocxSkeleton(buffer.getvalue())
+        if path:
+            _persist(path, skeleton.data)
+
+    _skeletons[cache_key] = skeleton
+    return skeleton
+
+
+def clear_cache():
+    """清空进程内缓存（磁盘上的骨架文件保留）"""
+    _skeletons.clear()
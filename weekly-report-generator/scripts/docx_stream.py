@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+流式 OOXML 写出器
+
+不经过 python-docx 的对象模型，直接把 WordprocessingML 写进 zip 流：
+正文在生成的同时写入 word/document.xml，内存占用与表格行数无关。
+
+只实现周报需要的元素：段落（居中、加粗、字号）、Table Grid 表格、单元格内换行。
+样式部件按 python-docx 默认模板中用到的部分精简而来（Normal 宋体、Table Grid 边框），
+在 Word 中的显示效果与 python-docx 生成的文档一致。
+"""
+
+import os
+import re
+import zipfile
+from datetime import datetime, timezone
+from xml.sax.saxutils import escape
+
+# 页面可用宽度（twips），与 python-docx 默认模板一致：Letter 纸 12240 - 左右边距 1800 * 2
+TEXT_WIDTH = 8640
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '<Override PartName="/word/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+    '<Override PartName="/docProps/core.xml" '
+    'ContentType="application/vnd.openxmlformats-package.core-properties+xml"/>'
+    '</Types>'
+)
+
+PACKAGE_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/package/2006/relationships/metadata/core-properties" '
+    'Target="docProps/core.xml"/>'
+    '</Relationships>'
+)
+
+DOCUMENT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+
+CORE_XML_TEMPLATE = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<cp:coreProperties '
+    'xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties" '
+    'xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:dcterms="http://purl.org/dc/terms/" '
+    'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">'
+    '<dc:title>{title}</dc:title>'
+    '<cp:revision>1</cp:revision>'
+    '<dcterms:created xsi:type="dcterms:W3CDTF">{now}</dcterms:created>'
+    '<dcterms:modified xsi:type="dcterms:W3CDTF">{now}</dcterms:modified>'
+    '</cp:coreProperties>'
+)
+
+_TABLE_CELL_MARGINS = (
+    '<w:tblCellMar><w:top w:w="0" w:type="dxa"/><w:left w:w="108" w:type="dxa"/>'
+    '<w:bottom w:w="0" w:type="dxa"/><w:right w:w="108" w:type="dxa"/></w:tblCellMar>'
+)
+
+STYLES_XML_TEMPLATE = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    f'<w:styles xmlns:w="{W_NS}">'
+    '<w:docDefaults>'
+    '<w:rPrDefault><w:rPr><w:sz w:val="22"/><w:szCs w:val="22"/>'
+    '<w:lang w:val="en-US" w:eastAsia="zh-CN" w:bidi="ar-SA"/></w:rPr></w:rPrDefault>'
+    '<w:pPrDefault><w:pPr><w:spacing w:after="200" w:line="276" w:lineRule="auto"/></w:pPr></w:pPrDefault>'
+    '</w:docDefaults>'
+    '<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/><w:qFormat/>'
+    '<w:rPr><w:rFonts w:ascii="{font}" w:hAnsi="{font}" w:eastAsia="{font}"/></w:rPr></w:style>'
+    '<w:style w:type="character" w:default="1" w:styleId="DefaultParagraphFont">'
+    '<w:name w:val="Default Paragraph Font"/><w:uiPriority w:val="1"/><w:semiHidden/><w:unhideWhenUsed/>'
+    '</w:style>'
+    '<w:style w:type="table" w:default="1" w:styleId="TableNormal"><w:name w:val="Normal Table"/>'
+    '<w:uiPriority w:val="99"/><w:semiHidden/><w:unhideWhenUsed/>'
+    f'<w:tblPr><w:tblInd w:w="0" w:type="dxa"/>{_TABLE_CELL_MARGINS}</w:tblPr></w:style>'
+    '<w:style w:type="table" w:styleId="TableGrid"><w:name w:val="Table Grid"/>'
+    '<w:basedOn w:val="TableNormal"/><w:uiPriority w:val="59"/>'
+    '<w:pPr><w:spacing w:after="0" w:line="240" w:lineRule="auto"/></w:pPr>'
+    '<w:tblPr><w:tblInd w:w="0" w:type="dxa"/><w:tblBorders>'
+    '<w:top w:val="single" w:sz="4" w:space="0" w:color="auto"/>'
+    '<w:left w:val="single" w:sz="4" w:space="0" w:color="auto"/>'
+    '<w:bottom w:val="single" w:sz="4" w:space="0" w:color="auto"/>'
+    '<w:right w:val="single" w:sz="4" w:space="0" w:color="auto"/>'
+    '<w:insideH w:val="single" w:sz="4" w:space="0" w:color="auto"/>'
+    '<w:insideV w:val="single" w:sz="4" w:space="0" w:color="auto"/>'
+    f'</w:tblBorders>{_TABLE_CELL_MARGINS}</w:tblPr></w:style>'
+    '</w:styles>'
+)
+
+DOCUMENT_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    f'<w:document xmlns:w="{W_NS}" xmlns:r="{R_NS}"><w:body>'
+)
+
+DOCUMENT_END = (
+    '<w:sectPr><w:pgSz w:w="12240" w:h="15840"/>'
+    '<w:pgMar w:top="1440" w:right="1800" w:bottom="1440" w:left="1800" '
+    'w:header="720" w:footer="720" w:gutter="0"/>'
+    '<w:cols w:space="720"/><w:docGrid w:linePitch="360"/></w:sectPr>'
+    '</w:body></w:document>'
+)
+
+# XML 1.0 不允许的控制字符（python-docx 遇到时同样报错）
+_INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def styles_xml(font='宋体'):
+    """样式部件：Normal 使用指定中文字体（含 eastAsia），以及 Table Grid 表格样式"""
+    return STYLES_XML_TEMPLATE.replace('{font}', escape(font, {'"': '&quot;'}))
+
+
+def run(text, bold=False, size=None):
+    """
+    一个文本片段（w:r）
+
+    与 python-docx 的 run.text 相同：换行写为 w:br，制表符写为 w:tab。
+    size 为字号（磅）。
+    """
+    if _INVALID_XML_CHARS.search(text):
+        raise ValueError(f"文本包含 XML 不允许的控制字符：{text!r}")
+
+    props = ''
+    if bold:
+        props += '<w:b/>'
+    if size is not None:
+        props += f'<w:sz w:val="{int(size * 2)}"/>'
+
+    parts = []
+    for i, line in enumerate(text.split('\n')):
+        if i:
+            parts.append('<w:br/>')
+        for j, segment in enumerate(line.split('\t')):
+            if j:
+                parts.append('<w:tab/>')
+            if segment:
+                space = ' xml:space="preserve"' if segment != segment.strip() else ''
+                parts.append(f'<w:t{space}>{escape(segment)}</w:t>')
+
+    return f'<w:r>{"<w:rPr>" + props + "</w:rPr>" if props else ""}{"".join(parts)}</w:r>'
+
+
+def paragraph(text='', center=False, bold=False, size=None):
+    """一个段落（w:p），text 为空时是空段落"""
+    props = '<w:pPr><w:jc w:val="center"/></w:pPr>' if center else ''
+    body = run(text, bold, size) if text else ''
+    return f'<w:p>{props}{body}</w:p>'
+
+
+def table_start(columns, style='TableGrid'):
+    """表格开头：columns 列等分页面宽度（与 python-docx 的 add_table 相同）"""
+    width = TEXT_WIDTH // columns
+    grid = ''.join(f'<w:gridCol w:w="{width}"/>' for _ in range(columns))
+    return (
+        f'<w:tbl><w:tblPr><w:tblStyle w:val="{style}"/><w:tblW w:type="auto" w:w="0"/>'
+        '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0" '
+        'w:noHBand="0" w:noVBand="1" w:val="04A0"/></w:tblPr>'
+        f'<w:tblGrid>{grid}</w:tblGrid>'
+    )
+
+
+def table_end():
+    return '</w:tbl>'
+
+
+def table_row(cells, columns):
+    """
+    表格的一行
+
+    cells 中每一项为文本，或 (文本, {"center": bool, "bold": bool}) 元组。
+    """
+    width = TEXT_WIDTH // columns
+    parts = ['<w:tr>']
+    for cell in cells:
+        if isinstance(cell, tuple):
+            text, options = cell
+        else:
+            text, options = cell, {}
+        parts.append(f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{width}"/></w:tcPr>')
+        parts.append(paragraph(text, options.get('center', False), options.get('bold', False)))
+        parts.append('</w:tc>')
+    parts.append('</w:tr>')
+    return ''.join(parts)
+
+
+class DocxStreamWriter:
+    """
+    流式写出 .docx
+
+    用法：
+        with DocxStreamWriter(output_path, title="周报_20251230") as writer:
+            writer.write(paragraph(...))
+            writer.write(table_start(4))
+            for ...:
+                writer.write(table_row([...], 4))
+            writer.write(table_end())
+
+    进入时写入固定部件并打开 word/document.xml 的写入流，正文片段直接压缩写出；
+    退出时补齐文档结尾。中途出错时删除不完整的文件。
+    """
+
+    def __init__(self, output_path, title='', font='宋体', styles=None):
+        self.output_path = output_path
+        self.title = title
+        self.styles = styles if styles is not None else styles_xml(font)
+        self._zip = None
+        self._document = None
+
+    def __enter__(self):
+        self._zip = zipfile.ZipFile(self.output_path, 'w', zipfile.ZIP_DEFLATED)
+        now = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        self._zip.writestr('[Content_Types].xml', CONTENT_TYPES_XML)
+        self._zip.writestr('_rels/.rels', PACKAGE_RELS_XML)
+        self._zip.writestr('docProps/core.xml', CORE_XML_TEMPLATE.format(title=escape(self.title), now=now))
+        self._zip.writestr('word/_rels/document.xml.rels', DOCUMENT_RELS_XML)
+        self._zip.writestr('word/styles.xml', self.styles)
+        self._document = self._zip.open('word/document.xml', 'w')
+        self.write(DOCUMENT_START)
+        return self
+
+    def write(self, xml):
+        self._document.write(xml.encode('utf-8'))
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.write(DOCUMENT_END)
+            self._document.close()
+        finally:
+            self._zip.close()
+        if exc_type is not None:
+            try:
+                os.remove(self.output_path)
+            except OSError:
+                pass
+        return False
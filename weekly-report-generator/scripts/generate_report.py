@@ -12,15 +12,41 @@
 3. 工时居中对齐 - 突出工作量分布
 """
 
-from docx import Document
-from docx.shared import Pt
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml.ns import qn
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import glob
+import io
+import os
 import sys
 import json
+import time
 
+# 添加脚本目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-def create_weekly_report(report_data, output_path):
+import renderers
+from renderers import HEADERS, format_task_text, format_workload
+
+try:
+    from docx import Document
+    from docx.shared import Pt
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.oxml.ns import qn
+    import docx_skeleton
+except ImportError:
+    # 未安装 python-docx 时只能使用 ooxml 引擎
+    Document = None
+
+# docx 格式的生成方式：ooxml 直接流式写出 WordprocessingML（renderers.DocxRenderer）；
+# docx 使用 python-docx 对象模型（备用，从骨架缓存克隆）
+ENGINES = ('ooxml', 'docx')
+DEFAULT_ENGINE = 'ooxml'
+
+# 批量模式输出文件名中不能出现的字符
+UNSAFE_FILENAME_CHARS = '\\/:*?"<>|'
+
+
+def create_weekly_report(report_data, output_path, engine=DEFAULT_ENGINE, formats=('docx',)):
     """
     创建周报文档
     
@@ -39,18 +65,48 @@ def create_weekly_report(report_data, output_path):
                 ]
             }
         output_path: 输出文件路径
+        engine: docx 格式的生成方式：'ooxml'（默认，流式写出，速度快、内存占用小）或 'docx'（python-docx）
+        formats: 输出格式（docx / md / html / csv，见 renderers.py）；多种格式时只遍历一次数据同时输出，
+            文件名由 output_path 替换扩展名得到
     """
+    if engine not in ENGINES:
+        raise ValueError(f"未知的生成方式：{engine}，可选 {', '.join(ENGINES)}")
+    outputs = renderers.output_paths(output_path, renderers.parse_formats(formats))
+    docx_path = outputs.pop('docx', None) if engine == 'docx' else None
+    if docx_path is not None and Document is None:
+        print("错误：未安装 python-docx，无法使用 docx 生成方式")
+        print("请运行: pip install python-docx，或使用默认的 ooxml 生成方式")
+        sys.exit(1)
+
+    # 保存文档
+    try:
+        if outputs:
+            renderers.render(report_data, outputs)
+        if docx_path is not None:
+            _render_docx(report_data, docx_path)
+            outputs['docx'] = docx_path
+    except OSError as e:
+        print(f"错误：无法保存文档到 {getattr(e, 'filename', None) or output_path}")
+        print(f"详细错误：{e}")
+        sys.exit(1)
+
+    for path in outputs.values():
+        if path != '-':
+            print(f"✅ 周报已成功生成：{path}")
+
+
+def _build_docx_skeleton():
+    """周报骨架：宋体、空标题段落（居中、加粗、16 号）、Table Grid 表格和表头"""
     doc = Document()
     
     # 设置中文字体支持
     doc.styles['Normal'].font.name = '宋体'
     doc.styles['Normal']._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
     
-    # 添加标题
+    # 标题段落，文字在生成时填入
     title = doc.add_paragraph()
-    title.text = f"周报_{report_data['date']}"
     title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    title_run = title.runs[0]
+    title_run = title.add_run()
     title_run.font.size = Pt(16)
     title_run.font.bold = True
     
@@ -60,10 +116,8 @@ def create_weekly_report(report_data, output_path):
     
     # 设置表头
     header_cells = table.rows[0].cells
-    header_cells[0].text = '姓名'
-    header_cells[1].text = '职责'
-    header_cells[2].text = '任务'
-    header_cells[3].text = '工时(人/天)'
+    for cell, header in zip(header_cells, HEADERS):
+        cell.text = header
     
     # 设置表头格式
     for cell in header_cells:
@@ -71,6 +125,19 @@ def create_weekly_report(report_data, output_path):
         for run in cell.paragraphs[0].runs:
             run.font.bold = True
     
+    return doc
+
+
+def _render_docx(report_data, output_path):
+    """使用 python-docx 生成周报：从骨架缓存克隆，只填写标题和任务行"""
+    skeleton = docx_skeleton.get_skeleton('weekly_report', _build_docx_skeleton, key='|'.join(['宋体'] + HEADERS))
+    doc = skeleton.clone()
+    
+    # 填写标题
+    doc.paragraphs[0].runs[0].text = f"周报_{report_data['date']}"
+    
+    table = doc.tables[0]
+    
     # 为每个任务类别添加行 - 一归类一行
     for task in report_data['tasks']:
         row_cells = table.add_row().cells
@@ -78,56 +145,291 @@ def create_weekly_report(report_data, output_path):
         row_cells[1].text = report_data['title']
         
         # 构建任务文本 - 模块名 + 条目化展开
-        task_text = f"{task['category']}\n"
-        for i, item in enumerate(task['items'], 1):
-            task_text += f"{i}. {item}\n"
-        row_cells[2].text = task_text.strip()
+        row_cells[2].text = format_task_text(task)
         
         # 工时 - 智能格式化
-        workload = task['workload']
-        if workload == int(workload):
-            row_cells[3].text = str(int(workload))
-        else:
-            row_cells[3].text = f"{workload:.1f}"
+        row_cells[3].text = format_workload(task['workload'])
         
         # 工时居中对齐
         row_cells[3].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
     
-    # 保存文档
+    skeleton.save(doc, output_path)
+
+
+def load_payloads(source):
+    """
+    加载批量生成的周报数据
+
+    Args:
+        source: 目录（读取其中的 *.json）、通配符（如 data/*.json）或 JSONL 文件（每行一份周报数据）
+
+    Returns:
+        [(来源说明, 周报数据或 None, 错误信息或 None)]，按文件名/行号排序
+    """
+    if os.path.isdir(source):
+        paths = sorted(glob.glob(os.path.join(source, '*.json')))
+    elif source.endswith('.jsonl'):
+        paths = None
+    else:
+        paths = sorted(glob.glob(source))
+
+    items = []
+    if paths is None:
+        with open(source, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                label = f"{source}:{line_no}"
+                try:
+                    items.append((label, json.loads(line), None))
+                except json.JSONDecodeError as e:
+                    items.append((label, None, f"JSON 解析失败：{e}"))
+        return items
+
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                items.append((path, json.load(f), None))
+        except Exception as e:
+            items.append((path, None, f"无法读取数据文件：{e}"))
+    return items
+
+
+def _safe_filename(name):
+    """去掉文件名中不能出现的字符（包括路径分隔符和控制字符）"""
+    name = ''.join(c for c in str(name) if c not in UNSAFE_FILENAME_CHARS and c >= ' ')
+    return name.strip().rstrip('.')
+
+
+def _output_name(report_data, used):
+    """
+    批量模式下的输出文件名：优先使用数据中的 output 字段，否则为 周报_姓名_日期.docx，重名时加序号
+
+    output 字段只取文件名部分，数据中的路径（绝对路径、../）不能把文件写到输出目录之外。
+
+    Raises:
+        ValueError: 去掉不安全字符后文件名为空
+    """
+    output = report_data.get('output')
+    if output:
+        name = _safe_filename(str(output).replace('\\', '/').rsplit('/', 1)[-1])
+    else:
+        name = _safe_filename(f"周报_{report_data.get('name', '')}_{report_data.get('date', '')}.docx")
+    if not name or name in ('.', '..') or not os.path.splitext(name)[0].strip():
+        raise ValueError(f"无效的输出文件名：{output!r}")
+    stem, ext = os.path.splitext(name)
+    candidate, index = name, 2
+    while candidate in used:
+        candidate = f"{stem}_{index}{ext}"
+        index += 1
+    used.add(candidate)
+    return candidate
+
+
+def _render_item(item):
+    """在工作进程中生成一份周报，返回 (来源说明, 输出路径, 错误信息或 None)"""
+    label, report_data, output_path, engine, formats = item
     try:
-        doc.save(output_path)
-        print(f"✅ 周报已成功生成：{output_path}")
+        with contextlib.redirect_stdout(io.StringIO()):
+            create_weekly_report(report_data, output_path, engine, formats)
+    except SystemExit:
+        return label, output_path, f"无法保存文档到 {output_path}"
     except Exception as e:
-        print(f"错误：无法保存文档到 {output_path}")
-        print(f"详细错误：{e}")
+        return label, output_path, f"{type(e).__name__}: {e}"
+    return label, output_path, None
+
+
+def generate_batch(source, output_dir, workers=None, engine=DEFAULT_ENGINE, store=None, formats=('docx',)):
+    """
+    批量生成周报
+
+    所有周报在同一个进程池中生成，每个工作进程只导入一次依赖；
+    单份周报出错只记录错误，不影响其余周报。
+
+    Args:
+        source: 见 load_payloads
+        output_dir: 输出目录
+        workers: 进程数，默认为 CPU 核数；为 1 时在当前进程内顺序生成
+        engine: 生成方式，见 create_weekly_report
+        store: 周报存储路径；指定时先检查每份周报数据，生成成功后一次写入
+        formats: 输出格式，见 create_weekly_report
+
+    Returns:
+        {"total", "succeeded", "failed": [(来源说明, 错误信息)], "elapsed", "throughput", "workers", "stored"}
+    """
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(output_dir, exist_ok=True)
+    start = time.perf_counter()
+
+    if store:
+        from report_store import validate_report
+
+    total = 0
+    failed = []
+    jobs = []
+    used = set()
+    for label, report_data, error in load_payloads(source):
+        total += 1
+        if error is not None:
+            failed.append((label, error))
+        elif not isinstance(report_data, dict):
+            failed.append((label, "周报数据必须是 JSON 对象"))
+        else:
+            # 要写入存储时先检查数据：不合格的周报不生成文档，成功和失败不会重复计数
+            if store:
+                try:
+                    validate_report(report_data)
+                except (ValueError, TypeError) as e:
+                    failed.append((label, f"无法写入周报存储：{e}"))
+                    continue
+            try:
+                output_path = os.path.join(output_dir, _output_name(report_data, used))
+            except ValueError as e:
+                failed.append((label, str(e)))
+                continue
+            jobs.append((label, report_data, output_path, engine, formats))
+
+    if workers == 1 or len(jobs) <= 1:
+        results = map(_render_item, jobs)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        chunksize = max(1, len(jobs) // (workers * 4))
+        results = executor.map(_render_item, jobs, chunksize=chunksize)
+
+    generated = []
+    try:
+        for job, (label, output_path, error) in zip(jobs, results):
+            if error is None:
+                generated.append(job[1])
+            else:
+                failed.append((label, error))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    stored = 0
+    if store and generated:
+        stored = sum(store_reports(generated, store))
+
+    elapsed = time.perf_counter() - start
+    succeeded = len(generated)
+    return {
+        "total": total,
+        "succeeded": succeeded,
+        "failed": failed,
+        "elapsed": round(elapsed, 3),
+        "throughput": round(succeeded / elapsed, 1) if elapsed > 0 else 0.0,
+        "workers": workers,
+        "stored": stored
+    }
+
+
+def batch_main(argv):
+    """批量模式命令行入口"""
+    import argparse
+    from report_store import DEFAULT_DB_PATH
+
+    parser = argparse.ArgumentParser(prog='generate_report.py --batch', description='批量生成周报')
+    parser.add_argument('source', help='周报数据目录、通配符或 JSONL 文件')
+    parser.add_argument('output_dir', help='输出目录')
+    parser.add_argument('--workers', '-w', type=int, default=None, help='进程数，默认为 CPU 核数')
+    parser.add_argument('--engine', choices=ENGINES, default=DEFAULT_ENGINE,
+                        help='ooxml：流式写出（默认）；docx：使用 python-docx')
+    parser.add_argument('--store', nargs='?', const=DEFAULT_DB_PATH, default=None, metavar='数据库',
+                        help='同时把生成成功的周报数据写入周报存储，用于月报、季报、年报汇总')
+    parser.add_argument('--format', '-f', action='append', default=None,
+                        help=f"输出格式：{'/'.join(renderers.RENDERERS)}，可用逗号分隔或重复指定多种，默认 docx")
+    args = parser.parse_args(argv)
+
+    try:
+        formats = renderers.parse_formats(args.format or ['docx'])
+    except ValueError as e:
+        print(f"错误：{e}")
+        sys.exit(1)
+
+    stats = generate_batch(args.source, args.output_dir, args.workers, args.engine, args.store, formats)
+
+    print("=" * 60)
+    print("批量生成周报完成")
+    print("-" * 60)
+    print(f"成功：{stats['succeeded']} 份，失败：{len(stats['failed'])} 份")
+    print(f"耗时：{stats['elapsed']} 秒（{stats['throughput']} 份/秒，{stats['workers']} 个进程）")
+    if stats['stored']:
+        print(f"已写入周报存储：{stats['stored']} 周")
+    if stats['failed']:
+        print("-" * 60)
+        for label, error in stats['failed']:
+            print(f"❌ {label}：{error}")
         sys.exit(1)
 
 
+def store_reports(reports, db_path):
+    """把周报数据写入周报存储（用于月报、季报、年报汇总），返回 (新增周数, 替换周数)"""
+    from report_store import ReportStore
+
+    with ReportStore(db_path) as store:
+        return store.add_weeks(reports)
+
+
 def main():
     """
     主函数 - 用于命令行调用
     
     用法：
-        python generate_report.py <数据JSON文件> <输出路径>
+        python generate_report.py <数据JSON文件> <输出路径> [--format docx,md,html,csv] [--engine ooxml|docx] [--store [数据库]]
+        python generate_report.py --batch <数据目录|通配符|JSONL> <输出目录> [--workers N] [--format ...] [--engine ooxml|docx] [--store [数据库]]
     """
-    if len(sys.argv) != 3:
-        print("用法: python generate_report.py <数据JSON文件> <输出路径>")
+    if len(sys.argv) > 1 and sys.argv[1] == '--batch':
+        batch_main(sys.argv[2:])
+        return
+
+    import argparse
+    from report_store import DEFAULT_DB_PATH
+
+    parser = argparse.ArgumentParser(
+        usage="python generate_report.py <数据JSON文件> <输出路径> [--format docx,md,html,csv] "
+              "[--engine ooxml|docx] [--store [数据库]]\n"
+              "       python generate_report.py --batch <数据目录|通配符|JSONL> <输出目录> [--workers N] "
+              "[--format ...] [--engine ooxml|docx] [--store [数据库]]",
+        description='生成周报')
+    parser.add_argument('data_file', help='周报数据 JSON 文件')
+    parser.add_argument('output_path', help='输出路径')
+    parser.add_argument('--engine', choices=ENGINES, default=DEFAULT_ENGINE,
+                        help='ooxml：流式写出（默认）；docx：使用 python-docx')
+    parser.add_argument('--store', nargs='?', const=DEFAULT_DB_PATH, default=None, metavar='数据库',
+                        help='同时把周报数据写入周报存储，用于月报、季报、年报汇总')
+    parser.add_argument('--format', '-f', action='append', default=None,
+                        help=f"输出格式：{'/'.join(renderers.RENDERERS)}，可用逗号分隔或重复指定多种，默认 docx；"
+                             "输出路径为 - 时输出到标准输出")
+    args = parser.parse_args()
+
+    try:
+        formats = renderers.parse_formats(args.format or ['docx'])
+        renderers.output_paths(args.output_path, formats)
+    except ValueError as e:
+        print(f"错误：{e}")
         sys.exit(1)
     
-    data_file = sys.argv[1]
-    output_path = sys.argv[2]
-    
     # 读取数据
     try:
-        with open(data_file, 'r', encoding='utf-8') as f:
+        with open(args.data_file, 'r', encoding='utf-8') as f:
             report_data = json.load(f)
     except Exception as e:
-        print(f"错误：无法读取数据文件 {data_file}")
+        print(f"错误：无法读取数据文件 {args.data_file}")
         print(f"详细错误：{e}")
         sys.exit(1)
     
     # 生成报告
-    create_weekly_report(report_data, output_path)
+    create_weekly_report(report_data, args.output_path, args.engine, formats)
+
+    if args.store:
+        try:
+            added, _ = store_reports([report_data], args.store)
+        except ValueError as e:
+            print(f"错误：{e}")
+            sys.exit(1)
+        print(f"✅ 周报数据已{'写入' if added else '更新'}：{args.store}")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+周报 .docx 导入脚本
+
+把 create_weekly_report 生成的历史周报（姓名 | 职责 | 任务 | 工时 表格）还原为周报数据（report_data），
+不经过 python-docx：直接打开 .docx 的 zip，用增量 XML 解析器流式读取 word/document.xml，
+每处理完一行表格就释放对应的元素，内存占用与文档大小无关。
+
+任务单元格的第一行是类别，其余"1. xxx"形式的行是条目；标题段落"周报_YYYYMMDD"给出日期
+（没有标题时从文件名中的 8 位日期推断）。
+
+多个文件在进程池中并行解析，结果输出为 JSONL（每行一份周报数据），可以直接交给
+generate_report.py --batch 重新渲染，或 rollup_report.py --add 写入周报存储做汇总；
+也可以用 --store 直接写入周报存储。
+
+用法：
+    python ingest_docx.py <目录|文件|通配符>... [-o 输出.jsonl] [--store [数据库]] [-w 进程数]
+"""
+
+import glob
+import json
+import os
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree.ElementTree import iterparse
+
+# 添加脚本目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from renderers import HEADERS
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+DOCUMENT_PART = 'word/document.xml'
+
+TITLE_PATTERN = re.compile(r'周报_(\d{8})')
+FILENAME_DATE_PATTERN = re.compile(r'(?<!\d)(\d{8})(?!\d)')
+ITEM_PATTERN = re.compile(r'^\d+[.、．]\s*')
+
+
+class IngestError(ValueError):
+    """文档不是周报格式"""
+
+
+def iter_rows(stream):
+    """
+    流式读取 document.xml
+
+    依次产出 ("paragraph", 文本)（表格外的段落）和 ("row", [单元格文本, ...])；
+    单元格内的多个段落和换行都还原为 \\n，制表符还原为 \\t。嵌套表格按所在单元格的文本处理。
+    """
+    table_depth = 0
+    text = []
+    cell_paragraphs = None
+    cells = None
+
+    for event, elem in iterparse(stream, events=('start', 'end')):
+        tag = elem.tag
+        if event == 'start':
+            if tag == W + 'tbl':
+                table_depth += 1
+            elif tag == W + 'tr' and table_depth == 1:
+                cells = []
+            elif tag == W + 'tc' and table_depth == 1:
+                cell_paragraphs = []
+            continue
+
+        if tag == W + 't':
+            text.append(elem.text or '')
+        elif tag in (W + 'br', W + 'cr'):
+            text.append('\n')
+        elif tag == W + 'tab':
+            text.append('\t')
+        elif tag == W + 'p':
+            paragraph = ''.join(text)
+            text = []
+            if table_depth == 0:
+                yield 'paragraph', paragraph
+                elem.clear()
+            elif cell_paragraphs is not None:
+                cell_paragraphs.append(paragraph)
+        elif tag == W + 'tc' and table_depth == 1:
+            cells.append('\n'.join(cell_paragraphs))
+            cell_paragraphs = None
+        elif tag == W + 'tr' and table_depth == 1:
+            yield 'row', cells
+            cells = None
+            elem.clear()
+        elif tag == W + 'tbl':
+            table_depth -= 1
+            if table_depth == 0:
+                elem.clear()
+
+
+def parse_task_cell(text):
+    """任务单元格：第一行为类别，其余行为条目（去掉 1. 2. 编号）"""
+    lines = [line.strip() for line in text.split('\n')]
+    lines = [line for line in lines if line]
+    if not lines:
+        raise IngestError("任务单元格为空")
+    return lines[0], [ITEM_PATTERN.sub('', line, count=1) for line in lines[1:]]
+
+
+def parse_workload(text):
+    try:
+        return float(text.strip())
+    except ValueError:
+        raise IngestError(f"无效的工时：{text!r}") from None
+
+
+def read_report(path):
+    """
+    从周报 .docx 还原周报数据
+
+    Returns:
+        {"name", "title", "date", "tasks": [{"category", "items", "workload"}]}
+
+    Raises:
+        IngestError: 文档中没有周报表格
+        zipfile.BadZipFile / KeyError: 不是有效的 .docx
+    """
+    date = None
+    header = None
+    name = title = None
+    tasks = []
+
+    with zipfile.ZipFile(path) as package, package.open(DOCUMENT_PART) as stream:
+        for kind, value in iter_rows(stream):
+            if kind == 'paragraph':
+                if date is None and header is None:
+                    m = TITLE_PATTERN.search(value)
+                    if m:
+                        date = m.group(1)
+                continue
+
+            cells = [cell.strip() for cell in value]
+            if header is None:
+                if cells[:len(HEADERS)] != HEADERS:
+                    raise IngestError(f"表头不是 {' | '.join(HEADERS)}")
+                header = cells
+                continue
+            if len(cells) < len(HEADERS) or not any(cells):
+                continue
+
+            category, items = parse_task_cell(value[2])
+            if name is None:
+                name, title = cells[0], cells[1]
+            tasks.append({"category": category, "items": items, "workload": parse_workload(cells[3])})
+
+    if header is None:
+        raise IngestError("没有找到周报表格")
+
+    if date is None:
+        m = FILENAME_DATE_PATTERN.search(os.path.basename(path))
+        if m is None:
+            raise IngestError("没有找到周报日期")
+        date = m.group(1)
+
+    return {"name": name or "", "title": title or "", "date": date, "tasks": tasks}
+
+
+def _read_item(path):
+    """在工作进程中解析一个文件，返回 (路径, 周报数据或 None, 错误信息或 None)"""
+    try:
+        return path, read_report(path), None
+    except IngestError as e:
+        return path, None, str(e)
+    except (zipfile.BadZipFile, KeyError) as e:
+        return path, None, f"不是有效的 .docx 文件：{e}"
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+
+def collect_files(paths):
+    """展开目录（递归查找 *.docx）和通配符，跳过 Word 的 ~$ 临时文件，按路径排序去重"""
+    files = set()
+    for path in paths:
+        if os.path.isdir(path):
+            matches = glob.glob(os.path.join(glob.escape(path), '**', '*.docx'), recursive=True)
+        elif os.path.exists(path):
+            matches = [path]
+        else:
+            matches = glob.glob(path, recursive=True)
+        files.update(m for m in matches
+                     if os.path.isfile(m) and not os.path.basename(m).startswith('~$'))
+    return sorted(files)
+
+
+def ingest(paths, workers=None):
+    """
+    并行解析多个周报文件
+
+    Args:
+        paths: 文件、目录或通配符
+        workers: 进程数，默认为 CPU 核数；为 1 时在当前进程内顺序解析
+
+    Yields:
+        (路径, 周报数据或 None, 错误信息或 None)，按路径排序
+    """
+    files = collect_files(paths)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(files) <= 1:
+        yield from map(_read_item, files)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunksize = max(1, len(files) // (workers * 8))
+        yield from executor.map(_read_item, files, chunksize=chunksize)
+
+
+def main():
+    """主函数"""
+    import argparse
+    from report_store import DEFAULT_DB_PATH, validate_report
+
+    parser = argparse.ArgumentParser(description='从周报 .docx 文件还原周报数据')
+    parser.add_argument('paths', nargs='+', help='周报 .docx 文件、目录或通配符')
+    parser.add_argument('--output', '-o', default=None, help='输出 JSONL 文件，默认输出到标准输出')
+    parser.add_argument('--store', nargs='?', const=DEFAULT_DB_PATH, default=None, metavar='数据库',
+                        help='同时写入周报存储，用于月报、季报、年报汇总')
+    parser.add_argument('--workers', '-w', type=int, default=None, help='进程数，默认为 CPU 核数')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    succeeded = 0
+    reports = []
+    failed = []
+    try:
+        for path, report_data, error in ingest(args.paths, args.workers):
+            if error is not None:
+                failed.append((path, error))
+                continue
+            # 逐份检查（例如标题或文件名中的 8 位日期不是有效日期），坏数据只跳过这一份，
+            # 不会在写入周报存储时让整批回滚
+            try:
+                validate_report(report_data)
+            except (ValueError, TypeError) as e:
+                failed.append((path, f"周报数据无效：{e}"))
+                continue
+            succeeded += 1
+            out.write(json.dumps(report_data, ensure_ascii=False) + "\n")
+            if args.store:
+                reports.append(report_data)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    stored = None
+    if args.store and reports:
+        from report_store import ReportStore
+        with ReportStore(args.store) as store:
+            stored = store.add_weeks(reports)
+
+    # 汇总信息输出到标准错误，标准输出只有 JSONL
+    log = sys.stderr if args.output is None else sys.stdout
+    elapsed = time.perf_counter() - start
+    print("=" * 60, file=log)
+    print("周报导入完成", file=log)
+    print("-" * 60, file=log)
+    print(f"成功：{succeeded} 份，失败：{len(failed)} 份", file=log)
+    print(f"耗时：{elapsed:.3f} 秒（{succeeded / elapsed if elapsed > 0 else 0:.1f} 份/秒）", file=log)
+    if stored is not None:
+        print(f"周报存储：新增 {stored[0]} 周，替换 {stored[1]} 周", file=log)
+    if failed:
+        print("-" * 60, file=log)
+        for path, error in failed:
+            print(f"❌ {path}：{error}", file=log)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    # 确保 Windows 环境下正确处理 UTF-8
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+    main()
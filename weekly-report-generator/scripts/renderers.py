@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+周报渲染器
+
+同一份周报数据（report_data）可以输出为多种格式：
+- docx：Word 文档（流式写出，见 docx_stream.py）
+- md：Markdown 表格，便于直接粘贴到聊天或文档
+- html：独立的 HTML 页面
+- csv：每个任务类别一行，工时为数值列，便于导入表格做工时分析
+
+每个渲染器逐行写出，不在内存中拼接整份文档；render() 只遍历一次任务列表，
+把每一行同时交给所有选中的渲染器。
+
+新增格式时继承 Renderer，实现 start / task / finish，并登记到 RENDERERS。
+"""
+
+import csv
+import html
+import os
+import sys
+
+import docx_stream
+
+HEADERS = ['姓名', '职责', '任务', '工时(人/天)']
+
+
+def format_task_text(task):
+    """任务文本 - 模块名 + 条目化展开"""
+    task_text = f"{task['category']}\n"
+    for i, item in enumerate(task['items'], 1):
+        task_text += f"{i}. {item}\n"
+    return task_text.strip()
+
+
+def format_workload(workload):
+    """工时 - 智能格式化"""
+    if workload == int(workload):
+        return str(int(workload))
+    return f"{workload:.1f}"
+
+
+def report_title(report_data):
+    return f"周报_{report_data['date']}"
+
+
+class Renderer:
+    """
+    渲染器基类
+
+    作为上下文管理器使用：进入时打开输出，退出时写完结尾并关闭；中途出错时删除不完整的文件。
+    output_path 为 '-' 时写到标准输出（只适用于文本格式）。
+    """
+
+    # 格式名和默认扩展名
+    name = None
+    extension = None
+    # 文本格式的编码和换行参数
+    encoding = 'utf-8'
+    newline = None
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.out = None
+
+    def __enter__(self):
+        if self.output_path == '-':
+            self.out = sys.stdout
+        else:
+            self.out = open(self.output_path, 'w', encoding=self.encoding, newline=self.newline)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.out is not sys.stdout:
+            self.out.close()
+            if exc_type is not None:
+                _remove(self.output_path)
+        else:
+            self.out.flush()
+        return False
+
+    def start(self, report_data):
+        """写出标题和表头"""
+
+    def task(self, report_data, task, task_text, workload_text):
+        """写出一个任务类别（一行）"""
+        raise NotImplementedError
+
+    def finish(self, report_data):
+        """写出结尾"""
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class DocxRenderer(Renderer):
+    """Word 文档：表格逐行写入 .docx 的 zip 流"""
+
+    name = 'docx'
+    extension = '.docx'
+
+    def __enter__(self):
+        self._writer = None
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._writer is not None:
+            return self._writer.__exit__(exc_type, exc, tb)
+        return False
+
+    def start(self, report_data):
+        title = report_title(report_data)
+        self._writer = docx_stream.DocxStreamWriter(self.output_path, title=title, font='宋体')
+        self._writer.__enter__()
+        self._columns = len(HEADERS)
+        self._writer.write(docx_stream.paragraph(title, center=True, bold=True, size=16))
+        self._writer.write(docx_stream.table_start(self._columns))
+        self._writer.write(docx_stream.table_row(
+            [(h, {"center": True, "bold": True}) for h in HEADERS], self._columns))
+
+    def task(self, report_data, task, task_text, workload_text):
+        self._writer.write(docx_stream.table_row([
+            report_data['name'],
+            report_data['title'],
+            task_text,
+            (workload_text, {"center": True})
+        ], self._columns))
+
+    def finish(self, report_data):
+        self._writer.write(docx_stream.table_end())
+
+
+class MarkdownRenderer(Renderer):
+    """Markdown 表格：单元格内换行写为 <br>"""
+
+    name = 'md'
+    extension = '.md'
+
+    @staticmethod
+    def _cell(text):
+        return html.escape(str(text), quote=False).replace('|', '\\|').replace('\n', '<br>')
+
+    def start(self, report_data):
+        self.out.write(f"## {report_title(report_data)}\n\n")
+        self.out.write("| " + " | ".join(HEADERS) + " |\n")
+        self.out.write("| --- | --- | --- | :---: |\n")
+
+    def task(self, report_data, task, task_text, workload_text):
+        cells = (report_data['name'], report_data['title'], task_text, workload_text)
+        self.out.write("| " + " | ".join(self._cell(c) for c in cells) + " |\n")
+
+
+class HtmlRenderer(Renderer):
+    """独立的 HTML 页面，样式与 Word 文档一致（标题居中、表头加粗、工时居中）"""
+
+    name = 'html'
+    extension = '.html'
+
+    STYLE = (
+        "body{font-family:'宋体',SimSun,serif}"
+        "h1{text-align:center;font-size:16pt}"
+        "table{border-collapse:collapse;width:100%}"
+        "th,td{border:1px solid #000;padding:4px 6px;vertical-align:top}"
+        "th,td.workload{text-align:center}"
+    )
+
+    def start(self, report_data):
+        title = html.escape(report_title(report_data))
+        self.out.write(
+            '<!DOCTYPE html>\n<html lang="zh-CN">\n<head>\n<meta charset="utf-8">\n'
+            f'<title>{title}</title>\n<style>{self.STYLE}</style>\n</head>\n<body>\n'
+            f'<h1>{title}</h1>\n<table>\n<thead><tr>'
+            + ''.join(f'<th>{html.escape(h)}</th>' for h in HEADERS)
+            + '</tr></thead>\n<tbody>\n'
+        )
+
+    def task(self, report_data, task, task_text, workload_text):
+        text = html.escape(task_text).replace('\n', '<br>')
+        self.out.write(
+            f"<tr><td>{html.escape(str(report_data['name']))}</td>"
+            f"<td>{html.escape(str(report_data['title']))}</td>"
+            f"<td>{text}</td><td class=\"workload\">{html.escape(workload_text)}</td></tr>\n"
+        )
+
+    def finish(self, report_data):
+        self.out.write('</tbody>\n</table>\n</body>\n</html>\n')
+
+
+class CsvRenderer(Renderer):
+    """
+    CSV：每个任务类别一行，工时为数值
+
+    带 BOM 的 UTF-8，Excel 直接打开不会乱码。
+    """
+
+    name = 'csv'
+    extension = '.csv'
+    encoding = 'utf-8-sig'
+    newline = ''
+
+    FIELDS = ['日期', '姓名', '职责', '类别', '条目数', '任务', '工时(人/天)']
+
+    def start(self, report_data):
+        self._writer = csv.writer(self.out)
+        self._writer.writerow(self.FIELDS)
+
+    def task(self, report_data, task, task_text, workload_text):
+        self._writer.writerow([
+            report_data['date'],
+            report_data['name'],
+            report_data['title'],
+            task['category'],
+            len(task['items']),
+            task_text,
+            task['workload']
+        ])
+
+
+RENDERERS = {renderer.name: renderer for renderer in (DocxRenderer, MarkdownRenderer, HtmlRenderer, CsvRenderer)}
+
+
+def parse_formats(value):
+    """解析 --format 参数（逗号分隔，可重复），返回去重后的格式列表；未知格式抛出 ValueError"""
+    values = value if isinstance(value, (list, tuple)) else [value]
+    formats = []
+    for part in values:
+        for name in str(part).split(','):
+            name = name.strip().lower()
+            if not name:
+                continue
+            if name == 'markdown':
+                name = 'md'
+            if name not in RENDERERS:
+                raise ValueError(f"未知的输出格式：{name}，可选 {', '.join(RENDERERS)}")
+            if name not in formats:
+                formats.append(name)
+    if not formats:
+        raise ValueError("至少需要一种输出格式")
+    return formats
+
+
+def output_paths(output_path, formats):
+    """
+    各格式的输出路径
+
+    只有一种格式时直接使用 output_path，除非其扩展名是另一种格式的扩展名（周报.docx + md -> 周报.md）；
+    多种格式时把已知扩展名替换为各格式的扩展名（周报.docx + md,csv -> 周报.md、周报.csv）。
+    output_path 为 '-' 时输出到标准输出，只能选一种文本格式。
+    """
+    if output_path == '-':
+        if len(formats) > 1:
+            raise ValueError("输出到标准输出时只能选择一种格式")
+        if formats[0] == DocxRenderer.name:
+            raise ValueError("docx 格式不能输出到标准输出")
+        return {formats[0]: '-'}
+    stem, ext = os.path.splitext(output_path)
+    known = {r.extension for r in RENDERERS.values()}
+    if len(formats) == 1:
+        extension = RENDERERS[formats[0]].extension
+        if ext.lower() in known and ext.lower() != extension:
+            return {formats[0]: stem + extension}
+        return {formats[0]: output_path}
+    if ext.lower() not in known:
+        stem = output_path
+    return {name: stem + RENDERERS[name].extension for name in formats}
+
+
+def render(report_data, outputs):
+    """
+    一次遍历任务列表，同时渲染多种格式
+
+    Args:
+        report_data: 周报数据
+        outputs: {格式名: 输出路径}
+    """
+    from contextlib import ExitStack
+
+    with ExitStack() as stack:
+        renderers = [stack.enter_context(RENDERERS[name](path)) for name, path in outputs.items()]
+        for renderer in renderers:
+            renderer.start(report_data)
+        for task in report_data['tasks']:
+            task_text = format_task_text(task)
+            workload_text = format_workload(task['workload'])
+            for renderer in renderers:
+                renderer.task(report_data, task, task_text, workload_text)
+        for renderer in renderers:
+            renderer.finish(report_data)
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+周报数据存储
+
+基于 SQLite 保存每人每周的周报数据（name / title / date / tasks），并在写入的同一事务内
+增量维护按月、季度、年的汇总表：每人每个工作模块的工时、条目数、周数，以及每人的总工时。
+月报、季报、年报直接从汇总表生成，不需要重新读取每一周的数据。
+
+周报按其日期（date 字段）归入所在的月、季度和年；同一人同一日期的周报再次写入时替换旧数据，
+汇总表先减去旧周报的贡献再加上新的。
+"""
+
+import json
+import os
+import sqlite3
+from datetime import date as date_cls, datetime
+
+# 默认数据库路径：技能目录下的 data 文件夹
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'reports.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS weeks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    title TEXT NOT NULL,
+    date TEXT NOT NULL,
+    recorded_at TEXT NOT NULL,
+    tasks TEXT NOT NULL,
+    UNIQUE (name, date)
+);
+CREATE INDEX IF NOT EXISTS idx_weeks_date ON weeks (date, name);
+CREATE TABLE IF NOT EXISTS rollups (
+    period TEXT NOT NULL,
+    period_key TEXT NOT NULL,
+    period_start TEXT NOT NULL,
+    period_end TEXT NOT NULL,
+    name TEXT NOT NULL,
+    category TEXT NOT NULL,
+    workload REAL NOT NULL,
+    items INTEGER NOT NULL,
+    weeks INTEGER NOT NULL,
+    PRIMARY KEY (period, period_key, name, category)
+);
+CREATE INDEX IF NOT EXISTS idx_rollups_range ON rollups (period, period_start);
+"""
+
+# 汇总周期：月、季度、年
+ROLLUP_PERIODS = ("month", "quarter", "year")
+
+# 汇总表中每人总计使用的类别名
+TOTAL_KEY = "__total__"
+
+
+def parse_report_date(value):
+    """周报日期（YYYYMMDD 或 YYYY-MM-DD）转为 date，不合法时抛出 ValueError"""
+    text = str(value)
+    try:
+        if len(text) == 8 and text.isdigit():
+            return date_cls(int(text[:4]), int(text[4:6]), int(text[6:]))
+        return date_cls.fromisoformat(text)
+    except ValueError:
+        raise ValueError(f"无效的周报日期：{value!r}") from None
+
+
+def period_bounds(period, d):
+    """返回日期所在周期的 (周期标识, 起始日期, 结束日期)"""
+    if period == "month":
+        start = d.replace(day=1)
+        end = (start.replace(year=d.year + 1, month=1) if d.month == 12
+               else start.replace(month=d.month + 1))
+        return d.strftime("%Y-%m"), start.isoformat(), date_cls.fromordinal(end.toordinal() - 1).isoformat()
+    if period == "quarter":
+        quarter = (d.month - 1) // 3 + 1
+        start = date_cls(d.year, quarter * 3 - 2, 1)
+        end = date_cls(d.year + 1, 1, 1) if quarter == 4 else date_cls(d.year, quarter * 3 + 1, 1)
+        return f"{d.year}-Q{quarter}", start.isoformat(), date_cls.fromordinal(end.toordinal() - 1).isoformat()
+    if period == "year":
+        return str(d.year), f"{d.year}-01-01", f"{d.year}-12-31"
+    raise ValueError(f"未知的汇总周期：{period}")
+
+
+def validate_report(report_data):
+    """检查周报数据的字段，返回 (姓名, 职责, ISO 日期, 任务列表)；不合法时抛出 ValueError"""
+    if not isinstance(report_data, dict):
+        raise ValueError("周报数据必须是 JSON 对象")
+    for field in ("name", "date", "tasks"):
+        if field not in report_data:
+            raise ValueError(f"周报数据缺少字段：{field}")
+    tasks = report_data["tasks"]
+    if not isinstance(tasks, list):
+        raise ValueError("tasks 必须是列表")
+    for task in tasks:
+        if not isinstance(task, dict) or "category" not in task or "workload" not in task:
+            raise ValueError("每个任务必须包含 category 和 workload")
+        float(task["workload"])
+    return (str(report_data["name"]), str(report_data.get("title", "")),
+            parse_report_date(report_data["date"]).isoformat(), tasks)
+
+
+def _week_values(tasks):
+    """一周周报对汇总表的贡献：[(类别, 工时, 条目数)]，最后一项为总计；同一周重复的类别合并"""
+    merged = {}
+    for task in tasks:
+        value = merged.setdefault(str(task["category"]), [0.0, 0])
+        value[0] += float(task["workload"])
+        value[1] += len(task.get("items") or [])
+    values = [(category, workload, items) for category, (workload, items) in merged.items()]
+    values.append((TOTAL_KEY, sum(v[1] for v in values), sum(v[2] for v in values)))
+    return values
+
+
+def _accumulate(deltas, name, iso_date, tasks, sign=1):
+    """把一周周报的贡献（sign 为 -1 时为撤销）累加到 {汇总键: [工时, 条目数, 周数]}"""
+    d = date_cls.fromisoformat(iso_date)
+    values = _week_values(tasks)
+    for period in ROLLUP_PERIODS:
+        bounds = period_bounds(period, d)
+        for category, workload, items in values:
+            delta = deltas.setdefault((period,) + bounds + (name, category), [0.0, 0, 0])
+            delta[0] += sign * workload
+            delta[1] += sign * items
+            delta[2] += sign
+
+
+class ReportStore:
+    """周报存储"""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def add_week(self, report_data, recorded_at=None):
+        """写入一周的周报，返回 True 表示新增、False 表示替换了同一人同一日期的旧周报"""
+        return self.add_weeks([report_data], recorded_at)[0] == 1
+
+    def add_weeks(self, reports, recorded_at=None):
+        """
+        批量写入周报，单个事务提交
+
+        汇总表的增量先在内存中合并，整批只更新一次。数据不合法时整批回滚并抛出 ValueError。
+
+        Returns:
+            (新增周数, 替换周数)
+        """
+        if recorded_at is None:
+            recorded_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        added = replaced = 0
+        deltas = {}
+
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            for report_data in reports:
+                name, title, iso_date, tasks = validate_report(report_data)
+                old = self.conn.execute(
+                    "SELECT tasks FROM weeks WHERE name = ? AND date = ?", (name, iso_date)
+                ).fetchone()
+                if old is None:
+                    added += 1
+                else:
+                    _accumulate(deltas, name, iso_date, json.loads(old[0]), -1)
+                    replaced += 1
+                self.conn.execute(
+                    "INSERT INTO weeks (name, title, date, recorded_at, tasks) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (name, date) DO UPDATE SET title = excluded.title, "
+                    "recorded_at = excluded.recorded_at, tasks = excluded.tasks",
+                    (name, title, iso_date, recorded_at, json.dumps(tasks, ensure_ascii=False))
+                )
+                _accumulate(deltas, name, iso_date, tasks)
+
+            self._apply_deltas(deltas)
+        return added, replaced
+
+    def _apply_deltas(self, deltas):
+        self.conn.executemany(
+            "INSERT INTO rollups (period, period_key, period_start, period_end, name, category, "
+            "workload, items, weeks) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (period, period_key, name, category) DO UPDATE SET "
+            "workload = workload + excluded.workload, items = items + excluded.items, "
+            "weeks = weeks + excluded.weeks",
+            [key + tuple(value) for key, value in deltas.items() if any(value)]
+        )
+        # 替换后不再出现的类别
+        self.conn.executemany(
+            "DELETE FROM rollups WHERE period = ? AND period_key = ? AND name = ? AND category = ? AND weeks <= 0",
+            [(key[0], key[1], key[4], key[5]) for key, value in deltas.items() if value[2] < 0]
+        )
+
+    def rebuild_rollups(self):
+        """根据全部周报重建汇总表"""
+        deltas = {}
+        with self.conn:
+            self.conn.execute("DELETE FROM rollups")
+            for name, iso_date, tasks in self.conn.execute("SELECT name, date, tasks FROM weeks"):
+                _accumulate(deltas, name, iso_date, json.loads(tasks))
+            self._apply_deltas(deltas)
+
+    def periods(self, period):
+        """有数据的周期：[(周期标识, 起始日期, 结束日期, 人数)]，按时间排列"""
+        if period not in ROLLUP_PERIODS:
+            raise ValueError(f"未知的汇总周期：{period}")
+        cursor = self.conn.execute(
+            "SELECT period_key, period_start, period_end, COUNT(*) FROM rollups "
+            "WHERE period = ? AND category = ? GROUP BY period_key ORDER BY period_start",
+            (period, TOTAL_KEY)
+        )
+        return cursor.fetchall()
+
+    def summary(self, period, period_key, names=None):
+        """
+        某个周期的汇总（只读取汇总表）
+
+        Args:
+            period: month / quarter / year
+            period_key: 周期标识，如 2025-12、2025-Q4、2025
+            names: 只汇总这些人，默认为全部
+
+        Returns:
+            {"period", "key", "start", "end",
+             "people": [{"name", "title", "weeks", "workload", "items",
+                         "categories": [{"category", "workload", "items", "weeks"}]}],
+             "categories": [{"category", "workload", "items", "people"}],
+             "workload": 团队总工时, "weeks": 团队总人周}
+            没有数据时返回 None
+        """
+        if period not in ROLLUP_PERIODS:
+            raise ValueError(f"未知的汇总周期：{period}")
+
+        sql = ("SELECT period_start, period_end, name, category, workload, items, weeks "
+               "FROM rollups WHERE period = ? AND period_key = ?")
+        params = [period, period_key]
+        if names:
+            sql += f" AND name IN ({', '.join('?' for _ in names)})"
+            params.extend(names)
+
+        start = end = None
+        people = {}
+        team = {}
+        for start, end, name, category, workload, items, weeks in self.conn.execute(sql, params):
+            person = people.setdefault(name, {"name": name, "title": "", "weeks": 0, "workload": 0.0,
+                                              "items": 0, "categories": []})
+            if category == TOTAL_KEY:
+                person.update(weeks=weeks, workload=round(workload, 2), items=items)
+                continue
+            person["categories"].append({"category": category, "workload": round(workload, 2),
+                                         "items": items, "weeks": weeks})
+            total = team.setdefault(category, {"category": category, "workload": 0.0, "items": 0, "people": 0})
+            total["workload"] += workload
+            total["items"] += items
+            total["people"] += 1
+
+        if not people:
+            return None
+
+        # 职责取该周期内最近一周的周报（按 (name, date) 唯一索引逐人定位，不扫描周报表）
+        for name, person in people.items():
+            row = self.conn.execute(
+                "SELECT title FROM weeks WHERE name = ? AND date BETWEEN ? AND ? ORDER BY date DESC LIMIT 1",
+                (name, start, end)
+            ).fetchone()
+            if row is not None:
+                person["title"] = row[0]
+
+        for person in people.values():
+            person["categories"].sort(key=lambda c: (-c["workload"], c["category"]))
+        for total in team.values():
+            total["workload"] = round(total["workload"], 2)
+
+        return {
+            "period": period,
+            "key": period_key,
+            "start": start,
+            "end": end,
+            "people": sorted(people.values(), key=lambda p: p["name"]),
+            "categories": sorted(team.values(), key=lambda c: (-c["workload"], c["category"])),
+            "workload": round(sum(p["workload"] for p in people.values()), 2),
+            "weeks": sum(p["weeks"] for p in people.values())
+        }
+
+    def get_week(self, name, report_date):
+        """读取某人某周的周报数据，不存在时返回 None"""
+        iso_date = parse_report_date(report_date).isoformat()
+        row = self.conn.execute(
+            "SELECT title, tasks FROM weeks WHERE name = ? AND date = ?", (name, iso_date)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"name": name, "title": row[0], "date": iso_date.replace("-", ""), "tasks": json.loads(row[1])}
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM weeks").fetchone()[0]
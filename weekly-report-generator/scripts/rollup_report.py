@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+月报 / 季报 / 年报生成脚本
+
+周报数据写入 report_store 后，按月、季度、年的工时汇总由存储增量维护；
+本脚本只读取汇总表生成报告，不重新读取每一周的周报。
+
+用法：
+    # 写入周报数据（目录、通配符或 JSONL，与批量生成周报相同）
+    python rollup_report.py --add data/*.json
+
+    # 列出有数据的季度
+    python rollup_report.py --by quarter --list
+
+    # 生成 2025 年第四季度团队季报（默认为最近一个周期）
+    python rollup_report.py --by quarter --period 2025-Q4 -o 季报_2025-Q4.docx
+"""
+
+import json
+import os
+import sys
+
+# 添加脚本目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import docx_stream
+from report_store import DEFAULT_DB_PATH, ROLLUP_PERIODS, ReportStore, validate_report
+
+# 周期显示名称
+PERIOD_NAMES = {"month": "月", "quarter": "季", "year": "年"}
+
+PEOPLE_HEADERS = ['姓名', '职责', '工作模块', '工时(人/天)']
+CATEGORY_HEADERS = ['工作模块', '参与人数', '工时(人/天)', '占比']
+
+
+def format_workload(workload):
+    """工时 - 整数不带小数，其余保留一位"""
+    if workload == int(workload):
+        return str(int(workload))
+    return f"{workload:.1f}"
+
+
+def format_share(part, total):
+    return f"{part / total * 100:.1f}%" if total else "0.0%"
+
+
+def format_categories(person):
+    """某人的工作模块 - 条目化展开，附工时和占比"""
+    lines = []
+    for i, category in enumerate(person['categories'], 1):
+        lines.append(f"{i}. {category['category']}（{format_workload(category['workload'])}人/天，"
+                     f"{format_share(category['workload'], person['workload'])}）")
+    return "\n".join(lines)
+
+
+def report_title(summary):
+    return f"{PERIOD_NAMES[summary['period']]}报_{summary['key']}"
+
+
+def render_text(summary, out=None):
+    """输出文本格式的汇总"""
+    out = out or sys.stdout
+    write = lambda line='': out.write(line + "\n")
+
+    write("=" * 60)
+    write(f"{report_title(summary)}（{summary['start']} ~ {summary['end']}）")
+    write("=" * 60)
+    write(f"人数：{len(summary['people'])}，人周：{summary['weeks']}，"
+          f"总工时：{format_workload(summary['workload'])} 人/天")
+    write()
+
+    write("【按人员】")
+    write("-" * 60)
+    for person in summary['people']:
+        write(f"{person['name']}（{person['title']}）  {person['weeks']} 周  "
+              f"{format_workload(person['workload'])} 人/天")
+        for line in format_categories(person).splitlines():
+            write(f"  {line}")
+    write()
+
+    write("【按工作模块】")
+    write("-" * 60)
+    for category in summary['categories']:
+        write(f"{category['category']}  {format_workload(category['workload'])} 人/天  "
+              f"{format_share(category['workload'], summary['workload'])}  {category['people']} 人")
+    write()
+
+
+def render_docx(summary, output_path):
+    """生成 .docx 格式的汇总报告：人员表一人一行，模块表一个模块一行"""
+    title = report_title(summary)
+    with docx_stream.DocxStreamWriter(output_path, title=title, font='宋体') as writer:
+        writer.write(docx_stream.paragraph(title, center=True, bold=True, size=16))
+        writer.write(docx_stream.paragraph(
+            f"统计周期：{summary['start']} ~ {summary['end']}    人周：{summary['weeks']}    "
+            f"总工时：{format_workload(summary['workload'])} 人/天"))
+
+        columns = len(PEOPLE_HEADERS)
+        writer.write(docx_stream.table_start(columns))
+        writer.write(docx_stream.table_row([(h, {"center": True, "bold": True}) for h in PEOPLE_HEADERS], columns))
+        for person in summary['people']:
+            writer.write(docx_stream.table_row([
+                person['name'],
+                person['title'],
+                format_categories(person),
+                (format_workload(person['workload']), {"center": True})
+            ], columns))
+        writer.write(docx_stream.table_end())
+
+        writer.write(docx_stream.paragraph())
+        columns = len(CATEGORY_HEADERS)
+        writer.write(docx_stream.table_start(columns))
+        writer.write(docx_stream.table_row([(h, {"center": True, "bold": True}) for h in CATEGORY_HEADERS], columns))
+        for category in summary['categories']:
+            writer.write(docx_stream.table_row([
+                category['category'],
+                (str(category['people']), {"center": True}),
+                (format_workload(category['workload']), {"center": True}),
+                (format_share(category['workload'], summary['workload']), {"center": True})
+            ], columns))
+        writer.write(docx_stream.table_end())
+
+
+def add_payloads(store, sources):
+    """把周报数据写入存储，返回 (新增, 替换, [(来源说明, 错误信息)])"""
+    from generate_report import load_payloads
+
+    reports = []
+    failed = []
+    for source in sources:
+        for label, report_data, error in load_payloads(source):
+            if error is not None:
+                failed.append((label, error))
+                continue
+            try:
+                # 逐份检查，坏数据只跳过这一份
+                validate_report(report_data)
+            except (ValueError, TypeError) as e:
+                failed.append((label, str(e)))
+                continue
+            reports.append(report_data)
+
+    added, replaced = store.add_weeks(reports)
+    return added, replaced, failed
+
+
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='从周报数据汇总生成月报、季报、年报')
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='周报数据库路径')
+    parser.add_argument('--add', nargs='+', metavar='SOURCE', help='写入周报数据：目录、通配符或 JSONL 文件')
+    parser.add_argument('--by', choices=ROLLUP_PERIODS, default='month', help='汇总周期 (month/quarter/year)')
+    parser.add_argument('--period', '-p', default=None, help='周期标识，如 2025-12、2025-Q4、2025；默认为最近一个周期')
+    parser.add_argument('--name', action='append', default=None, help='只汇总某人（可重复）')
+    parser.add_argument('--list', '-l', action='store_true', help='列出有数据的周期')
+    parser.add_argument('--json', action='store_true', help='以 JSON 格式输出汇总')
+    parser.add_argument('--output', '-o', default=None, help='输出 .docx 文件')
+    parser.add_argument('--rebuild', action='store_true', help='根据全部周报重建汇总表')
+    args = parser.parse_args()
+
+    with ReportStore(args.db) as store:
+        if args.add:
+            added, replaced, failed = add_payloads(store, args.add)
+            print(f"新增 {added} 周，替换 {replaced} 周，失败 {len(failed)} 份")
+            for label, error in failed:
+                print(f"❌ {label}：{error}")
+            if failed:
+                sys.exit(1)
+            return
+
+        if args.rebuild:
+            store.rebuild_rollups()
+            print(f"已根据 {store.count()} 周周报重建汇总表")
+            return
+
+        periods = store.periods(args.by)
+        if args.list:
+            if not periods:
+                print("暂无周报数据")
+                return
+            print(f"有数据的{PERIOD_NAMES[args.by]}：")
+            print("-" * 60)
+            for key, start, end, people in reversed(periods):
+                print(f"  {key}  {start} ~ {end}  {people} 人")
+            return
+
+        period_key = args.period or (periods[-1][0] if periods else None)
+        summary = store.summary(args.by, period_key, args.name) if period_key else None
+        if summary is None:
+            print("指定周期内没有周报数据")
+            sys.exit(1)
+
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    elif args.output:
+        try:
+            render_docx(summary, args.output)
+        except OSError as e:
+            print(f"错误：无法保存文档到 {args.output}")
+            print(f"详细错误：{e}")
+            sys.exit(1)
+        print(f"✅ {report_title(summary)}已成功生成：{args.output}")
+    else:
+        render_text(summary)
+
+
+if __name__ == '__main__':
+    # 确保 Windows 环境下正确处理 UTF-8
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+文档骨架缓存测试：修改构建函数后不能继续使用持久化的旧骨架
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加脚本目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import docx
+import docx_skeleton
+
+
+def _build_old():
+    doc = docx.Document()
+    doc.add_paragraph('旧版式')
+    return doc
+
+
+def _build_new():
+    doc = docx.Document()
+    doc.add_paragraph('新版式')
+    return doc
+
+
+class SkeletonCacheTest(unittest.TestCase):
+
+    def tearDown(self):
+        docx_skeleton.clear_cache()
+
+    def test_builder_change_invalidates_persisted_skeleton(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            docx_skeleton.get_skeleton('test', _build_old, key='k', cache_dir=cache_dir)
+            # 新进程：进程内缓存为空，只剩磁盘上的旧骨架
+            docx_skeleton.clear_cache()
+            skeleton = docx_skeleton.get_skeleton('test', _build_new, key='k', cache_dir=cache_dir)
+            self.assertEqual([p.text for p in skeleton.clone().paragraphs], ['新版式'])
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+    def test_same_builder_reuses_persisted_skeleton(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            docx_skeleton.get_skeleton('test', _build_old, key='k', cache_dir=cache_dir)
+            docx_skeleton.clear_cache()
+            docx_skeleton.get_skeleton('test', _build_old, key='k', cache_dir=cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+批量生成周报测试：写入存储时不合格的周报只计为失败一次
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加脚本目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from generate_report import generate_batch
+
+
+REPORT = {"name": "张三", "title": "工程师", "date": "2026-03-06",
+          "tasks": [{"category": "开发", "workload": 4, "items": ["完成用户认证模块"]}]}
+
+
+class GenerateBatchTest(unittest.TestCase):
+
+    def test_store_validation_counted_once(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "reports.jsonl")
+            missing_date = {k: v for k, v in REPORT.items() if k != "date"}
+            bad_workload = dict(REPORT, name="李四", tasks=[{"category": "开发", "workload": "很多"}])
+            with open(source, "w", encoding="utf-8") as f:
+                for report in (REPORT, missing_date, bad_workload):
+                    f.write(json.dumps(report, ensure_ascii=False) + "\n")
+                f.write("{不是 JSON\n")
+
+            output_dir = os.path.join(tmp, "out")
+            stats = generate_batch(source, output_dir, workers=1, store=os.path.join(tmp, "reports.db"))
+
+            self.assertEqual(stats["total"], 4)
+            self.assertEqual(stats["succeeded"], 1)
+            self.assertEqual(stats["stored"], 1)
+            self.assertEqual(len(stats["failed"]), 3)
+            errors = dict(stats["failed"])
+            self.assertIn("周报数据缺少字段：date", errors[f"{source}:2"])
+            self.assertIn("无法写入周报存储", errors[f"{source}:3"])
+            # 不合格的周报不生成文档
+            self.assertEqual(os.listdir(output_dir), ["周报_张三_2026-03-06.docx"])
+
+
+if __name__ == "__main__":
+    unittest.main()